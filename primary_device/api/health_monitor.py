@@ -5,7 +5,7 @@ from datetime import datetime
 from core.threat_detector import ThreatDetector
 from core.policy_enforcer import PolicyEnforcer
 from services.system_log_collector import SystemLogCollector
-from ml.model_manager import ModelManager
+from api.primary_controller import model_manager
 
 router = APIRouter()
 
@@ -13,7 +13,6 @@ router = APIRouter()
 threat_detector = ThreatDetector()
 policy_enforcer = PolicyEnforcer()
 system_log_collector = SystemLogCollector()
-model_manager = ModelManager()
 
 @router.get("/health")
 async def health_check():
@@ -32,6 +32,8 @@ async def create_policy(policy: PolicyConfig):
             "policy_id": policy_id,
             "message": "Policy created successfully"
         }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid policy: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to create policy: {str(e)}")
 
@@ -50,6 +52,8 @@ async def update_policy(policy_id: str, updates: Dict[str, Any]):
         }
     except HTTPException:
         raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid policy: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to update policy: {str(e)}")
 
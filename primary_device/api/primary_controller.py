@@ -4,11 +4,15 @@ import json
 
 from models.schemas import (
     SystemStatus, NetworkStats, ThreatReport, 
-    PolicyConfig, LogEntry, SignatureRequest
+    PolicyConfig, LogEntry, SignatureRequest, PacketBatchRequest
 )
 from core.packet_analyzer import PacketAnalyzer
 from services.network_monitor import NetworkMonitor
 from services.threat_detector import ThreatDetector
+from ml.model_manager import ModelManager
+from ml.inference_scheduler import InferenceScheduler
+from ml.retraining import RetrainingPipeline
+from app.config import config
 from utils.crypto_helper import CryptoHelper
 
 router = APIRouter()
@@ -18,6 +22,21 @@ packet_analyzer = PacketAnalyzer()
 network_monitor = NetworkMonitor()
 threat_detector = ThreatDetector()
 crypto_helper = CryptoHelper()
+model_manager = ModelManager()
+inference_scheduler = InferenceScheduler(
+    model_manager,
+    max_batch_size=config.inference_batch_size,
+    max_wait_ms=config.inference_max_wait_ms
+)
+retraining_pipeline = RetrainingPipeline(
+    model_manager,
+    interval_seconds=config.model_update_interval,
+    min_samples=config.retraining_min_samples,
+    validation_fraction=config.retraining_validation_fraction,
+    max_regression=config.retraining_max_regression,
+    fine_tune_epochs=config.retraining_epochs,
+    enabled=config.retraining_enabled
+)
 
 @router.get("/status", response_model=SystemStatus)
 async def get_system_status():
@@ -41,6 +60,28 @@ async def get_network_stats():
         "blocked_attempts": 12
     }
 
+@router.post("/packets/analyze/batch")
+async def analyze_packet_batch(batch: PacketBatchRequest):
+    """Score a batch of packets in one vectorised pass"""
+    if (batch.packets is None) == (batch.columns is None):
+        raise HTTPException(status_code=400, detail="Provide exactly one of packets or columns")
+    
+    if not packet_analyzer.is_initialized:
+        await packet_analyzer.initialize_models()
+    
+    try:
+        return await packet_analyzer.analyze_batch(batch.packets if batch.packets is not None else batch.columns)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/packets/recent")
+async def get_recent_packets(limit: int = 50):
+    """Get the most recently analysed packets from the packet ring buffer"""
+    return {
+        "packets": packet_analyzer.get_recent_packets(limit),
+        "buffer": packet_analyzer.packet_buffer.get_buffer_stats()
+    }
+
 @router.get("/threats/current", response_model=List[ThreatReport])
 async def get_current_threats():
     """Get current active threats"""
@@ -99,15 +140,68 @@ async def submit_log_entry(log_entry: LogEntry):
 @router.get("/ai/models/status")
 async def get_ai_models_status():
     """Get status of AI/ML models"""
+    if not model_manager.is_initialized:
+        await model_manager.initialize_models()
+    
     return {
-        "autoencoder": {
-            "status": "active",
-            "accuracy": 0.956,
-            "last_training": "2024-01-01T08:00:00Z"
-        },
-        "isolation_forest": {
-            "status": "active", 
-            "precision": 0.923,
-            "last_training": "2024-01-01T08:00:00Z"
+        name: {
+            "status": "active" if info["is_trained"] else "untrained",
+            "last_training": info["last_training"],
+            "threshold": info["threshold"],
+            "inference": info["inference"]
         }
-    }
\ No newline at end of file
+        for name, info in (
+            ("autoencoder", model_manager.autoencoder.get_model_info()),
+            ("isolation_forest", model_manager.isolation_forest.get_model_info())
+        )
+    }
+
+@router.get("/ai/models/registry")
+async def get_model_registry():
+    """Get registered model versions and the active version of each model"""
+    return {
+        "registry": model_manager.registry.get_registry_info(),
+        "active_versions": model_manager.active_versions
+    }
+
+@router.post("/ai/models/{model_type}/promote/{version}")
+async def promote_model(model_type: str, version: str):
+    """Hot swap a registered model version into service"""
+    try:
+        return await model_manager.promote_model(model_type, version)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+@router.post("/ai/models/{model_type}/rollback")
+async def rollback_model(model_type: str):
+    """Swap back to the previously active model version"""
+    try:
+        return await model_manager.rollback_model(model_type)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+@router.post("/ai/analyze")
+async def analyze_with_models(data: Dict[str, Any], data_type: str = "network"):
+    """Score one data point through the micro-batching inference scheduler"""
+    if not model_manager.is_initialized:
+        await model_manager.initialize_models()
+    
+    return await inference_scheduler.submit(data, data_type)
+
+@router.get("/ai/inference/stats")
+async def get_inference_stats():
+    """Get inference scheduler queue depth, batch sizes and latency percentiles"""
+    return inference_scheduler.get_scheduler_stats()
+
+@router.get("/ai/retraining/status")
+async def get_retraining_status():
+    """Get retraining reservoir fill and the outcome of the last run"""
+    return retraining_pipeline.get_retraining_status()
+
+@router.post("/ai/retraining/run")
+async def run_retraining():
+    """Retrain from the reservoir now instead of waiting for the next interval"""
+    if not model_manager.is_initialized:
+        await model_manager.initialize_models()
+    
+    return await retraining_pipeline.run_once()
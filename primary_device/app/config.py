@@ -21,10 +21,34 @@ class PrimaryConfig(BaseSettings):
     # Logging
     log_level: str = "INFO"
     log_file: str = "primary_device.log"
+    decision_log_dir: str = "decision_logs"  # NDJSON firewall and policy decision logs
+    decision_log_capacity: int = 65536  # Recent decisions kept in memory per log
+    decision_log_flush_interval: float = 1.0  # Seconds between batched writes
     
     # AI/ML Configuration
     model_update_interval: int = 3600  # 1 hour
     anomaly_threshold: float = 0.85
+    model_artifact_dir: str = "ml_artifacts"  # Model registry root (versioned .npz artifacts)
+    inference_batch_size: int = 256  # Largest micro-batch the inference scheduler forms
+    inference_max_wait_ms: float = 2.0  # Longest a request waits for its batch to fill
+    retraining_enabled: bool = True  # Periodic incremental retraining every model_update_interval
+    retraining_data_type: str = "network"  # Traffic whose features feed the retraining reservoir
+    retraining_reservoir_size: int = 100000  # Rows kept in the uniform reservoir sample
+    retraining_min_samples: int = 1000  # Reservoir size required before a retraining run
+    retraining_validation_fraction: float = 0.2  # Held-out share of the reservoir for the validation gate
+    retraining_max_regression: float = 0.05  # Relative validation-score worsening still accepted
+    retraining_epochs: int = 10  # Autoencoder fine-tuning epochs per run
+
+    # Network context
+    trusted_networks: List[str] = ["10.0.0.0/8", "172.16.0.0/12", "192.168.0.0/16"]  # CIDRs or ranges
+    vpn_networks: List[str] = []  # Address pools handed out by the VPN concentrator
+    threat_intel_feed_path: str = ""  # File of blocked CIDRs/ranges/addresses, one per line
+    flow_table_max_entries: int = 65536  # Tracked flows before least recently seen ones are evicted
+    flow_table_idle_timeout: int = 300  # Seconds without packets before a flow's cached verdict expires
+
+    # Correlation
+    correlation_max_groups: int = 50000  # Group-by keys tracked per rule
+    correlation_alert_cooldown: int = 300  # Seconds before the same key can alert again
     
     class Config:
         env_file = ".env"
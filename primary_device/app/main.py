@@ -1,10 +1,19 @@
+import os
+import sys
+
+# Started from the device directory: put the repository root on the path so the shared/ package imports.
+# Spawned worker processes inherit sys.path from here.
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if REPO_ROOT not in sys.path:
+    sys.path.append(REPO_ROOT)
+
 from fastapi import FastAPI, Depends, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 import asyncio
 
 from app.config import PrimaryConfig as config
-from api.primary_controller import router as primary_router
+from api.primary_controller import router as primary_router, model_manager, inference_scheduler, retraining_pipeline
 from api.health_monitor import router as health_router
 from api.policy_api import router as policy_router
 from api.threat_intel_api import router as threat_router
@@ -12,7 +21,6 @@ from core.threat_detector import ThreatDetector
 from core.policy_enforcer import PolicyEnforcer
 from core.log_generator import LogGenerator
 from services.system_log_collector import SystemLogCollector
-from ml.model_manager import ModelManager
 from utils.logger import setup_logger
 
 # Setup logger
@@ -44,17 +52,20 @@ threat_detector = ThreatDetector()
 policy_enforcer = PolicyEnforcer()
 log_generator = LogGenerator()
 system_log_collector = SystemLogCollector()
-model_manager = ModelManager()
 
 @app.on_event("startup")
 async def startup_event():
     """Initialize services on startup"""
     logger.info("Starting Primary Device Services...")
     
-    # Initialize AI models
+    # Initialize the AI models the API serves with
     await model_manager.initialize_models()
     logger.info("AI models initialized")
     
+    # Periodic incremental retraining of the models serving the API
+    if retraining_pipeline.start():
+        logger.info("Model retraining pipeline started")
+    
     # Start system log collection
     await system_log_collector.start_collection()
     logger.info("System log collection started")
@@ -70,6 +81,8 @@ async def shutdown_event():
     """Cleanup on shutdown"""
     logger.info("Shutting down Primary Device...")
     await system_log_collector.stop_collection()
+    await inference_scheduler.stop()
+    await retraining_pipeline.stop()
 
 @app.get("/")
 async def root():
@@ -0,0 +1 @@
+"""Puts primary_device/ on sys.path so tests import core/ and utils/ as the app does when started from here."""
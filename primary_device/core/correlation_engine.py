@@ -1,14 +1,49 @@
 import asyncio
-from datetime import datetime, timedelta
-from typing import Dict, Any, List, Set
-from collections import defaultdict
+import itertools
+import time
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Set, Tuple
+from collections import OrderedDict, deque
+
+from app.config import config
+from utils.sliding_window import WindowCounter
+
+# Events are only counted, never stored; this bounds the total_events statistic
+EVENT_RETENTION_SECONDS = 3600
+EVENTS_SAMPLE_SIZE = 5
+
+class CorrelationGroup:
+    """Windowed state for one group-by key of one rule"""
+
+    __slots__ = ("key", "window", "samples", "last_seen", "last_alert")
+
+    def __init__(self, key: Tuple[Any, ...], time_window: int):
+        self.key = key
+        self.window = WindowCounter(time_window)
+        self.samples = deque(maxlen=EVENTS_SAMPLE_SIZE)
+        self.last_seen = 0
+        self.last_alert: Optional[int] = None
 
 class CorrelationEngine:
-    def __init__(self):
-        self.events_buffer = []
+    def __init__(self, max_groups: Optional[int] = None, alert_cooldown: Optional[int] = None):
         self.correlation_rules = self._load_correlation_rules()
         self.suspicious_patterns = set()
-        
+        self.event_window = WindowCounter(EVENT_RETENTION_SECONDS)
+        self.max_groups = max_groups or config.correlation_max_groups
+        self.alert_cooldown = config.correlation_alert_cooldown if alert_cooldown is None else alert_cooldown
+
+        # Per-rule LRU of group-by keys, least recently seen first
+        self.rule_groups = {
+            rule["name"]: OrderedDict() for rule in self.correlation_rules
+        }
+        self.patterns = {rule["pattern"] for rule in self.correlation_rules}
+        self.alert_sequence = itertools.count(1)
+        self.correlation_stats = {
+            "alerts_triggered": 0,
+            "alerts_suppressed": 0,
+            "groups_evicted": 0
+        }
+
     def _load_correlation_rules(self) -> List[Dict[str, Any]]:
         """Load correlation rules for threat detection"""
         return [
@@ -17,86 +52,125 @@ class CorrelationEngine:
                 "pattern": "auth_failure",
                 "threshold": 5,
                 "time_window": 300,  # 5 minutes
-                "severity": "high"
+                "severity": "high",
+                "group_by": ["source_ip", "user"]
             },
             {
                 "name": "port_scanning",
                 "pattern": "multiple_ports",
                 "threshold": 10,
                 "time_window": 60,  # 1 minute
-                "severity": "medium"
+                "severity": "medium",
+                "group_by": ["source_ip"]
             },
             {
                 "name": "data_exfiltration",
                 "pattern": "large_outbound",
                 "threshold": 3,
                 "time_window": 600,  # 10 minutes
-                "severity": "critical"
+                "severity": "critical",
+                "group_by": ["source_ip"]
             }
         ]
-    
+
     async def add_event(self, event: Dict[str, Any]):
         """Add event to correlation engine"""
-        self.events_buffer.append({
-            **event,
-            "timestamp": datetime.utcnow()
-        })
-        
-        # Clean old events (keep last hour)
-        one_hour_ago = datetime.utcnow() - timedelta(hours=1)
-        self.events_buffer = [
-            e for e in self.events_buffer 
-            if e["timestamp"] > one_hour_ago
-        ]
-        
-        # Run correlation analysis
-        await self._analyze_correlations()
-    
-    async def _analyze_correlations(self):
-        """Analyze events for correlated patterns"""
+        second = int(time.time())
+        self.event_window.add(second)
+
+        # Classify once; only the groups this event lands in can cross a threshold
+        matched_patterns = self._classify_event(event)
+        if not matched_patterns:
+            return
+
+        sample = {**event, "timestamp": datetime.utcnow()}
         for rule in self.correlation_rules:
-            await self._check_rule(rule)
-    
-    async def _check_rule(self, rule: Dict[str, Any]):
+            if rule["pattern"] in matched_patterns:
+                group = self._get_group(rule, event, second)
+                group.window.add(second)
+                group.samples.append(sample)
+                await self._check_rule(rule, group, second)
+
+    def _classify_event(self, event: Dict[str, Any]) -> Set[str]:
+        """Find the rule patterns an event matches, formatting the event a single time"""
+        event_text = str(event)
+        return {pattern for pattern in self.patterns if pattern in event_text}
+
+    def _get_group(self, rule: Dict[str, Any], event: Dict[str, Any], second: int) -> CorrelationGroup:
+        """Look up or create the group for an event, evicting expired and least recently seen keys"""
+        groups = self.rule_groups[rule["name"]]
+        key = tuple(event.get(field) for field in rule.get("group_by", ()))
+
+        group = groups.get(key)
+        if group is None:
+            self._evict_groups(groups, rule, second)
+            group = CorrelationGroup(key, rule["time_window"])
+            groups[key] = group
+        else:
+            groups.move_to_end(key)
+
+        group.last_seen = second
+        return group
+
+    def _evict_groups(self, groups: "OrderedDict[Tuple[Any, ...], CorrelationGroup]", rule: Dict[str, Any], second: int):
+        """Drop groups idle past the TTL, then the least recently seen while over capacity"""
+        # A group idle for longer than the rule window and the cooldown holds no state worth keeping
+        ttl = max(rule["time_window"], self.alert_cooldown)
+        while groups:
+            oldest = next(iter(groups.values()))
+            if second - oldest.last_seen <= ttl and len(groups) < self.max_groups:
+                break
+            groups.popitem(last=False)
+            self.correlation_stats["groups_evicted"] += 1
+
+    async def _check_rule(self, rule: Dict[str, Any], group: CorrelationGroup, second: int):
         """Check if correlation rule is triggered"""
-        time_window = timedelta(seconds=rule["time_window"])
-        window_start = datetime.utcnow() - time_window
-        
-        # Count events matching pattern in time window
-        matching_events = [
-            e for e in self.events_buffer
-            if e["timestamp"] > window_start and rule["pattern"] in str(e)
-        ]
-        
-        if len(matching_events) >= rule["threshold"]:
-            await self._trigger_alert(rule, matching_events)
-    
-    async def _trigger_alert(self, rule: Dict[str, Any], events: List[Dict[str, Any]]):
+        event_count = group.window.count(second)
+        if event_count < rule["threshold"]:
+            return
+
+        # One alert per key per cooldown period instead of one per event past the threshold
+        if group.last_alert is not None and second - group.last_alert < self.alert_cooldown:
+            self.correlation_stats["alerts_suppressed"] += 1
+            return
+
+        group.last_alert = second
+        await self._trigger_alert(rule, group, event_count)
+
+    async def _trigger_alert(self, rule: Dict[str, Any], group: CorrelationGroup, event_count: int):
         """Trigger correlation alert"""
-        alert_id = f"corr_alert_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}"
-        
+        alert_id = f"corr_alert_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}_{next(self.alert_sequence):06d}"
+        group_key = dict(zip(rule.get("group_by", ()), group.key))
+
         alert_data = {
             "alert_id": alert_id,
             "timestamp": datetime.utcnow().isoformat(),
             "rule_name": rule["name"],
             "severity": rule["severity"],
-            "event_count": len(events),
+            "group_key": group_key,
+            "event_count": event_count,
             "time_window": rule["time_window"],
-            "description": f"Correlation rule '{rule['name']}' triggered with {len(events)} events",
-            "events_sample": events[:5]  # Include sample of events
+            "description": f"Correlation rule '{rule['name']}' triggered with {event_count} events"
+                           + (f" for {group_key}" if group_key else ""),
+            "events_sample": list(group.samples)  # Most recent matching events
         }
-        
+
         # Store pattern for future reference
         self.suspicious_patterns.add(rule["name"])
-        
+        self.correlation_stats["alerts_triggered"] += 1
+
         print(f"🚨 Correlation Alert: {alert_data['description']}")
         return alert_data
-    
+
     def get_correlation_stats(self) -> Dict[str, Any]:
         """Get correlation engine statistics"""
         return {
-            "total_events": len(self.events_buffer),
+            "total_events": self.event_window.count(int(time.time())),
             "active_rules": len(self.correlation_rules),
             "suspicious_patterns": list(self.suspicious_patterns),
+            "tracked_groups": {name: len(groups) for name, groups in self.rule_groups.items()},
+            "max_groups": self.max_groups,
+            "alert_cooldown": self.alert_cooldown,
+            **self.correlation_stats,
             "last_analysis": datetime.utcnow().isoformat()
-        }
\ No newline at end of file
+        }
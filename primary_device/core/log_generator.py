@@ -1,12 +1,13 @@
 import asyncio
 from datetime import datetime
 from typing import Dict, Any, List
-import hashlib
-import json
+
+from shared.utils.canonical import canonical_hash, canonical_hash_excluding, CANONICAL_HASH_FORMAT
+from utils.ring_buffer import RingBuffer
 
 class LogGenerator:
     def __init__(self):
-        self.log_buffer = []
+        self.log_buffer = RingBuffer(10000)
         self.log_sequence = 0
         
     async def generate_security_log(self, event_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -23,19 +24,16 @@ class LogGenerator:
             "description": event_data.get("description", ""),
             "details": event_data.get("details", {}),
             "previous_hash": self._get_previous_hash(),
-            "data_hash": self._calculate_data_hash(event_data)
+            "data_hash": self._calculate_data_hash(event_data),
+            "hash_format": CANONICAL_HASH_FORMAT
         }
         
         # Calculate log hash
         log_entry["log_hash"] = self._calculate_log_hash(log_entry)
         
-        # Add to buffer
+        # Add to buffer, overwriting the oldest entry once full
         self.log_buffer.append(log_entry)
         
-        # Maintain buffer size
-        if len(self.log_buffer) > 10000:
-            self.log_buffer = self.log_buffer[-10000:]
-        
         return log_entry
     
     def _get_previous_hash(self) -> str:
@@ -43,19 +41,16 @@ class LogGenerator:
         if not self.log_buffer:
             return "0" * 64  # Genesis hash
         
-        return self.log_buffer[-1]["log_hash"]
+        return self.log_buffer.last()["log_hash"]
     
     def _calculate_data_hash(self, data: Dict[str, Any]) -> str:
         """Calculate hash of event data"""
-        data_str = json.dumps(data, sort_keys=True)
-        return hashlib.sha256(data_str.encode()).hexdigest()
+        return canonical_hash(data)
     
     def _calculate_log_hash(self, log_entry: Dict[str, Any]) -> str:
         """Calculate hash of log entry"""
         # Exclude log_hash from calculation
-        log_data = {k: v for k, v in log_entry.items() if k != "log_hash"}
-        log_str = json.dumps(log_data, sort_keys=True)
-        return hashlib.sha256(log_str.encode()).hexdigest()
+        return canonical_hash_excluding(log_entry, "log_hash")
     
     async def generate_audit_log(self, user: str, action: str, resource: str, status: str) -> Dict[str, Any]:
         """Generate audit log entry"""
@@ -77,7 +72,7 @@ class LogGenerator:
     
     def get_recent_logs(self, count: int = 100) -> List[Dict[str, Any]]:
         """Get recent log entries"""
-        return self.log_buffer[-count:] if self.log_buffer else []
+        return self.log_buffer.latest(count)
     
     def get_log_stats(self) -> Dict[str, Any]:
         """Get log generation statistics"""
@@ -90,5 +85,5 @@ class LogGenerator:
             "total_logs": len(self.log_buffer),
             "sequence_number": self.log_sequence,
             "severity_distribution": severity_counts,
-            "last_log_time": self.log_buffer[-1]["timestamp"] if self.log_buffer else None
+            "last_log_time": self.log_buffer.last()["timestamp"] if self.log_buffer else None
         }
\ No newline at end of file
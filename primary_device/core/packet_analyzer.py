@@ -1,14 +1,76 @@
 import asyncio
 import json
+import time
 from datetime import datetime
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Sequence, Tuple, Union
 import numpy as np
 
+from utils.network_utils import NetworkUtils
+from utils.ring_buffer import ColumnarRingBuffer
+
+# Columns read from each packet by the batch path, with the defaults analyze_packet uses
+BATCH_COLUMN_DEFAULTS = {"source": "", "destination": "", "protocol": "tcp", "size": 0}
+# Columns with few distinct values per batch; per-value work runs once per distinct value
+CATEGORICAL_COLUMNS = ("source", "destination", "protocol")
+
+PACKET_BUFFER_CAPACITY = 50000
+# Single-packet records are buffered as tuples and written to the ring in blocks of this many
+PENDING_RECORD_BLOCK = 256
+# Distinct non-address sources and destinations (hostnames, interface names) kept by text
+ADDRESS_LABEL_CAPACITY = 65536
+
+# 58 bytes per analysed packet; addresses are stored packed, protocol and threat level as codes. A source
+# or destination that is not an address has the zero address and a code into the analyzer's label table
+PACKET_RECORD_DTYPE = np.dtype([
+    ("timestamp", "f8"),
+    ("source", "V16"),
+    ("destination", "V16"),
+    ("source_label", "u4"),
+    ("destination_label", "u4"),
+    ("size", "u4"),
+    ("anomaly_score", "f4"),
+    ("protocol", "u1"),
+    ("threat_level", "u1")
+])
+
+PROTOCOLS = ("unknown", "tcp", "udp", "icmp", "http", "https", "dns", "ssh", "ftp", "smtp")
+PROTOCOL_CODES = {name: code for code, name in enumerate(PROTOCOLS)}
+
+THREAT_LEVEL_NAMES = np.array(["low", "medium", "high", "critical"], dtype=object)
+THREAT_LEVEL_CODES = {name: code for code, name in enumerate(THREAT_LEVEL_NAMES)}
+
+NO_ADDRESS = bytes(16)
+
+class _UnhashableText(str):
+    """Text standing in for an unhashable field value; never recorded as a label"""
+
+def _hashable(value: Any) -> Any:
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        return _UnhashableText(value)
+
+def _factorize(values: Sequence[Any]) -> Tuple[List[Any], np.ndarray]:
+    """Distinct values in first-seen order, and for each value its position among them"""
+    try:
+        positions: Dict[Any, int] = dict.fromkeys(values)
+    except TypeError:
+        # Unhashable values are never addresses or protocols; key them by their text
+        return _factorize([_hashable(value) for value in values])
+    for position, value in enumerate(positions):
+        positions[value] = position
+    return list(positions), np.fromiter(map(positions.__getitem__, values), dtype=np.intp, count=len(values))
+
 class PacketAnalyzer:
     def __init__(self):
         self.is_initialized = False
         self.anomaly_threshold = 0.85
-        self.packet_buffer = []
+        self.packet_buffer = ColumnarRingBuffer(PACKET_BUFFER_CAPACITY, PACKET_RECORD_DTYPE)
+        self.pending_records: List[tuple] = []
+        # Label 0 is "unknown": missing, unhashable or non-text values, and new labels once the table is full
+        self.address_labels: List[str] = ["unknown"]
+        self.address_label_codes: Dict[str, int] = {}
         self.stats = {
             "total_packets": 0,
             "suspicious_packets": 0,
@@ -38,12 +100,27 @@ class PacketAnalyzer:
         if threat_level in ["high", "critical"]:
             self.stats["suspicious_packets"] += 1
         
-        self.stats["last_analysis"] = datetime.utcnow().isoformat()
+        timestamp = datetime.utcnow().isoformat()
+        self.stats["last_analysis"] = timestamp
+        
+        # A one-row structured write costs more than the analysis itself, so raw fields are buffered and
+        # written (addresses packed, protocols coded) a block at a time
+        self.pending_records.append((
+            time.time(),
+            packet_data.get('source'),
+            packet_data.get('destination'),
+            packet_data.get('protocol', 'unknown'),
+            packet_data.get('size', 0),
+            anomaly_score,
+            THREAT_LEVEL_CODES[threat_level]
+        ))
+        if len(self.pending_records) >= PENDING_RECORD_BLOCK:
+            self._flush_pending_records()
         
         return {
             "threat_level": threat_level,
             "anomaly_score": round(anomaly_score, 4),
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": timestamp,
             "packet_info": {
                 "source": packet_data.get('source', 'unknown'),
                 "destination": packet_data.get('destination', 'unknown'),
@@ -52,6 +129,164 @@ class PacketAnalyzer:
             }
         }
     
+    async def analyze_batch(self, packets: Union[List[Dict[str, Any]], Dict[str, Sequence[Any]]]) -> Dict[str, Any]:
+        """Analyze a list of packets or a columnar batch in one vectorised pass"""
+        if not self.is_initialized:
+            return {"threat_level": "unknown", "reason": "Models not initialized"}
+        
+        columns = self._encode_columns(self._to_columns(packets))
+        # Keep the ring in analysis order
+        self._flush_pending_records()
+        features = self._extract_feature_matrix(columns)
+        anomaly_scores = self._calculate_anomaly_scores(features)
+        level_codes = self._determine_threat_levels(anomaly_scores)
+        threat_levels = THREAT_LEVEL_NAMES[level_codes]
+        
+        level_counts = np.bincount(level_codes, minlength=len(THREAT_LEVEL_NAMES))
+        level_summary = {
+            name: int(count) for name, count in zip(THREAT_LEVEL_NAMES, level_counts) if count
+        }
+        now = time.time()
+        timestamp = datetime.utcfromtimestamp(now).isoformat()
+        
+        self._record_batch(columns, anomaly_scores, level_codes, now)
+        
+        self.stats["total_packets"] += len(anomaly_scores)
+        self.stats["suspicious_packets"] += level_summary.get("high", 0) + level_summary.get("critical", 0)
+        self.stats["last_analysis"] = timestamp
+        
+        # Results are columnar and follow the order of the input packets
+        return {
+            "batch_size": len(anomaly_scores),
+            "threat_levels": threat_levels.tolist(),
+            "anomaly_scores": np.round(anomaly_scores, 4).tolist(),
+            "level_counts": level_summary,
+            "timestamp": timestamp
+        }
+    
+    def _to_columns(self, packets: Union[List[Dict[str, Any]], Dict[str, Sequence[Any]]]) -> Dict[str, Sequence[Any]]:
+        """Normalise a batch to one sequence per feature column"""
+        if isinstance(packets, dict):
+            batch_size = max((len(values) for values in packets.values()), default=0)
+            columns = {name: packets.get(name) for name in BATCH_COLUMN_DEFAULTS}
+            for name, values in columns.items():
+                if values is None:
+                    columns[name] = [BATCH_COLUMN_DEFAULTS[name]] * batch_size
+                elif len(values) != batch_size:
+                    raise ValueError(f"Column '{name}' has {len(values)} values, expected {batch_size}")
+            return columns
+        
+        return {
+            "source": [packet.get('source', '') for packet in packets],
+            "destination": [packet.get('destination', '') for packet in packets],
+            "protocol": [packet.get('protocol', 'tcp') for packet in packets],
+            "size": [packet.get('size', 0) for packet in packets]
+        }
+    
+    def _encode_columns(self, columns: Dict[str, Sequence[Any]]) -> Dict[str, Any]:
+        """Factorize the categorical columns to (distinct values, index) and convert sizes to floats"""
+        encoded: Dict[str, Any] = {name: _factorize(columns[name]) for name in CATEGORICAL_COLUMNS}
+        # None converts to NaN, which has no integer form; record it as size 0
+        encoded["size"] = np.nan_to_num(np.asarray(columns["size"], dtype=np.float64), nan=0.0)
+        return encoded
+    
+    def _extract_feature_matrix(self, columns: Dict[str, Any]) -> np.ndarray:
+        """Build the (packets x features) matrix matching _extract_features from encoded columns"""
+        sources, source_index = columns["source"]
+        destinations, destination_index = columns["destination"]
+        protocols, protocol_index = columns["protocol"]
+        
+        features = np.empty((len(columns["size"]), 4), dtype=np.float64)
+        features[:, 0] = np.array([len(str(value)) for value in sources], dtype=np.float64)[source_index]
+        features[:, 1] = np.array([len(str(value)) for value in destinations], dtype=np.float64)[destination_index]
+        features[:, 2] = columns["size"] / 1500  # Normalized by MTU
+        features[:, 3] = np.array([hash(protocol) % 100 / 100 for protocol in protocols], dtype=np.float64)[protocol_index]
+        return features
+    
+    def _calculate_anomaly_scores(self, features: np.ndarray) -> np.ndarray:
+        """Vectorised _calculate_anomaly_score over a feature matrix"""
+        batch_size = features.shape[0]
+        reconstruction_error = np.random.normal(0.1, 0.05, batch_size)
+        isolation_score = np.random.uniform(0, 1, batch_size)
+        return np.minimum((reconstruction_error + isolation_score) / 2, 1.0)
+    
+    def _determine_threat_levels(self, anomaly_scores: np.ndarray) -> np.ndarray:
+        """Vectorised _determine_threat_level using the same thresholds, as indices into THREAT_LEVEL_NAMES"""
+        return np.select(
+            [anomaly_scores > 0.9, anomaly_scores > 0.7, anomaly_scores > 0.5],
+            [THREAT_LEVEL_CODES["critical"], THREAT_LEVEL_CODES["high"], THREAT_LEVEL_CODES["medium"]],
+            default=THREAT_LEVEL_CODES["low"]
+        ).astype(np.uint8)
+    
+    def _record_batch(self, columns: Dict[str, Any], anomaly_scores: Sequence[float], level_codes: Sequence[int], timestamps: Union[float, Sequence[float]]):
+        """Append a scored batch of encoded columns to the packet ring in one block write"""
+        sources, source_index = columns["source"]
+        destinations, destination_index = columns["destination"]
+        protocols, protocol_index = columns["protocol"]
+        protocol_codes = np.array([PROTOCOL_CODES.get(str(protocol).lower(), 0) for protocol in protocols], dtype=np.uint8)
+        packed_sources, source_labels = self._pack_addresses(sources)
+        packed_destinations, destination_labels = self._pack_addresses(destinations)
+        self.packet_buffer.extend({
+            "timestamp": timestamps,
+            "source": packed_sources[source_index],
+            "destination": packed_destinations[destination_index],
+            "source_label": source_labels[source_index],
+            "destination_label": destination_labels[destination_index],
+            "size": np.clip(columns["size"], 0, None),
+            "anomaly_score": anomaly_scores,
+            "protocol": protocol_codes[protocol_index],
+            "threat_level": level_codes
+        })
+    
+    def _pack_addresses(self, values: Sequence[Any]) -> Tuple[np.ndarray, np.ndarray]:
+        """Distinct values as a V16 array in pack_ip_address form, and label codes for those that are not addresses"""
+        packed = [NetworkUtils.pack_ip_address(value) for value in values]
+        labels = np.fromiter(
+            (self._label_code(value) if address == NO_ADDRESS else 0 for value, address in zip(values, packed)),
+            dtype=np.uint32, count=len(values)
+        )
+        return np.frombuffer(b"".join(packed), dtype="V16"), labels
+    
+    def _label_code(self, value: Any) -> int:
+        """Code of a non-address value in the label table, adding it while there is room"""
+        # Exact str only: _factorize stands in for unhashable values with _UnhashableText
+        if type(value) is not str or not value:
+            return 0
+        code = self.address_label_codes.get(value)
+        if code is None:
+            if len(self.address_labels) > ADDRESS_LABEL_CAPACITY:
+                return 0
+            code = self.address_label_codes[value] = len(self.address_labels)
+            self.address_labels.append(value)
+        return code
+    
+    def _flush_pending_records(self):
+        """Write buffered single-packet records to the ring in one block"""
+        if not self.pending_records:
+            return
+        timestamps, sources, destinations, protocols, sizes, anomaly_scores, level_codes = zip(*self.pending_records)
+        self.pending_records = []
+        columns = {"source": sources, "destination": destinations, "protocol": protocols, "size": sizes}
+        self._record_batch(self._encode_columns(columns), anomaly_scores, level_codes, timestamps)
+    
+    def get_recent_packets(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """Get the most recently analysed packets, oldest first"""
+        self._flush_pending_records()
+        labels = self.address_labels
+        return [
+            {
+                "timestamp": datetime.utcfromtimestamp(timestamp).isoformat(),
+                "source": NetworkUtils.unpack_ip_address(source) or labels[source_label],
+                "destination": NetworkUtils.unpack_ip_address(destination) or labels[destination_label],
+                "protocol": PROTOCOLS[protocol],
+                "size": size,
+                "anomaly_score": round(anomaly_score, 4),
+                "threat_level": THREAT_LEVEL_NAMES[threat_level]
+            }
+            for timestamp, source, destination, source_label, destination_label, size, anomaly_score, protocol, threat_level
+            in self.packet_buffer.latest(limit).tolist()
+        ]
+    
     def _extract_features(self, packet_data: Dict[str, Any]) -> List[float]:
         """Extract features from packet data for AI analysis"""
         # This would extract real features in production
@@ -88,4 +323,9 @@ class PacketAnalyzer:
     
     def get_stats(self) -> Dict[str, Any]:
         """Get current analyzer statistics"""
-        return self.stats.copy()
\ No newline at end of file
+        self._flush_pending_records()
+        return {
+            **self.stats,
+            "packet_buffer": self.packet_buffer.get_buffer_stats(),
+            "address_labels": len(self.address_labels) - 1
+        }
\ No newline at end of file
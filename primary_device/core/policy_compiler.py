@@ -0,0 +1,197 @@
+from numbers import Real
+from typing import Dict, Any, Callable, List, Optional, Tuple
+
+# Most restrictive first; evaluation walks the tiers in this order
+ACTION_ORDER = ("block", "quarantine", "log", "allow")
+
+MISSING = object()
+
+def _numeric(operator: str, operand: Any) -> Real:
+    if isinstance(operand, bool) or not isinstance(operand, Real):
+        raise ValueError(f"'{operator}' needs a number, got {operand!r}")
+    return operand
+
+def _compare(compare: Callable[[Any], bool]) -> Callable[[Any], bool]:
+    # Missing fields and values of another type never satisfy a comparison
+    def test(value: Any) -> bool:
+        if value is MISSING:
+            return False
+        try:
+            return compare(value)
+        except TypeError:
+            return False
+    return test
+
+def _compile_operator(operator: str, operand: Any) -> Callable[[Any], bool]:
+    """Test function for one operator of the condition language"""
+    if operator == "eq":
+        return _compare(lambda value: value == operand)
+    if operator == "ne":
+        return _compare(lambda value: value != operand)
+    if operator in ("in", "not_in"):
+        if not isinstance(operand, (list, tuple, set, frozenset)):
+            raise ValueError(f"'{operator}' needs a list, got {operand!r}")
+        try:
+            members = frozenset(operand)
+        except TypeError:
+            raise ValueError(f"'{operator}' needs hashable values, got {operand!r}")
+        if operator == "in":
+            return _compare(lambda value: value in members)
+        return _compare(lambda value: value not in members)
+    if operator == "gt":
+        bound = _numeric(operator, operand)
+        return _compare(lambda value: value > bound)
+    if operator == "gte":
+        bound = _numeric(operator, operand)
+        return _compare(lambda value: value >= bound)
+    if operator == "lt":
+        bound = _numeric(operator, operand)
+        return _compare(lambda value: value < bound)
+    if operator == "lte":
+        bound = _numeric(operator, operand)
+        return _compare(lambda value: value <= bound)
+    if operator == "exists":
+        if not isinstance(operand, bool):
+            raise ValueError(f"'exists' needs true or false, got {operand!r}")
+        return lambda value: (value is not MISSING) == operand
+    raise ValueError(f"Unknown condition operator: {operator}")
+
+def normalize_condition(spec: Any) -> Dict[str, Any]:
+    """Operator form of a condition: a plain value means eq, a list means in"""
+    if isinstance(spec, dict):
+        if not spec:
+            raise ValueError("Empty condition")
+        return spec
+    if isinstance(spec, (list, tuple, set, frozenset)):
+        return {"in": list(spec)}
+    return {"eq": spec}
+
+class CompiledPolicy:
+    __slots__ = ("policy", "position", "checks")
+
+    def __init__(self, policy: Dict[str, Any], position: int, checks: List[Tuple[str, Callable[[Any], bool]]]):
+        self.policy = policy
+        self.position = position
+        # (field, test) pairs still to run after the index lookup; all must pass
+        self.checks = checks
+
+    def matches(self, request_data: Dict[str, Any]) -> bool:
+        for field, test in self.checks:
+            if not test(request_data.get(field, MISSING)):
+                return False
+        return True
+
+class PolicyTier:
+    """Policies sharing one action, bucketed by the value of their most selective field"""
+
+    def __init__(self):
+        self.index: Dict[str, Dict[Any, List[CompiledPolicy]]] = {}
+        self.unindexed: List[CompiledPolicy] = []
+
+    def add(self, compiled: CompiledPolicy, index_field: Optional[str], index_values: List[Any]):
+        if index_field is None:
+            self.unindexed.append(compiled)
+            return
+        buckets = self.index.setdefault(index_field, {})
+        # Deduplicated so a policy sits in each bucket once
+        for value in dict.fromkeys(index_values):
+            buckets.setdefault(value, []).append(compiled)
+
+    def matches(self, request_data: Dict[str, Any], first_only: bool) -> List[CompiledPolicy]:
+        """Matching policies in policy order; stops at the first one if first_only"""
+        candidates = []
+        for field, buckets in self.index.items():
+            try:
+                bucket = buckets.get(request_data.get(field, MISSING))
+            except TypeError:
+                continue  # Unhashable value cannot equal an indexed one
+            if bucket:
+                candidates.extend(bucket)
+        candidates.extend(self.unindexed)
+        if len(candidates) > 1:
+            candidates.sort(key=lambda compiled: compiled.position)
+
+        matched = []
+        for compiled in candidates:
+            if compiled.matches(request_data):
+                matched.append(compiled)
+                if first_only:
+                    break
+        return matched
+
+class CompiledPolicySet:
+    """Indexed evaluator for a policy list; conditions are ANDed, most restrictive action wins
+
+    Condition values are a plain value (equality), a list (membership) or a dict of operators:
+    eq, ne, in, not_in, gt, gte, lt, lte, exists. A missing field fails every operator except exists.
+    """
+
+    def __init__(self, policies: List[Dict[str, Any]], version: int = 0):
+        self.version = version
+        self.tiers = {action: PolicyTier() for action in ACTION_ORDER}
+        self.policy_count = 0
+
+        for position, policy in enumerate(policies):
+            if not policy.get("enabled", True):
+                continue
+            action = policy.get("action", "log")
+            if action not in self.tiers:
+                raise ValueError(f"Unknown policy action: {action}")
+            conditions = policy.get("conditions", policy.get("rules")) or {}
+            if not isinstance(conditions, dict):
+                raise ValueError(f"Conditions of policy {policy.get('id')} must be an object")
+            self._add_policy(self.tiers[action], policy, position, conditions)
+            self.policy_count += 1
+
+    def _add_policy(self, tier: PolicyTier, policy: Dict[str, Any], position: int, conditions: Dict[str, Any]):
+        normalized = {field: normalize_condition(spec) for field, spec in conditions.items()}
+
+        # Equality and membership are answered by a hash lookup; the field admitting the fewest values
+        # is the most selective one to bucket on
+        index_field, index_values = None, []
+        for field, operators in normalized.items():
+            values = self._index_values(operators)
+            if values is not None and (index_field is None or len(values) < len(index_values)):
+                index_field, index_values = field, values
+
+        checks = [
+            (field, _compile_operator(operator, operand))
+            for field, operators in normalized.items() if field != index_field
+            for operator, operand in operators.items()
+        ]
+        tier.add(CompiledPolicy(policy, position, checks), index_field, index_values)
+
+    @staticmethod
+    def _index_values(operators: Dict[str, Any]) -> Optional[List[Any]]:
+        """Values a field must take for the condition to hold, if it is a pure eq/in condition"""
+        if len(operators) != 1:
+            return None
+        operator, operand = next(iter(operators.items()))
+        if operator == "eq":
+            values = [operand]
+        elif operator == "in" and isinstance(operand, (list, tuple, set, frozenset)):
+            values = list(operand)
+        else:
+            return None
+        try:
+            for value in values:
+                hash(value)
+        except TypeError:
+            return None
+        return values
+
+    def evaluate(self, request_data: Dict[str, Any]) -> Tuple[str, List[Dict[str, Any]]]:
+        """Final action and the matching policies; stops at the first matching BLOCK policy"""
+        matched: List[Dict[str, Any]] = []
+        final_action = "allow"
+        for action in ACTION_ORDER:
+            tier_matches = self.tiers[action].matches(request_data, first_only=action == "block")
+            if not tier_matches:
+                continue
+            if not matched:
+                final_action = action
+            matched.extend(compiled.policy for compiled in tier_matches)
+            if action == "block":
+                # Nothing can make the outcome more restrictive
+                break
+        return final_action, matched
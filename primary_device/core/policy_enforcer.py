@@ -1,8 +1,13 @@
 import asyncio
+import os
 from datetime import datetime
 from typing import Dict, Any, List
 from enum import Enum
 
+from app.config import config
+from core.policy_compiler import CompiledPolicySet
+from utils.decision_log import DecisionLog
+
 class PolicyAction(Enum):
     ALLOW = "allow"
     BLOCK = "block" 
@@ -12,7 +17,16 @@ class PolicyAction(Enum):
 class PolicyEnforcer:
     def __init__(self):
         self.policies = self._load_default_policies()
-        self.enforcement_log = []
+        self.policy_version = 0
+        # Replaced as a whole whenever policies change; evaluation reads it once per request
+        self.compiled_policies = CompiledPolicySet(self.policies, self.policy_version)
+        self.enforcement_log = DecisionLog(
+            "policy_log",
+            ("request_type", "action", "policies_applied", "resource"),
+            capacity=config.decision_log_capacity,
+            path=os.path.join(config.decision_log_dir, "policy.ndjson"),
+            flush_interval=config.decision_log_flush_interval
+        )
         
     def _load_default_policies(self) -> List[Dict[str, Any]]:
         """Load default security policies"""
@@ -50,73 +64,48 @@ class PolicyEnforcer:
     
     async def evaluate_request(self, request_data: Dict[str, Any]) -> Dict[str, Any]:
         """Evaluate request against policies"""
-        applicable_policies = []
-        
-        for policy in self.policies:
-            if not policy["enabled"]:
-                continue
-                
-            if await self._matches_conditions(request_data, policy["conditions"]):
-                applicable_policies.append(policy)
+        # Most restrictive matching policy wins; evaluation stops at the first BLOCK
+        final_action, applicable_policies = self.compiled_policies.evaluate(request_data)
         
-        # Determine final action (most restrictive policy wins)
-        final_action = PolicyAction.ALLOW.value
-        if any(p["action"] == PolicyAction.BLOCK.value for p in applicable_policies):
-            final_action = PolicyAction.BLOCK.value
-        elif any(p["action"] == PolicyAction.QUARANTINE.value for p in applicable_policies):
-            final_action = PolicyAction.QUARANTINE.value
-        elif any(p["action"] == PolicyAction.LOG.value for p in applicable_policies):
-            final_action = PolicyAction.LOG.value
+        policy_ids = [p["id"] for p in applicable_policies]
         
         # Log enforcement decision
-        log_entry = await self._log_enforcement(
-            request_data, final_action, applicable_policies
+        log_id = self.enforcement_log.record(
+            request_data.get("type", "unknown"),
+            final_action,
+            policy_ids,
+            request_data.get("resource", "unknown")
         )
         
         return {
             "action": final_action,
-            "applicable_policies": [p["id"] for p in applicable_policies],
+            "applicable_policies": policy_ids,
             "timestamp": datetime.utcnow().isoformat(),
-            "log_id": log_entry["log_id"]
+            "log_id": self.enforcement_log.format_id(log_id)
         }
     
-    async def _matches_conditions(self, request_data: Dict[str, Any], conditions: Dict[str, Any]) -> bool:
-        """Check if request matches policy conditions"""
-        # Simplified condition matching for demo
-        import random
-        return random.random() < 0.2  # 20% chance of match
-    
-    async def _log_enforcement(self, request_data: Dict[str, Any], action: str, policies: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Log policy enforcement decision"""
-        log_entry = {
-            "log_id": f"policy_log_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}",
-            "timestamp": datetime.utcnow().isoformat(),
-            "request_type": request_data.get("type", "unknown"),
-            "action": action,
-            "policies_applied": [p["id"] for p in policies],
-            "resource": request_data.get("resource", "unknown")
-        }
-        
-        self.enforcement_log.append(log_entry)
-        
-        # Keep only recent logs
-        if len(self.enforcement_log) > 1000:
-            self.enforcement_log = self.enforcement_log[-1000:]
-        
-        return log_entry
+    def _compile_policies(self, policies: List[Dict[str, Any]]):
+        """Compile a policy list and swap it in; invalid policies raise before anything changes"""
+        compiled = CompiledPolicySet(policies, self.policy_version + 1)
+        self.policies = policies
+        self.policy_version = compiled.version
+        self.compiled_policies = compiled
     
     async def add_policy(self, policy: Dict[str, Any]) -> str:
         """Add new security policy"""
         policy_id = f"policy_{len(self.policies) + 1:03d}"
         policy["id"] = policy_id
-        self.policies.append(policy)
+        self._compile_policies(self.policies + [policy])
         return policy_id
     
     async def update_policy(self, policy_id: str, updates: Dict[str, Any]) -> bool:
         """Update existing policy"""
-        for policy in self.policies:
+        for index, policy in enumerate(self.policies):
             if policy["id"] == policy_id:
-                policy.update(updates)
+                # Copy rather than mutate so the compiled set in use keeps seeing the old policy
+                policies = self.policies.copy()
+                policies[index] = {**policy, **updates}
+                self._compile_policies(policies)
                 return True
         return False
     
@@ -126,4 +115,4 @@ class PolicyEnforcer:
     
     def get_enforcement_log(self, limit: int = 50) -> List[Dict[str, Any]]:
         """Get recent enforcement logs"""
-        return self.enforcement_log[-limit:] if self.enforcement_log else []
\ No newline at end of file
+        return self.enforcement_log.latest(limit)
\ No newline at end of file
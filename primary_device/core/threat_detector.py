@@ -3,9 +3,11 @@ from datetime import datetime
 from typing import Dict, Any, List
 import hashlib
 
+from utils.ring_buffer import RingBuffer
+
 class ThreatDetector:
     def __init__(self):
-        self.detected_threats = []
+        self.detected_threats = RingBuffer(1000)
         self.threat_patterns = self._load_threat_patterns()
         self.analysis_stats = {
             "total_events": 0,
@@ -108,15 +110,12 @@ class ThreatDetector:
             "status": "detected"
         }
         
-        self.detected_threats.append(threat_entry)
-        
         # Keep only recent threats
-        if len(self.detected_threats) > 1000:
-            self.detected_threats = self.detected_threats[-1000:]
+        self.detected_threats.append(threat_entry)
     
     def get_recent_threats(self, count: int = 10) -> List[Dict[str, Any]]:
         """Get recent detected threats"""
-        return self.detected_threats[-count:] if self.detected_threats else []
+        return self.detected_threats.latest(count)
     
     def get_analysis_stats(self) -> Dict[str, Any]:
         """Get threat analysis statistics"""
@@ -0,0 +1,72 @@
+import json
+import os
+import struct
+import zipfile
+from typing import Dict, Any, Tuple
+
+import numpy as np
+
+# Metadata travels inside the archive as a JSON string so loading never needs pickle
+METADATA_KEY = "__metadata__"
+
+_LOCAL_HEADER = struct.Struct("<4s5H3I2H")
+_LOCAL_HEADER_SIGNATURE = b"PK\x03\x04"
+
+def save_npz_artifact(path: str, arrays: Dict[str, np.ndarray], metadata: Dict[str, Any]):
+    """Write arrays and metadata to an uncompressed .npz, atomically replacing any existing file"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    # Stored (uncompressed) members keep every array at a fixed file offset, which is what makes mmap loading possible
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "wb") as artifact_file:
+        np.savez(artifact_file, **arrays, **{METADATA_KEY: np.array(json.dumps(metadata))})
+    os.replace(temp_path, path)
+
+def load_npz_artifact(path: str, mmap: bool = True) -> Tuple[Dict[str, np.ndarray], Dict[str, Any]]:
+    """Load an artifact written by save_npz_artifact, memory-mapping its arrays when possible"""
+    arrays = {}
+    with zipfile.ZipFile(path) as archive, open(path, "rb") as artifact_file:
+        for info in archive.infolist():
+            name = info.filename[:-len(".npy")] if info.filename.endswith(".npy") else info.filename
+            array = None
+            if mmap and info.compress_type == zipfile.ZIP_STORED:
+                array = _mmap_member(path, artifact_file, info)
+            if array is None:
+                with archive.open(info) as member:
+                    array = np.lib.format.read_array(member, allow_pickle=False)
+            arrays[name] = array
+
+    metadata = json.loads(str(arrays.pop(METADATA_KEY))) if METADATA_KEY in arrays else {}
+    return arrays, metadata
+
+def _mmap_member(path: str, artifact_file, info: zipfile.ZipInfo):
+    """Map one stored .npy member straight from the archive, or None if it cannot be mapped"""
+    artifact_file.seek(info.header_offset)
+    header = _LOCAL_HEADER.unpack(artifact_file.read(_LOCAL_HEADER.size))
+    if header[0] != _LOCAL_HEADER_SIGNATURE:
+        return None
+    name_length, extra_length = header[-2], header[-1]
+    artifact_file.seek(info.header_offset + _LOCAL_HEADER.size + name_length + extra_length)
+
+    version = np.lib.format.read_magic(artifact_file)
+    if version == (1, 0):
+        shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(artifact_file)
+    elif version == (2, 0):
+        shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(artifact_file)
+    else:
+        return None
+
+    # Object arrays need pickle and 0-d or empty arrays gain nothing from a mapping
+    if dtype.hasobject or len(shape) == 0 or 0 in shape:
+        return None
+
+    return np.memmap(
+        path,
+        dtype=dtype,
+        mode="r",
+        shape=shape,
+        order="F" if fortran_order else "C",
+        offset=artifact_file.tell()
+    )
@@ -1,61 +1,285 @@
 import numpy as np
 import asyncio
-from typing import Dict, Any, List
+import os
+import time
+from typing import Dict, Any, List, Optional, Sequence, Tuple
 from datetime import datetime
 
+from ml.artifacts import save_npz_artifact, load_npz_artifact
+
+# anomaly_score crosses this value exactly when the reconstruction error crosses the calibrated threshold
+ANOMALY_SCORE_AT_THRESHOLD = 0.7
+
 class AutoencoderModel:
-    def __init__(self):
-        self.model = None
+    def __init__(
+        self,
+        artifact_path: Optional[str] = None,
+        hidden_dims: Sequence[int] = (8, 4),
+        epochs: int = 50,
+        batch_size: int = 256,
+        learning_rate: float = 1e-3,
+        threshold_percentile: float = 99.0,
+        seed: int = 42
+    ):
+        self.artifact_path = artifact_path
+        self.hidden_dims = tuple(hidden_dims)
+        self.epochs = epochs
+        self.batch_size = batch_size
+        self.learning_rate = learning_rate
+        self.threshold_percentile = threshold_percentile
+        self.seed = seed
+
+        self.weights: List[np.ndarray] = []
+        self.biases: List[np.ndarray] = []
+        self.feature_mean: Optional[np.ndarray] = None
+        self.feature_std: Optional[np.ndarray] = None
+        self.threshold: Optional[float] = None
         self.is_trained = False
         self.training_history = []
-        
+        self.inference_stats = {
+            "batches": 0,
+            "samples": 0,
+            "total_seconds": 0.0,
+            "last_latency_ms": None
+        }
+
     async def initialize(self):
         """Initialize autoencoder model"""
-        # In production, this would load a pre-trained model
-        # For demo, we'll simulate model initialization
-        print("Autoencoder model initialized")
-        self.is_trained = True
-        
+        if self.artifact_path and os.path.exists(self.artifact_path):
+            self.load(self.artifact_path)
+            print(f"Autoencoder model loaded from {self.artifact_path}")
+        else:
+            print("Autoencoder model initialized (no trained weights found)")
+
+    @property
+    def input_dimension(self) -> Optional[int]:
+        return self.weights[0].shape[0] if self.weights else None
+
+    def _forward(self, inputs: np.ndarray) -> List[np.ndarray]:
+        """Activations of every layer; tanh on hidden layers, linear reconstruction"""
+        activations = [inputs]
+        last_layer = len(self.weights) - 1
+        for index, (weight, bias) in enumerate(zip(self.weights, self.biases)):
+            output = activations[-1] @ weight + bias
+            activations.append(output if index == last_layer else np.tanh(output))
+        return activations
+
+    def _standardize(self, features: np.ndarray) -> np.ndarray:
+        return (features - self.feature_mean) / self.feature_std
+
+    def reconstruction_errors(self, features: np.ndarray) -> np.ndarray:
+        """Per-sample mean squared reconstruction error over a feature matrix"""
+        standardized = self._standardize(np.asarray(features, dtype=np.float32))
+        reconstruction = self._forward(standardized)[-1]
+        return np.mean(np.square(reconstruction - standardized), axis=1)
+
+    def validation_score(self, features: np.ndarray) -> float:
+        """Mean squared reconstruction error in raw feature units (lower is better)"""
+        # Raw units keep models with different normalisations comparable
+        features = np.asarray(features, dtype=np.float32)
+        reconstruction = self._forward(self._standardize(features))[-1] * self.feature_std + self.feature_mean
+        return float(np.mean(np.square(reconstruction - features)))
+
+    def score_batch(self, features: np.ndarray) -> Dict[str, np.ndarray]:
+        """Batched inference: reconstruction error, anomaly score and verdict per row"""
+        started = time.perf_counter()
+        errors = self.reconstruction_errors(features)
+        anomaly_scores = np.minimum(errors / self.threshold * ANOMALY_SCORE_AT_THRESHOLD, 1.0)
+        elapsed = time.perf_counter() - started
+
+        self.inference_stats["batches"] += 1
+        self.inference_stats["samples"] += len(errors)
+        self.inference_stats["total_seconds"] += elapsed
+        self.inference_stats["last_latency_ms"] = round(elapsed * 1000, 3)
+
+        return {
+            "reconstruction_errors": errors,
+            "anomaly_scores": anomaly_scores,
+            "is_anomaly": errors > self.threshold
+        }
+
     async def detect_anomalies(self, features: List[float]) -> Dict[str, Any]:
         """Detect anomalies using autoencoder"""
         if not self.is_trained:
             return {"error": "Model not trained"}
-        
-        # Simulate reconstruction error calculation
-        reconstruction_error = np.random.normal(0.1, 0.05)
-        
-        # Determine anomaly score
-        anomaly_score = min(reconstruction_error * 10, 1.0)
-        
+
+        if len(features) != self.input_dimension:
+            return {"error": f"Expected {self.input_dimension} features, got {len(features)}"}
+
+        result = self.score_batch(np.asarray([features], dtype=np.float32))
+        reconstruction_error = float(result["reconstruction_errors"][0])
+        anomaly_score = float(result["anomaly_scores"][0])
+
         return {
             "anomaly_score": round(anomaly_score, 4),
             "reconstruction_error": round(reconstruction_error, 4),
-            "is_anomaly": anomaly_score > 0.7,
-            "threshold": 0.7,
+            "is_anomaly": bool(result["is_anomaly"][0]),
+            "threshold": round(self.threshold, 6),
+            "inference_ms": self.inference_stats["last_latency_ms"],
             "timestamp": datetime.utcnow().isoformat()
         }
-    
-    async def train_model(self, training_data: List[List[float]]):
+
+    def _initialize_weights(self, input_dimension: int, rng: np.random.Generator):
+        """Xavier-uniform float32 weights for a mirrored encoder/decoder"""
+        layer_sizes = [input_dimension, *self.hidden_dims, *reversed(self.hidden_dims[:-1]), input_dimension]
+        self.weights = []
+        self.biases = []
+        for fan_in, fan_out in zip(layer_sizes[:-1], layer_sizes[1:]):
+            limit = np.sqrt(6.0 / (fan_in + fan_out))
+            self.weights.append(rng.uniform(-limit, limit, (fan_in, fan_out)).astype(np.float32))
+            self.biases.append(np.zeros(fan_out, dtype=np.float32))
+
+    def _fit(self, features: np.ndarray, warm_start: bool = False) -> Tuple[float, np.ndarray]:
+        """Mini-batch Adam on mean squared reconstruction error; returns final loss and training errors"""
+        rng = np.random.default_rng(self.seed + len(self.training_history))
+
+        if warm_start:
+            # Continue from the current weights (copied, since loaded weights may be read-only maps)
+            # and keep the normalisation so scores stay comparable across updates
+            self.weights = [np.array(weight, dtype=np.float32) for weight in self.weights]
+            self.biases = [np.array(bias, dtype=np.float32) for bias in self.biases]
+            self.feature_mean = np.array(self.feature_mean, dtype=np.float32)
+            self.feature_std = np.array(self.feature_std, dtype=np.float32)
+        else:
+            self.feature_mean = features.mean(axis=0)
+            feature_std = features.std(axis=0)
+            # Constant columns (e.g. zero padding) would otherwise divide by zero
+            self.feature_std = np.where(feature_std > 1e-6, feature_std, 1.0).astype(np.float32)
+            self._initialize_weights(features.shape[1], rng)
+        standardized = self._standardize(features)
+
+        parameters = [*self.weights, *self.biases]
+        first_moments = [np.zeros_like(p) for p in parameters]
+        second_moments = [np.zeros_like(p) for p in parameters]
+        beta1, beta2, epsilon = 0.9, 0.999, 1e-8
+        step = 0
+
+        sample_count = len(standardized)
+        layer_count = len(self.weights)
+        epoch_loss = 0.0
+        for _ in range(self.epochs):
+            order = rng.permutation(sample_count)
+            epoch_loss = 0.0
+            for start in range(0, sample_count, self.batch_size):
+                batch = standardized[order[start:start + self.batch_size]]
+                activations = self._forward(batch)
+                residual = activations[-1] - batch
+                epoch_loss += float(np.square(residual).sum())
+
+                # Backpropagate d(mean squared error)/d(output) through every layer
+                gradient = (2.0 / residual.size) * residual
+                weight_gradients = [None] * layer_count
+                bias_gradients = [None] * layer_count
+                for layer in reversed(range(layer_count)):
+                    weight_gradients[layer] = activations[layer].T @ gradient
+                    bias_gradients[layer] = gradient.sum(axis=0)
+                    if layer > 0:
+                        gradient = (gradient @ self.weights[layer].T) * (1.0 - np.square(activations[layer]))
+
+                step += 1
+                correction1 = 1.0 - beta1 ** step
+                correction2 = 1.0 - beta2 ** step
+                for index, gradient_value in enumerate([*weight_gradients, *bias_gradients]):
+                    first_moments[index] = beta1 * first_moments[index] + (1.0 - beta1) * gradient_value
+                    second_moments[index] = beta2 * second_moments[index] + (1.0 - beta2) * np.square(gradient_value)
+                    update = self.learning_rate * (first_moments[index] / correction1) / (np.sqrt(second_moments[index] / correction2) + epsilon)
+                    # In-place so self.weights / self.biases see the update
+                    parameters[index] -= update.astype(np.float32)
+            epoch_loss /= standardized.size
+
+        return epoch_loss, self.reconstruction_errors(features)
+
+    async def train_model(self, training_data: List[List[float]], warm_start: bool = False):
         """Train the autoencoder model"""
-        # Simulate training process
+        features = np.asarray(training_data, dtype=np.float32)
+        if features.ndim != 2 or len(features) < 2:
+            return {"success": False, "error": "Training data must be a matrix with at least two samples"}
+
         print("Training autoencoder model...")
-        await asyncio.sleep(2)  # Simulate training time
-        
-        training_loss = np.random.uniform(0.01, 0.05)
+        # Training is CPU-bound; keep the event loop responsive
+        result = await asyncio.to_thread(self.fit, features, warm_start)
+
+        if self.artifact_path:
+            self.save(self.artifact_path)
+
+        return result
+
+    def fit(self, features: np.ndarray, warm_start: bool = False) -> Dict[str, Any]:
+        """Train synchronously and calibrate the threshold; warm_start fine-tunes the current weights"""
+        warm_start = warm_start and self.is_trained and self.input_dimension == features.shape[1]
+        started = time.perf_counter()
+        final_loss, training_errors = self._fit(features, warm_start)
+        training_seconds = time.perf_counter() - started
+
+        # Calibrate the anomaly threshold from the training error distribution
+        # Floored so a perfectly reconstructed training set cannot make the score divide by zero
+        self.threshold = max(float(np.percentile(training_errors, self.threshold_percentile)), 1e-12)
+        self.is_trained = True
+
         self.training_history.append({
             "timestamp": datetime.utcnow().isoformat(),
-            "loss": training_loss,
-            "samples": len(training_data)
+            "loss": final_loss,
+            "samples": len(features),
+            "threshold": self.threshold,
+            "warm_start": warm_start,
+            "training_seconds": round(training_seconds, 3)
         })
-        
-        self.is_trained = True
-        
+
         return {
             "success": True,
-            "final_loss": round(training_loss, 4),
-            "training_samples": len(training_data)
+            "warm_start": warm_start,
+            "final_loss": round(final_loss, 6),
+            "threshold": round(self.threshold, 6),
+            "threshold_percentile": self.threshold_percentile,
+            "training_samples": len(features),
+            "epochs": self.epochs,
+            "training_seconds": round(training_seconds, 3)
         }
-    
+
+    def save(self, path: str):
+        """Write weights, normalisation and threshold to an uncompressed .npz"""
+        arrays = {
+            "feature_mean": self.feature_mean,
+            "feature_std": self.feature_std,
+            "threshold": np.array(self.threshold, dtype=np.float64)
+        }
+        for index, (weight, bias) in enumerate(zip(self.weights, self.biases)):
+            arrays[f"weight_{index}"] = weight
+            arrays[f"bias_{index}"] = bias
+
+        save_npz_artifact(path, arrays, {
+            "model_type": "autoencoder",
+            "layers": len(self.weights),
+            "hidden_dims": list(self.hidden_dims),
+            "threshold_percentile": self.threshold_percentile,
+            "training_history": self.training_history[-1:]
+        })
+
+    def load(self, path: str, mmap: bool = True):
+        """Load weights from an .npz artifact, memory-mapped by default"""
+        arrays, metadata = load_npz_artifact(path, mmap=mmap)
+        layers = metadata["layers"]
+        self.weights = [arrays[f"weight_{index}"] for index in range(layers)]
+        self.biases = [arrays[f"bias_{index}"] for index in range(layers)]
+        self.feature_mean = arrays["feature_mean"]
+        self.feature_std = arrays["feature_std"]
+        self.threshold = float(arrays["threshold"])
+        self.hidden_dims = tuple(metadata.get("hidden_dims", self.hidden_dims))
+        self.threshold_percentile = metadata.get("threshold_percentile", self.threshold_percentile)
+        self.training_history = list(metadata.get("training_history", []))
+        self.is_trained = True
+
+    def get_inference_stats(self) -> Dict[str, Any]:
+        """Mean latency per batch and samples scored per second"""
+        stats = self.inference_stats
+        return {
+            "batches": stats["batches"],
+            "samples": stats["samples"],
+            "last_latency_ms": stats["last_latency_ms"],
+            "mean_latency_ms": round(stats["total_seconds"] / stats["batches"] * 1000, 3) if stats["batches"] else None,
+            "samples_per_second": round(stats["samples"] / stats["total_seconds"]) if stats["total_seconds"] > 0 else None
+        }
+
     def get_model_info(self) -> Dict[str, Any]:
         """Get model information"""
         return {
@@ -63,6 +287,9 @@ class AutoencoderModel:
             "is_trained": self.is_trained,
             "training_samples": sum([h["samples"] for h in self.training_history]),
             "last_training": self.training_history[-1]["timestamp"] if self.training_history else None,
-            "input_dimension": 10,  # Example dimension
-            "hidden_dimension": 6
-        }
\ No newline at end of file
+            "input_dimension": self.input_dimension,
+            "hidden_dimensions": list(self.hidden_dims),
+            "threshold": self.threshold,
+            "threshold_percentile": self.threshold_percentile,
+            "inference": self.get_inference_stats()
+        }
@@ -2,6 +2,23 @@ import numpy as np
 from typing import Dict, Any, List
 from datetime import datetime
 
+NETWORK_FEATURE_COUNT = 11
+SYSTEM_FEATURE_COUNT = 8
+
+PROTOCOLS = ['TCP', 'UDP', 'ICMP', 'HTTP', 'HTTPS', 'DNS']
+PROTOCOL_INDEX = {protocol: index for index, protocol in enumerate(PROTOCOLS)}
+
+# Column layout of the network feature matrix
+SIZE_COLUMN = 0
+PROTOCOL_COLUMN = 1
+ENTROPY_COLUMN = PROTOCOL_COLUMN + len(PROTOCOLS)
+FLAGS_COLUMN = ENTROPY_COLUMN + 1
+SOURCE_PORT_COLUMN = FLAGS_COLUMN + 1
+DEST_PORT_COLUMN = SOURCE_PORT_COLUMN + 1
+
+# Payload rows per bincount pass; bounds the (rows x 256) count matrix
+ENTROPY_CHUNK_ROWS = 4096
+
 class FeatureExtractor:
     def __init__(self):
         self.feature_names = [
@@ -37,11 +54,11 @@ class FeatureExtractor:
     
     def _encode_protocol(self, protocol: str) -> List[float]:
         """One-hot encode protocol"""
-        protocols = ['TCP', 'UDP', 'ICMP', 'HTTP', 'HTTPS', 'DNS']
-        encoding = [0.0] * len(protocols)
+        encoding = [0.0] * len(PROTOCOLS)
         
-        if protocol in protocols:
-            encoding[protocols.index(protocol)] = 1.0
+        index = PROTOCOL_INDEX.get(protocol)
+        if index is not None:
+            encoding[index] = 1.0
         
         return encoding
     
@@ -64,6 +81,72 @@ class FeatureExtractor:
         
         return entropy / 8.0  # Normalize by max entropy for bytes
     
+    def extract_network_features_batch(self, packets: List[Dict[str, Any]]) -> np.ndarray:
+        """Extract network features for many packets into one float32 matrix (same columns as extract_network_features)"""
+        count = len(packets)
+        features = np.zeros((count, NETWORK_FEATURE_COUNT), dtype=np.float32)
+        if count == 0:
+            return features
+        
+        features[:, SIZE_COLUMN] = np.fromiter((p.get('size', 0) for p in packets), dtype=np.float32, count=count) / 1500
+        
+        # One-hot protocol via the static index table; unknown protocols leave the row all zeros
+        protocol_indices = np.fromiter(
+            (PROTOCOL_INDEX.get(p.get('protocol', 'TCP'), -1) for p in packets), dtype=np.int64, count=count
+        )
+        known = protocol_indices >= 0
+        features[np.flatnonzero(known), PROTOCOL_COLUMN + protocol_indices[known]] = 1.0
+        
+        features[:, ENTROPY_COLUMN] = self._calculate_entropy_batch([p.get('payload', '') for p in packets])
+        features[:, FLAGS_COLUMN] = np.fromiter((p.get('flags', 0) for p in packets), dtype=np.float32, count=count) / 255
+        features[:, SOURCE_PORT_COLUMN] = np.fromiter((p.get('source_port', 0) for p in packets), dtype=np.float32, count=count) / 65535
+        features[:, DEST_PORT_COLUMN] = np.fromiter((p.get('dest_port', 0) for p in packets), dtype=np.float32, count=count) / 65535
+        return features
+    
+    def _calculate_entropy_batch(self, payloads: List[Any]) -> np.ndarray:
+        """Normalised Shannon entropy per payload from byte histograms"""
+        entropies = np.zeros(len(payloads), dtype=np.float32)
+        for start in range(0, len(payloads), ENTROPY_CHUNK_ROWS):
+            chunk = payloads[start:start + ENTROPY_CHUNK_ROWS]
+            
+            encoded = []
+            for offset, payload in enumerate(chunk):
+                if isinstance(payload, str) and not payload.isascii():
+                    # Entropy is defined over characters; only ASCII text maps one byte per character
+                    entropies[start + offset] = self._calculate_entropy(payload)
+                    encoded.append(b"")
+                elif isinstance(payload, (bytes, bytearray)):
+                    encoded.append(bytes(payload))
+                else:
+                    encoded.append(payload.encode("ascii") if payload else b"")
+            
+            lengths = np.fromiter((len(payload) for payload in encoded), dtype=np.int64, count=len(encoded))
+            if not lengths.any():
+                continue
+            
+            # One histogram pass for the whole chunk: bin = row * 256 + byte value
+            buffer = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+            rows = np.repeat(np.arange(len(encoded)), lengths)
+            counts = np.bincount(rows * 256 + buffer, minlength=len(encoded) * 256).reshape(len(encoded), 256)
+            
+            has_payload = lengths > 0
+            probabilities = counts[has_payload] / lengths[has_payload, None]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                plogp = np.where(probabilities > 0, probabilities * np.log2(probabilities), 0.0)
+            entropies[start + np.flatnonzero(has_payload)] = -plogp.sum(axis=1) / 8.0  # Normalize by max entropy for bytes
+        return entropies
+    
+    def extract_system_features_batch(self, system_data: List[Dict[str, Any]]) -> np.ndarray:
+        """Extract system features for many samples into one float32 matrix (same columns as extract_system_features)"""
+        count = len(system_data)
+        features = np.zeros((count, SYSTEM_FEATURE_COUNT), dtype=np.float32)
+        for column, (field, scale) in enumerate((
+            ('cpu_usage', 100), ('memory_usage', 100), ('disk_usage', 100),
+            ('active_connections', 1000), ('failed_logins', 10)
+        )):
+            features[:, column] = np.fromiter((d.get(field, 0) for d in system_data), dtype=np.float32, count=count) / scale
+        return features
+    
     async def extract_system_features(self, system_data: Dict[str, Any]) -> List[float]:
         """Extract features from system data"""
         features = [
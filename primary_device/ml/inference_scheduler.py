@@ -0,0 +1,167 @@
+import asyncio
+import time
+from collections import Counter, deque
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+# Upper bounds of the batch-size histogram buckets
+BATCH_SIZE_BUCKETS = (1, 8, 32, 128, 256, 1024)
+
+LATENCY_SAMPLE_SIZE = 10000
+
+class InferenceScheduler:
+    """Queues single analysis requests and runs them through ModelManager in dynamic micro-batches"""
+
+    def __init__(self, model_manager, max_batch_size: int = 256, max_wait_ms: float = 2.0, max_queue_size: int = 10000):
+        self.model_manager = model_manager
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000
+        self.queue: Optional[asyncio.Queue] = None
+        self.max_queue_size = max_queue_size
+        self.worker: Optional[asyncio.Task] = None
+        # Requests taken off the queue but not yet answered; stop() fails them along with the queue
+        self.current_batch: list = []
+
+        self.latencies_ms = deque(maxlen=LATENCY_SAMPLE_SIZE)
+        self.batch_sizes = Counter()
+        self.scheduler_stats = {
+            "requests": 0,
+            "batches": 0,
+            "failed_requests": 0
+        }
+
+    def start(self):
+        """Start the batching worker on the running event loop"""
+        if self.queue is None:
+            # Bounded so a stalled model applies backpressure to callers instead of growing memory
+            self.queue = asyncio.Queue(maxsize=self.max_queue_size)
+        if self.worker is None or self.worker.done():
+            self.worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the worker and fail anything still queued"""
+        if self.worker is not None:
+            self.worker.cancel()
+            try:
+                await self.worker
+            except asyncio.CancelledError:
+                pass
+            self.worker = None
+
+        unanswered, self.current_batch = self.current_batch, []
+        while self.queue is not None and not self.queue.empty():
+            unanswered.append(self.queue.get_nowait())
+        for _, _, future, _ in unanswered:
+            if not future.done():
+                future.set_exception(RuntimeError("Inference scheduler stopped"))
+
+    async def submit(self, data: Dict[str, Any], data_type: str = "network") -> Dict[str, Any]:
+        """Queue one data point and wait for its result from the next micro-batch"""
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((data, data_type, future, time.perf_counter()))
+        return await future
+
+    async def _collect_batch(self) -> List[Tuple[Dict[str, Any], str, asyncio.Future, float]]:
+        """Wait for one request, then gather more until the batch is full or max_wait has passed"""
+        batch = self.current_batch = [await self.queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            # Take whatever is already queued without yielding to the event loop
+            try:
+                batch.append(self.queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._collect_batch()
+            self.scheduler_stats["batches"] += 1
+            self.batch_sizes[self._bucket(len(batch))] += 1
+
+            # Feature layouts differ per data type, so each type is scored as its own matrix
+            by_type: Dict[str, list] = {}
+            for item in batch:
+                by_type.setdefault(item[1], []).append(item)
+
+            for data_type, items in by_type.items():
+                await self._score(data_type, items, len(batch))
+            self.current_batch = []
+
+    async def _score(self, data_type: str, items: list, batch_size: int):
+        try:
+            result = await self.model_manager.analyze_batch([item[0] for item in items], data_type)
+        except Exception as e:
+            self.scheduler_stats["failed_requests"] += len(items)
+            for _, _, future, _ in items:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        finished = time.perf_counter()
+        timestamp = datetime.utcnow().isoformat()
+        for index, (_, _, future, enqueued) in enumerate(items):
+            latency_ms = (finished - enqueued) * 1000
+            self.latencies_ms.append(latency_ms)
+            self.scheduler_stats["requests"] += 1
+            if future.done():
+                continue  # Caller went away
+
+            if "error" in result:
+                future.set_result({"error": result["error"], "batch_size": batch_size})
+                continue
+
+            future.set_result({
+                "combined_score": result["combined_scores"][index],
+                "is_anomaly": result["is_anomaly"][index],
+                "anomaly_score": round(result["anomaly_scores"][index], 4),
+                "outlier_score": round(result["outlier_scores"][index], 4),
+                "batch_size": batch_size,
+                "latency_ms": round(latency_ms, 3),
+                "timestamp": timestamp
+            })
+
+    @staticmethod
+    def _bucket(size: int) -> str:
+        for bound in BATCH_SIZE_BUCKETS:
+            if size <= bound:
+                return f"<={bound}"
+        return f">{BATCH_SIZE_BUCKETS[-1]}"
+
+    def get_scheduler_stats(self) -> Dict[str, Any]:
+        """Queue depth, batch-size distribution and request latency percentiles"""
+        latencies = np.fromiter(self.latencies_ms, dtype=np.float64, count=len(self.latencies_ms))
+        p50, p99 = np.percentile(latencies, [50, 99]).tolist() if len(latencies) else (None, None)
+        requests = self.scheduler_stats["requests"]
+        batches = self.scheduler_stats["batches"]
+        return {
+            **self.scheduler_stats,
+            "running": self.worker is not None and not self.worker.done(),
+            "queue_depth": self.queue.qsize() if self.queue is not None else 0,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "mean_batch_size": round(requests / batches, 2) if batches else None,
+            "batch_size_distribution": {
+                bucket: self.batch_sizes[bucket]
+                for bucket in [f"<={bound}" for bound in BATCH_SIZE_BUCKETS] + [f">{BATCH_SIZE_BUCKETS[-1]}"]
+                if self.batch_sizes[bucket]
+            },
+            "latency_ms": {
+                "p50": round(p50, 3) if p50 is not None else None,
+                "p99": round(p99, 3) if p99 is not None else None,
+                "samples": len(latencies)
+            }
+        }
@@ -1,50 +1,380 @@
 import asyncio
+import multiprocessing
+import os
+import time
 import numpy as np
-from typing import Dict, Any, List
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 
+from ml.artifacts import save_npz_artifact, load_npz_artifact
+
+EULER_GAMMA = 0.5772156649
+
+# Rows scored per vectorised pass; bounds the (rows x trees) working arrays
+SCORING_CHUNK_ROWS = 4096
+
+def _average_path_length(sizes: np.ndarray) -> np.ndarray:
+    """c(n): expected path length of an unsuccessful BST search over n points"""
+    sizes = np.asarray(sizes, dtype=np.float64)
+    lengths = np.zeros_like(sizes)
+    large = sizes > 2
+    lengths[large] = 2.0 * (np.log(sizes[large] - 1.0) + EULER_GAMMA) - 2.0 * (sizes[large] - 1.0) / sizes[large]
+    lengths[sizes == 2] = 1.0
+    return lengths
+
+def _build_tree(features: np.ndarray, rng: np.random.Generator, height_limit: int) -> Tuple[np.ndarray, ...]:
+    """Grow one isolation tree into flat (feature, threshold, left, right, size) arrays"""
+    feature = [-1]
+    threshold = [0.0]
+    left = [-1]
+    right = [-1]
+    size = [0]
+
+    stack = [(0, np.arange(len(features)), 0)]
+    while stack:
+        node, indices, depth = stack.pop()
+        size[node] = len(indices)
+        if depth >= height_limit or len(indices) <= 1:
+            continue
+
+        subset = features[indices]
+        minimums = subset.min(axis=0)
+        maximums = subset.max(axis=0)
+        splittable = np.flatnonzero(maximums > minimums)
+        if splittable.size == 0:
+            continue
+
+        split_feature = int(rng.choice(splittable))
+        split_value = rng.uniform(minimums[split_feature], maximums[split_feature])
+        goes_left = subset[:, split_feature] < split_value
+
+        left_node = len(feature)
+        for _ in range(2):
+            feature.append(-1)
+            threshold.append(0.0)
+            left.append(-1)
+            right.append(-1)
+            size.append(0)
+        feature[node] = split_feature
+        threshold[node] = split_value
+        left[node] = left_node
+        right[node] = left_node + 1
+
+        stack.append((left_node, indices[goes_left], depth + 1))
+        stack.append((left_node + 1, indices[~goes_left], depth + 1))
+
+    return (
+        np.asarray(feature, dtype=np.int32),
+        np.asarray(threshold, dtype=np.float32),
+        np.asarray(left, dtype=np.int32),
+        np.asarray(right, dtype=np.int32),
+        np.asarray(size, dtype=np.int32)
+    )
+
+def _build_tree_group(features: np.ndarray, seeds: List[int], sample_size: int, height_limit: int) -> List[Tuple[np.ndarray, ...]]:
+    """Worker entry point: grow one tree per seed, each on its own subsample"""
+    trees = []
+    for seed in seeds:
+        rng = np.random.default_rng(seed)
+        sample = features[rng.choice(len(features), size=sample_size, replace=False)]
+        trees.append(_build_tree(sample, rng, height_limit))
+    return trees
+
+
 class IsolationForestModel:
-    def __init__(self):
-        self.model = None
+    def __init__(
+        self,
+        artifact_path: Optional[str] = None,
+        n_estimators: int = 100,
+        max_samples: int = 256,
+        contamination: float = 0.1,
+        n_jobs: Optional[int] = None,
+        refresh_fraction: float = 0.25,
+        seed: int = 42
+    ):
+        self.artifact_path = artifact_path
+        self.n_estimators = n_estimators
+        self.max_samples = max_samples
+        self.contamination = contamination
+        self.n_jobs = n_jobs or os.cpu_count() or 1
+        # Share of trees regrown on new data by an incremental (warm start) update
+        self.refresh_fraction = refresh_fraction
+        self.seed = seed
+
+        # All trees share flat node arrays; child indices are absolute, roots index into them
+        self.node_feature: Optional[np.ndarray] = None
+        self.node_threshold: Optional[np.ndarray] = None
+        self.node_left: Optional[np.ndarray] = None
+        self.node_right: Optional[np.ndarray] = None
+        self.node_size: Optional[np.ndarray] = None
+        self.roots: Optional[np.ndarray] = None
+        self.leaf_adjustment: Optional[np.ndarray] = None
+        self.max_depth = 0
+        self.sample_size = 0
+        self.input_dimension: Optional[int] = None
+        self.threshold: Optional[float] = None
+
         self.is_trained = False
-        self.contamination = 0.1
-        
+        self.training_history = []
+        self.inference_stats = {
+            "batches": 0,
+            "samples": 0,
+            "total_seconds": 0.0,
+            "last_latency_ms": None
+        }
+
     async def initialize(self):
         """Initialize isolation forest model"""
-        print("Isolation Forest model initialized")
-        self.is_trained = True
-        
+        if self.artifact_path and os.path.exists(self.artifact_path):
+            self.load(self.artifact_path)
+            print(f"Isolation Forest model loaded from {self.artifact_path}")
+        else:
+            print("Isolation Forest model initialized (no trained trees found)")
+
+    def _path_lengths(self, features: np.ndarray) -> np.ndarray:
+        """Mean path length per row, walking every tree for every row in lockstep"""
+        row_count = len(features)
+        nodes = np.broadcast_to(self.roots, (row_count, len(self.roots))).copy()
+        depths = np.zeros(nodes.shape, dtype=np.float32)
+        rows = np.arange(row_count)[:, None]
+
+        for _ in range(self.max_depth):
+            split_features = self.node_feature[nodes]
+            internal = split_features >= 0
+            if not internal.any():
+                break
+            values = features[rows, np.where(internal, split_features, 0)]
+            goes_left = values < self.node_threshold[nodes]
+            nodes = np.where(internal, np.where(goes_left, self.node_left[nodes], self.node_right[nodes]), nodes)
+            depths += internal
+
+        # Leaves cut short by the height limit still hold several points; add their expected depth
+        return (depths + self.leaf_adjustment[nodes]).mean(axis=1)
+
+    def outlier_scores(self, features: np.ndarray) -> np.ndarray:
+        """Isolation score 2^(-E[h(x)] / c(sample_size)) per row; values near 1 are isolated quickly"""
+        features = np.asarray(features, dtype=np.float32)
+        if len(features) == 0:
+            return np.zeros(0, dtype=np.float64)
+        normaliser = float(_average_path_length(np.array([self.sample_size]))[0])
+        path_lengths = np.concatenate([
+            self._path_lengths(features[start:start + SCORING_CHUNK_ROWS])
+            for start in range(0, len(features), SCORING_CHUNK_ROWS)
+        ])
+        return np.power(2.0, -path_lengths / normaliser)
+
+    def score_batch(self, features: np.ndarray) -> Dict[str, np.ndarray]:
+        """Batched inference: isolation score and verdict per row"""
+        started = time.perf_counter()
+        outlier_scores = self.outlier_scores(features)
+        elapsed = time.perf_counter() - started
+
+        self.inference_stats["batches"] += 1
+        self.inference_stats["samples"] += len(outlier_scores)
+        self.inference_stats["total_seconds"] += elapsed
+        self.inference_stats["last_latency_ms"] = round(elapsed * 1000, 3)
+
+        return {
+            "outlier_scores": outlier_scores,
+            "is_outlier": outlier_scores > self.threshold
+        }
+
     async def detect_outliers(self, features: List[float]) -> Dict[str, Any]:
         """Detect outliers using isolation forest"""
         if not self.is_trained:
             return {"error": "Model not trained"}
-        
-        # Simulate outlier score calculation
-        outlier_score = np.random.uniform(0, 1)
-        
+
+        if len(features) != self.input_dimension:
+            return {"error": f"Expected {self.input_dimension} features, got {len(features)}"}
+
+        result = self.score_batch(np.asarray([features], dtype=np.float32))
+        outlier_score = float(result["outlier_scores"][0])
+
         return {
             "outlier_score": round(outlier_score, 4),
-            "is_outlier": outlier_score > 0.6,
+            "is_outlier": bool(result["is_outlier"][0]),
+            "threshold": round(self.threshold, 6),
             "contamination": self.contamination,
+            "inference_ms": self.inference_stats["last_latency_ms"],
             "timestamp": datetime.utcnow().isoformat()
         }
-    
-    async def train_model(self, training_data: List[List[float]], contamination: float = 0.1):
+
+    def _set_trees(self, trees: List[Tuple[np.ndarray, ...]]):
+        """Concatenate per-tree arrays into the flat forest layout"""
+        tree_sizes = [len(tree[0]) for tree in trees]
+        offsets = np.concatenate([[0], np.cumsum(tree_sizes)[:-1]]).astype(np.int32)
+
+        def shifted(children: np.ndarray, offset: int) -> np.ndarray:
+            return np.where(children >= 0, children + offset, -1).astype(np.int32)
+
+        self.node_feature = np.concatenate([tree[0] for tree in trees])
+        self.node_threshold = np.concatenate([tree[1] for tree in trees])
+        self.node_left = np.concatenate([shifted(tree[2], offset) for tree, offset in zip(trees, offsets)])
+        self.node_right = np.concatenate([shifted(tree[3], offset) for tree, offset in zip(trees, offsets)])
+        self.node_size = np.concatenate([tree[4] for tree in trees])
+        self.roots = offsets
+        self._prepare_scoring()
+
+    def _prepare_scoring(self):
+        """Derive leaf adjustments and the traversal bound from the stored node arrays"""
+        self.leaf_adjustment = _average_path_length(self.node_size).astype(np.float32)
+        self.max_depth = int(np.ceil(np.log2(max(self.sample_size, 2))))
+
+    def _split_trees(self) -> List[Tuple[np.ndarray, ...]]:
+        """Per-tree arrays with tree-local child indices, oldest tree first"""
+        bounds = [*self.roots.tolist(), len(self.node_feature)]
+        trees = []
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            left = np.asarray(self.node_left[start:end])
+            right = np.asarray(self.node_right[start:end])
+            trees.append((
+                np.array(self.node_feature[start:end]),
+                np.array(self.node_threshold[start:end]),
+                np.where(left >= 0, left - start, -1).astype(np.int32),
+                np.where(right >= 0, right - start, -1).astype(np.int32),
+                np.array(self.node_size[start:end])
+            ))
+        return trees
+
+    def _grow_trees(self, features: np.ndarray, count: int, sample_size: int) -> List[Tuple[np.ndarray, ...]]:
+        """Grow count trees, in parallel across trees when n_jobs > 1"""
+        height_limit = int(np.ceil(np.log2(max(sample_size, 2))))
+        seeds = np.random.default_rng([self.seed, len(self.training_history)]).integers(0, 2 ** 32, size=count).tolist()
+
+        workers = min(self.n_jobs, count)
+        if workers > 1:
+            seed_groups = [seeds[worker::workers] for worker in range(workers)]
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+                groups = list(pool.map(
+                    _build_tree_group,
+                    [features] * workers,
+                    seed_groups,
+                    [sample_size] * workers,
+                    [height_limit] * workers
+                ))
+            return [tree for group in groups for tree in group]
+        return _build_tree_group(features, seeds, sample_size, height_limit)
+
+    def _fit(self, features: np.ndarray, warm_start: bool = False) -> Tuple[np.ndarray, int]:
+        """Grow the forest or, on warm start, replace its oldest trees; returns training scores and trees grown"""
+        if warm_start:
+            # Path lengths are normalised by the original subsample size, so new trees reuse it
+            refreshed = max(1, int(round(len(self.roots) * self.refresh_fraction)))
+            kept_trees = self._split_trees()[refreshed:]
+            new_trees = self._grow_trees(features, refreshed, min(self.sample_size, len(features)))
+            trees = kept_trees + new_trees
+        else:
+            self.sample_size = min(self.max_samples, len(features))
+            trees = self._grow_trees(features, self.n_estimators, self.sample_size)
+            refreshed = len(trees)
+
+        self.input_dimension = features.shape[1]
+        self._set_trees(trees)
+        return self.outlier_scores(features), refreshed
+
+    def validation_score(self, features: np.ndarray) -> float:
+        """Mean isolation score over held-out normal traffic (lower is better)"""
+        return float(np.mean(self.outlier_scores(features)))
+
+    async def train_model(self, training_data: List[List[float]], contamination: Optional[float] = None, warm_start: bool = False):
         """Train the isolation forest model"""
-        self.contamination = contamination
-        
+        features = np.asarray(training_data, dtype=np.float32)
+        if features.ndim != 2 or len(features) < 2:
+            return {"success": False, "error": "Training data must be a matrix with at least two samples"}
+
+        if contamination is not None:
+            self.contamination = contamination
+
         print("Training Isolation Forest model...")
-        await asyncio.sleep(1)  # Simulate training time
-        
+        # Tree growth is CPU-bound; keep the event loop responsive
+        result = await asyncio.to_thread(self.fit, features, warm_start)
+
+        if self.artifact_path:
+            self.save(self.artifact_path)
+
+        return result
+
+    def fit(self, features: np.ndarray, warm_start: bool = False) -> Dict[str, Any]:
+        """Train synchronously and derive the threshold; warm_start refreshes refresh_fraction of the trees"""
+        warm_start = warm_start and self.is_trained and self.input_dimension == features.shape[1]
+        started = time.perf_counter()
+        training_scores, trees_grown = self._fit(features, warm_start)
+        training_seconds = time.perf_counter() - started
+
+        # The top contamination fraction of training scores is treated as outlying
+        self.threshold = float(np.percentile(training_scores, 100.0 * (1.0 - self.contamination)))
         self.is_trained = True
-        
+
+        self.training_history.append({
+            "timestamp": datetime.utcnow().isoformat(),
+            "samples": len(features),
+            "threshold": self.threshold,
+            "warm_start": warm_start,
+            "training_seconds": round(training_seconds, 3)
+        })
+
         return {
             "success": True,
-            "contamination": contamination,
-            "training_samples": len(training_data),
-            "estimated_outliers": int(len(training_data) * contamination)
+            "warm_start": warm_start,
+            "trees_grown": trees_grown,
+            "contamination": self.contamination,
+            "threshold": round(self.threshold, 6),
+            "training_samples": len(features),
+            "estimated_outliers": int(np.count_nonzero(training_scores > self.threshold)),
+            "trees": len(self.roots),
+            "nodes": len(self.node_feature),
+            "training_seconds": round(training_seconds, 3)
         }
-    
+
+    def save(self, path: str):
+        """Write the flat tree arrays to an uncompressed .npz"""
+        save_npz_artifact(path, {
+            "node_feature": self.node_feature,
+            "node_threshold": self.node_threshold,
+            "node_left": self.node_left,
+            "node_right": self.node_right,
+            "node_size": self.node_size,
+            "roots": self.roots
+        }, {
+            "model_type": "isolation_forest",
+            "n_estimators": len(self.roots),
+            "sample_size": self.sample_size,
+            "input_dimension": self.input_dimension,
+            "contamination": self.contamination,
+            "threshold": self.threshold,
+            "training_history": self.training_history[-1:]
+        })
+
+    def load(self, path: str, mmap: bool = True):
+        """Load trees from an .npz artifact, memory-mapped by default"""
+        arrays, metadata = load_npz_artifact(path, mmap=mmap)
+        self.node_feature = arrays["node_feature"]
+        self.node_threshold = arrays["node_threshold"]
+        self.node_left = arrays["node_left"]
+        self.node_right = arrays["node_right"]
+        self.node_size = arrays["node_size"]
+        self.roots = arrays["roots"]
+        self.n_estimators = metadata["n_estimators"]
+        self.sample_size = metadata["sample_size"]
+        self.input_dimension = metadata["input_dimension"]
+        self.contamination = metadata["contamination"]
+        self.threshold = metadata["threshold"]
+        self.training_history = list(metadata.get("training_history", []))
+        self._prepare_scoring()
+        self.is_trained = True
+
+    def get_inference_stats(self) -> Dict[str, Any]:
+        """Mean latency per batch and samples scored per second"""
+        stats = self.inference_stats
+        return {
+            "batches": stats["batches"],
+            "samples": stats["samples"],
+            "last_latency_ms": stats["last_latency_ms"],
+            "mean_latency_ms": round(stats["total_seconds"] / stats["batches"] * 1000, 3) if stats["batches"] else None,
+            "samples_per_second": round(stats["samples"] / stats["total_seconds"]) if stats["total_seconds"] > 0 else None
+        }
+
     def get_model_info(self) -> Dict[str, Any]:
         """Get model information"""
         return {
@@ -52,5 +382,12 @@ class IsolationForestModel:
             "is_trained": self.is_trained,
             "contamination": self.contamination,
             "algorithm": "Isolation Forest",
-            "version": "1.0"
-        }
\ No newline at end of file
+            "version": "2.0",
+            "trees": len(self.roots) if self.roots is not None else 0,
+            "nodes": len(self.node_feature) if self.node_feature is not None else 0,
+            "sample_size": self.sample_size,
+            "input_dimension": self.input_dimension,
+            "threshold": self.threshold,
+            "last_training": self.training_history[-1]["timestamp"] if self.training_history else None,
+            "inference": self.get_inference_stats()
+        }
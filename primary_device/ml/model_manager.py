@@ -1,27 +1,52 @@
 import asyncio
+import time
 from datetime import datetime
 from typing import Dict, Any, List
 
+from app.config import config
+from database.session import SessionLocal
 from ml.autoencoder_model import AutoencoderModel
 from ml.isolation_forest_model import IsolationForestModel
 from ml.feature_extractor import FeatureExtractor
+from ml.model_registry import ModelRegistry
+from ml.retraining import ReservoirSample
+
+MODEL_FACTORIES = {
+    "autoencoder": AutoencoderModel,
+    "isolation_forest": IsolationForestModel
+}
 
 class ModelManager:
     def __init__(self):
+        # Scoring reads these attributes once per call, so replacing them is an atomic hot swap
         self.autoencoder = AutoencoderModel()
         self.isolation_forest = IsolationForestModel()
+        self.registry = ModelRegistry(config.model_artifact_dir, MODEL_FACTORIES, SessionLocal)
+        self.active_versions = {model_type: None for model_type in MODEL_FACTORIES}
+        self.promotion_lock = asyncio.Lock()
         self.feature_extractor = FeatureExtractor()
+        # Uniform sample of recent normal traffic that the retraining pipeline learns from
+        self.training_reservoir = ReservoirSample(config.retraining_reservoir_size)
         self.model_health = {
             "autoencoder": "healthy",
             "isolation_forest": "healthy"
         }
+        self.is_initialized = False
         
     async def initialize_models(self):
         """Initialize all ML models"""
         print("Initializing ML models...")
         
-        await self.autoencoder.initialize()
-        await self.isolation_forest.initialize()
+        # Active versions are memory-mapped, so startup does not read the weights
+        for model_type in MODEL_FACTORIES:
+            model = self.registry.load_active(model_type)
+            if model is not None:
+                setattr(self, model_type, model)
+                self.active_versions[model_type] = self.registry.read_pointer(model_type)["active"]
+                print(f"{model_type} {self.active_versions[model_type]} loaded from registry")
+            else:
+                await getattr(self, model_type).initialize()
+        self.is_initialized = True
         
         print("All ML models initialized successfully")
     
@@ -33,9 +58,13 @@ class ModelManager:
         else:
             features = await self.feature_extractor.extract_system_features(data)
         
-        # Get predictions from both models
-        autoencoder_result = await self.autoencoder.detect_anomalies(features)
-        isolation_forest_result = await self.isolation_forest.detect_outliers(features)
+        # Get predictions from both models; a promotion mid-call does not affect this call
+        autoencoder, isolation_forest = self.autoencoder, self.isolation_forest
+        started = time.perf_counter()
+        autoencoder_result = await autoencoder.detect_anomalies(features)
+        autoencoder_done = time.perf_counter()
+        isolation_forest_result = await isolation_forest.detect_outliers(features)
+        finished = time.perf_counter()
         
         # Combine results
         combined_score = (
@@ -47,6 +76,8 @@ class ModelManager:
             autoencoder_result.get('is_anomaly', False) or
             isolation_forest_result.get('is_outlier', False)
         )
+        if not is_anomaly:
+            self._observe(features, data_type)
         
         return {
             "combined_score": round(combined_score, 4),
@@ -54,9 +85,60 @@ class ModelManager:
             "autoencoder_result": autoencoder_result,
             "isolation_forest_result": isolation_forest_result,
             "features_used": len(features),
+            "inference_ms": {
+                "autoencoder": round((autoencoder_done - started) * 1000, 3),
+                "isolation_forest": round((finished - autoencoder_done) * 1000, 3),
+                "total": round((finished - started) * 1000, 3)
+            },
             "timestamp": datetime.utcnow().isoformat()
         }
     
+    def _extract_batch(self, data_points: List[Dict[str, Any]], data_type: str):
+        if data_type == "network":
+            return self.feature_extractor.extract_network_features_batch(data_points)
+        return self.feature_extractor.extract_system_features_batch(data_points)
+    
+    async def analyze_batch(self, data_points: List[Dict[str, Any]], data_type: str = "network") -> Dict[str, Any]:
+        """Analyze many data points with one feature matrix and one inference pass per model"""
+        started = time.perf_counter()
+        features = self._extract_batch(data_points, data_type)
+        extracted = time.perf_counter()
+        
+        autoencoder, isolation_forest = self.autoencoder, self.isolation_forest
+        if not (autoencoder.is_trained and isolation_forest.is_trained):
+            # Untrained models cannot filter anomalies, so everything seeds the first training run
+            self._observe(features, data_type)
+            return {"error": "Models not trained", "batch_size": len(data_points)}
+        
+        autoencoder_result = autoencoder.score_batch(features)
+        isolation_forest_result = isolation_forest.score_batch(features)
+        finished = time.perf_counter()
+        
+        combined_scores = (autoencoder_result["anomaly_scores"] + isolation_forest_result["outlier_scores"]) / 2
+        is_anomaly = autoencoder_result["is_anomaly"] | isolation_forest_result["is_outlier"]
+        self._observe(features[~is_anomaly], data_type)
+        
+        return {
+            "batch_size": len(data_points),
+            "combined_scores": [round(score, 4) for score in combined_scores.tolist()],
+            "anomaly_scores": autoencoder_result["anomaly_scores"].tolist(),
+            "outlier_scores": isolation_forest_result["outlier_scores"].tolist(),
+            "is_anomaly": is_anomaly.tolist(),
+            "anomalies": int(is_anomaly.sum()),
+            "timing_ms": {
+                "feature_extraction": round((extracted - started) * 1000, 3),
+                "inference": round((finished - extracted) * 1000, 3),
+                "total": round((finished - started) * 1000, 3)
+            },
+            "timestamp": datetime.utcnow().isoformat()
+        }
+    
+    def _observe(self, features, data_type: str):
+        """Offer scored rows to the retraining reservoir"""
+        # Only one feature layout can be sampled; anomalies are kept out so retraining does not learn them as normal
+        if data_type == config.retraining_data_type:
+            self.training_reservoir.add(features)
+    
     async def health_check(self) -> Dict[str, Any]:
         """Check health of all models"""
         return {
@@ -76,34 +158,65 @@ class ModelManager:
             }
         }
     
-    async def train_models(self, training_data: List[Dict[str, Any]], data_type: str = "network"):
-        """Train all models with new data"""
+    async def train_models(self, training_data: List[Dict[str, Any]], data_type: str = "network", promote: bool = True):
+        """Train new model versions, register them and optionally promote them"""
         print("Training ML models...")
         
-        # Extract features from training data
-        features = []
-        for data_point in training_data:
-            if data_type == "network":
-                feature_vector = await self.feature_extractor.extract_network_features(data_point)
-            else:
-                feature_vector = await self.feature_extractor.extract_system_features(data_point)
-            features.append(feature_vector)
+        # Extract features from training data in one batch, off the event loop
+        features = await asyncio.to_thread(self._extract_batch, training_data, data_type)
+        
+        # Candidates are fresh objects; the active models keep scoring while they train
+        autoencoder = AutoencoderModel()
+        isolation_forest = IsolationForestModel()
+        autoencoder_result = await autoencoder.train_model(features)
+        isolation_forest_result = await isolation_forest.train_model(features)
         
-        # Train models
-        autoencoder_result = await self.autoencoder.train_model(features)
-        isolation_forest_result = await self.isolation_forest.train_model(features)
+        versions = {}
+        for model_type, model, result in (
+            ("autoencoder", autoencoder, autoencoder_result),
+            ("isolation_forest", isolation_forest, isolation_forest_result)
+        ):
+            if result.get("success"):
+                # Artifacts, the pointer file and the database row are written off the event loop
+                versions[model_type] = await asyncio.to_thread(
+                    self.registry.register, model_type, model, {"training": result, "data_type": data_type}
+                )
+                if promote:
+                    await self.promote_model(model_type, versions[model_type])
         
         return {
             "autoencoder_training": autoencoder_result,
             "isolation_forest_training": isolation_forest_result,
+            "registered_versions": versions,
+            "promoted": promote,
             "total_samples": len(features),
-            "feature_dimension": len(features[0]) if features else 0
+            "feature_dimension": features.shape[1]
         }
     
+    async def promote_model(self, model_type: str, version: str) -> Dict[str, Any]:
+        """Activate a registered version and hot swap it in"""
+        async with self.promotion_lock:
+            model = await asyncio.to_thread(self.registry.promote, model_type, version)
+            setattr(self, model_type, model)
+            self.active_versions[model_type] = version
+        return {"model_type": model_type, "active_version": version, "info": model.get_model_info()}
+    
+    async def rollback_model(self, model_type: str) -> Dict[str, Any]:
+        """Swap back to the previously active version"""
+        async with self.promotion_lock:
+            model = await asyncio.to_thread(self.registry.rollback, model_type)
+            setattr(self, model_type, model)
+            self.active_versions[model_type] = self.registry.read_pointer(model_type)["active"]
+        return {"model_type": model_type, "active_version": self.active_versions[model_type], "info": model.get_model_info()}
+    
     def get_model_stats(self) -> Dict[str, Any]:
         """Get model statistics"""
         return {
             "models_initialized": self.autoencoder.is_trained and self.isolation_forest.is_trained,
+            "autoencoder_inference": self.autoencoder.get_inference_stats(),
+            "isolation_forest_inference": self.isolation_forest.get_inference_stats(),
+            "active_versions": self.active_versions.copy(),
+            "training_reservoir": self.training_reservoir.get_reservoir_stats(),
             "feature_names": self.feature_extractor.get_feature_names(),
             "last_health_check": datetime.utcnow().isoformat()
         }
\ No newline at end of file
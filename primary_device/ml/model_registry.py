@@ -0,0 +1,191 @@
+import json
+import os
+import re
+import shutil
+import threading
+from datetime import datetime
+from typing import Dict, Any, Callable, List, Optional
+
+from models.database import AIModel, Base
+
+ARTIFACT_FILENAME = "model.npz"
+POINTER_FILENAME = "ACTIVE.json"
+
+_VERSION_PATTERN = re.compile(r"^v(\d{4,})$")
+
+class ModelRegistry:
+    """Versioned on-disk model artifacts with an atomically swapped active pointer per model type
+
+    Layout: <root>/<model_type>/v0001/model.npz ... plus <root>/<model_type>/ACTIVE.json naming the
+    active and previous versions. Version directories are immutable once published.
+    """
+
+    def __init__(self, root_dir: str, model_factories: Dict[str, Callable[[], Any]], session_factory: Optional[Callable[[], Any]] = None):
+        self.root_dir = root_dir
+        self.model_factories = model_factories
+        self.session_factory = session_factory
+        # Loaded model objects by (model_type, version); keeps the previous version warm for rollback
+        self.loaded_models: Dict[str, Dict[str, Any]] = {model_type: {} for model_type in model_factories}
+        # register() runs from worker threads; concurrent calls must not pick the same version number
+        self.register_lock = threading.Lock()
+
+        if self.session_factory is not None:
+            session = self.session_factory()
+            try:
+                Base.metadata.create_all(bind=session.get_bind(), tables=[AIModel.__table__])
+            finally:
+                session.close()
+
+    def _model_dir(self, model_type: str) -> str:
+        if model_type not in self.model_factories:
+            raise ValueError(f"Unknown model type: {model_type}")
+        return os.path.join(self.root_dir, model_type)
+
+    def artifact_path(self, model_type: str, version: str) -> str:
+        return os.path.join(self._model_dir(model_type), version, ARTIFACT_FILENAME)
+
+    def list_versions(self, model_type: str) -> List[str]:
+        """Published versions, oldest first"""
+        model_dir = self._model_dir(model_type)
+        if not os.path.isdir(model_dir):
+            return []
+        versions = [name for name in os.listdir(model_dir) if _VERSION_PATTERN.match(name)]
+        return sorted(versions, key=lambda name: int(name[1:]))
+
+    def read_pointer(self, model_type: str) -> Dict[str, Any]:
+        """Active/previous versions for a model type"""
+        pointer_path = os.path.join(self._model_dir(model_type), POINTER_FILENAME)
+        if not os.path.exists(pointer_path):
+            return {"active": None, "previous": None}
+        with open(pointer_path) as pointer_file:
+            return json.load(pointer_file)
+
+    def _write_pointer(self, model_type: str, pointer: Dict[str, Any]):
+        # Written beside the target then renamed over it, so readers see the old or new pointer, never a partial one
+        pointer_path = os.path.join(self._model_dir(model_type), POINTER_FILENAME)
+        temp_path = f"{pointer_path}.tmp"
+        with open(temp_path, "w") as pointer_file:
+            json.dump(pointer, pointer_file)
+            pointer_file.flush()
+            os.fsync(pointer_file.fileno())
+        os.replace(temp_path, pointer_path)
+
+    def register(self, model_type: str, model: Any, metrics: Optional[Dict[str, Any]] = None) -> str:
+        """Publish a trained model as a new immutable version; does not activate it"""
+        model_dir = self._model_dir(model_type)
+        os.makedirs(model_dir, exist_ok=True)
+
+        with self.register_lock:
+            versions = self.list_versions(model_type)
+            version = f"v{int(versions[-1][1:]) + 1 if versions else 1:04d}"
+
+            # Build the version in a staging directory and rename it into place in one step
+            staging_dir = os.path.join(model_dir, f".{version}.staging")
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            os.makedirs(staging_dir)
+            model.save(os.path.join(staging_dir, ARTIFACT_FILENAME))
+            os.rename(staging_dir, os.path.join(model_dir, version))
+
+        # Candidates are not cached; promote() loads the published artifact, so rejected ones are never held
+        self._record_version(model_type, version, model, metrics or {})
+        print(f"Registered {model_type} {version}")
+        return version
+
+    def load(self, model_type: str, version: str) -> Any:
+        """Model object for a version, memory-mapping its artifact on first use"""
+        cached = self.loaded_models[model_type].get(version)
+        if cached is not None:
+            return cached
+
+        artifact_path = self.artifact_path(model_type, version)
+        if not os.path.exists(artifact_path):
+            raise ValueError(f"{model_type} version {version} does not exist")
+
+        model = self.model_factories[model_type]()
+        model.load(artifact_path, mmap=True)
+        self.loaded_models[model_type][version] = model
+        return model
+
+    def load_active(self, model_type: str) -> Optional[Any]:
+        """Active model for a type, or None if nothing has been promoted"""
+        active = self.read_pointer(model_type)["active"]
+        if active is None:
+            return None
+        return self.load(model_type, active)
+
+    def promote(self, model_type: str, version: str) -> Any:
+        """Make a version active; returns the loaded model for the caller to swap in"""
+        # Load before touching the pointer so a bad artifact never becomes active
+        model = self.load(model_type, version)
+
+        pointer = self.read_pointer(model_type)
+        if pointer["active"] != version:
+            self._write_pointer(model_type, {
+                "active": version,
+                "previous": pointer["active"],
+                "updated_at": datetime.utcnow().isoformat()
+            })
+            self._set_active_record(model_type, version)
+            self._evict_cold_versions(model_type)
+        print(f"Promoted {model_type} {version}")
+        return model
+
+    def rollback(self, model_type: str) -> Any:
+        """Re-activate the previously active version"""
+        previous = self.read_pointer(model_type).get("previous")
+        if previous is None:
+            raise ValueError(f"No previous {model_type} version to roll back to")
+        return self.promote(model_type, previous)
+
+    def _evict_cold_versions(self, model_type: str):
+        """Keep only the active and previous versions loaded"""
+        pointer = self.read_pointer(model_type)
+        warm = {pointer["active"], pointer.get("previous")}
+        for version in list(self.loaded_models[model_type]):
+            if version not in warm:
+                del self.loaded_models[model_type][version]
+
+    def _record_version(self, model_type: str, version: str, model: Any, metrics: Dict[str, Any]):
+        if self.session_factory is None:
+            return
+        info = model.get_model_info()
+        session = self.session_factory()
+        try:
+            session.add(AIModel(
+                model_name=f"{model_type}-{version}",
+                model_type=model_type,
+                version=version,
+                accuracy=metrics.get("accuracy"),
+                last_trained=datetime.utcnow(),
+                is_active=False,
+                parameters={
+                    "artifact_path": self.artifact_path(model_type, version),
+                    "info": {key: value for key, value in info.items() if key != "inference"},
+                    "metrics": metrics
+                }
+            ))
+            session.commit()
+        finally:
+            session.close()
+
+    def _set_active_record(self, model_type: str, version: str):
+        if self.session_factory is None:
+            return
+        session = self.session_factory()
+        try:
+            for record in session.query(AIModel).filter(AIModel.model_type == model_type):
+                record.is_active = record.version == version
+            session.commit()
+        finally:
+            session.close()
+
+    def get_registry_info(self) -> Dict[str, Any]:
+        """Versions and active pointer per model type"""
+        return {
+            model_type: {
+                **self.read_pointer(model_type),
+                "versions": self.list_versions(model_type),
+                "loaded_versions": sorted(self.loaded_models[model_type])
+            }
+            for model_type in self.model_factories
+        }
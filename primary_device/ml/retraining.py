@@ -0,0 +1,235 @@
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+import numpy as np
+
+from ml.autoencoder_model import AutoencoderModel
+from ml.isolation_forest_model import IsolationForestModel
+
+CANDIDATE_FACTORIES = {
+    "autoencoder": AutoencoderModel,
+    "isolation_forest": IsolationForestModel
+}
+
+
+class ReservoirSample:
+    """Uniform fixed-size sample of a feature stream (Algorithm R) in a preallocated float32 matrix"""
+
+    def __init__(self, capacity: int, seed: Optional[int] = None):
+        self.capacity = max(1, capacity)
+        self.samples: Optional[np.ndarray] = None
+        self.size = 0
+        self.seen = 0
+        self.rng = np.random.default_rng(seed)
+
+    def add(self, features: np.ndarray):
+        """Offer a batch of feature rows to the sample"""
+        features = np.asarray(features, dtype=np.float32)
+        if features.ndim == 1:
+            features = features.reshape(1, -1)
+        if len(features) == 0:
+            return
+
+        if self.samples is None:
+            self.samples = np.zeros((self.capacity, features.shape[1]), dtype=np.float32)
+        elif features.shape[1] != self.samples.shape[1]:
+            raise ValueError(f"Expected {self.samples.shape[1]} features, got {features.shape[1]}")
+
+        # Fill phase: keep everything until the reservoir is full
+        fill = min(len(features), self.capacity - self.size)
+        self.samples[self.size:self.size + fill] = features[:fill]
+        self.size += fill
+        self.seen += fill
+
+        # Replacement phase: the i-th row of the stream lands in a uniform slot in [0, i) and is kept if that slot exists
+        rest = features[fill:]
+        if len(rest):
+            positions = self.seen + 1 + np.arange(len(rest))
+            slots = (self.rng.random(len(rest)) * positions).astype(np.int64)
+            kept = slots < self.capacity
+            self.samples[slots[kept]] = rest[kept]
+            self.seen += len(rest)
+
+    def snapshot(self) -> np.ndarray:
+        """Copy of the current sample, safe to hand to another process"""
+        if self.samples is None:
+            return np.zeros((0, 0), dtype=np.float32)
+        return self.samples[:self.size].copy()
+
+    def get_reservoir_stats(self) -> Dict[str, Any]:
+        return {
+            "capacity": self.capacity,
+            "size": self.size,
+            "seen": self.seen,
+            "feature_dimension": self.samples.shape[1] if self.samples is not None else None
+        }
+
+
+def _train_candidates(train: np.ndarray, validation: np.ndarray, active_artifacts: Dict[str, Optional[str]], settings: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Worker entry point: update each model from its active version and score both on the validation split"""
+    candidates = {}
+    for model_type, artifact_path in active_artifacts.items():
+        model = CANDIDATE_FACTORIES[model_type](**settings.get(model_type, {}))
+        active_score = None
+        if artifact_path is not None:
+            model.load(artifact_path, mmap=True)
+            active_score = model.validation_score(validation)
+
+        # Incremental update of the active model when one exists, full training otherwise
+        training = model.fit(train, warm_start=artifact_path is not None)
+        candidates[model_type] = {
+            "model": model,
+            "training": training,
+            "active_score": active_score,
+            "candidate_score": model.validation_score(validation)
+        }
+    return candidates
+
+
+class RetrainingPipeline:
+    """Periodically updates the models from a reservoir of recent traffic in a worker process"""
+
+    def __init__(
+        self,
+        model_manager,
+        interval_seconds: int = 3600,
+        min_samples: int = 1000,
+        validation_fraction: float = 0.2,
+        max_regression: float = 0.05,
+        fine_tune_epochs: int = 10,
+        enabled: bool = True
+    ):
+        self.model_manager = model_manager
+        self.enabled = enabled
+        self.interval_seconds = interval_seconds
+        self.min_samples = min_samples
+        self.validation_fraction = validation_fraction
+        # Relative worsening of the validation score a candidate may show and still be published
+        self.max_regression = max_regression
+        self.candidate_settings = {
+            "autoencoder": {"epochs": fine_tune_epochs},
+            # Already inside a worker process; no nested pool
+            "isolation_forest": {"n_jobs": 1}
+        }
+        self.pool: Optional[ProcessPoolExecutor] = None
+        self.task: Optional[asyncio.Task] = None
+        self.run_lock = asyncio.Lock()
+        self.rng = np.random.default_rng()
+        self.history = []
+
+    def start(self) -> bool:
+        """Start the periodic retraining loop; returns whether it is running"""
+        if not self.enabled:
+            return False
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self._run())
+        return True
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            self.pool = None
+
+    def _ensure_pool(self) -> ProcessPoolExecutor:
+        # Started on the first run so idle instances never spawn a worker
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+        return self.pool
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            try:
+                await self.run_once()
+            except Exception as e:
+                print(f"Model retraining failed: {e}")
+
+    async def run_once(self) -> Dict[str, Any]:
+        """Retrain from the current reservoir and publish candidates that pass validation"""
+        if self.run_lock.locked():
+            return {"status": "skipped", "reason": "Retraining already in progress"}
+
+        async with self.run_lock:
+            reservoir = self.model_manager.training_reservoir
+            if reservoir.size < self.min_samples:
+                return {"status": "skipped", "reason": f"{reservoir.size} samples collected, {self.min_samples} required"}
+
+            started = time.perf_counter()
+            samples = reservoir.snapshot()
+            order = self.rng.permutation(len(samples))
+            validation_size = max(1, int(len(samples) * self.validation_fraction))
+            validation, train = samples[order[:validation_size]], samples[order[validation_size:]]
+
+            registry = self.model_manager.registry
+            active_artifacts = {}
+            for model_type in CANDIDATE_FACTORIES:
+                active_version = registry.read_pointer(model_type)["active"]
+                active_artifacts[model_type] = registry.artifact_path(model_type, active_version) if active_version else None
+
+            # Training runs in another process; the serving event loop only awaits the result
+            loop = asyncio.get_running_loop()
+            candidates = await loop.run_in_executor(
+                self._ensure_pool(), _train_candidates, train, validation, active_artifacts, self.candidate_settings
+            )
+
+            outcome = {}
+            for model_type, candidate in candidates.items():
+                outcome[model_type] = await self._publish(model_type, candidate)
+
+            run = {
+                "status": "completed",
+                "timestamp": datetime.utcnow().isoformat(),
+                "training_samples": len(train),
+                "validation_samples": len(validation),
+                "duration_seconds": round(time.perf_counter() - started, 3),
+                "models": outcome
+            }
+            self.history.append(run)
+            self.history = self.history[-20:]
+            return run
+
+    async def _publish(self, model_type: str, candidate: Dict[str, Any]) -> Dict[str, Any]:
+        """Register and promote a candidate unless its validation score regressed"""
+        active_score = candidate["active_score"]
+        candidate_score = candidate["candidate_score"]
+        result = {
+            "active_score": round(active_score, 6) if active_score is not None else None,
+            "candidate_score": round(candidate_score, 6),
+            "warm_start": candidate["training"].get("warm_start", False)
+        }
+
+        if active_score is not None and candidate_score > active_score * (1 + self.max_regression):
+            print(f"Retrained {model_type} rejected: validation score {candidate_score:.6f} vs {active_score:.6f}")
+            return {**result, "published": False, "reason": "validation regression"}
+
+        version = await asyncio.to_thread(
+            self.model_manager.registry.register,
+            model_type,
+            candidate["model"],
+            {"training": candidate["training"], "validation_score": candidate_score, "previous_validation_score": active_score}
+        )
+        await self.model_manager.promote_model(model_type, version)
+        return {**result, "published": True, "version": version}
+
+    def get_retraining_status(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "running": self.task is not None and not self.task.done(),
+            "in_progress": self.run_lock.locked(),
+            "interval_seconds": self.interval_seconds,
+            "min_samples": self.min_samples,
+            "max_regression": self.max_regression,
+            "reservoir": self.model_manager.training_reservoir.get_reservoir_stats(),
+            "last_run": self.history[-1] if self.history else None
+        }
@@ -43,7 +43,8 @@ class SystemLog(Base):
     log_level = Column(String)
     component = Column(String)
     message = Column(String)
-    metadata = Column(JSON)
+    # "metadata" is reserved on declarative models; the column keeps its name
+    log_metadata = Column("metadata", JSON)
 
 class AIModel(Base):
     __tablename__ = "ai_models"
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Literal
 from datetime import datetime
 from enum import Enum
 
@@ -21,6 +21,7 @@ class PolicyConfig(BaseModel):
     name: str
     description: str
     rules: Dict[str, Any]
+    action: Literal["block", "quarantine", "log", "allow"] = "log"
     enabled: bool = True
 
 class ThreatReport(BaseModel):
@@ -45,4 +46,9 @@ class AIAnalysisResult(BaseModel):
     is_anomaly: bool
     autoencoder_result: Dict[str, Any]
     isolation_forest_result: Dict[str, Any]
-    timestamp: datetime
\ No newline at end of file
+    timestamp: datetime
+
+class PacketBatchRequest(BaseModel):
+    # Either one dict per packet or one list per column (source, destination, protocol, size)
+    packets: Optional[List[Dict[str, Any]]] = None
+    columns: Optional[Dict[str, List[Any]]] = None
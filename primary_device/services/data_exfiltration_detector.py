@@ -3,9 +3,11 @@ from datetime import datetime
 from typing import Dict, Any, List
 import re
 
+from utils.ring_buffer import RingBuffer
+
 class DataExfiltrationDetector:
     def __init__(self):
-        self.suspicious_activities = []
+        self.suspicious_activities = RingBuffer(50)
         self.data_patterns = {
             "credit_card": r'\b(?:\d[ -]*?){13,16}\b',
             "ssn": r'\b\d{3}-\d{2}-\d{4}\b',
@@ -77,12 +79,9 @@ class DataExfiltrationDetector:
             **activity_data
         }
         
-        self.suspicious_activities.append(activity_entry)
-        
         # Keep only last 50 activities
-        if len(self.suspicious_activities) > 50:
-            self.suspicious_activities = self.suspicious_activities[-50:]
+        self.suspicious_activities.append(activity_entry)
     
     def get_recent_activities(self, count: int = 10) -> List[Dict[str, Any]]:
         """Get recent suspicious activities"""
-        return self.suspicious_activities[-count:] if self.suspicious_activities else []
\ No newline at end of file
+        return self.suspicious_activities.latest(count)
\ No newline at end of file
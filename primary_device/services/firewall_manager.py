@@ -1,8 +1,14 @@
 import asyncio
+import os
 from datetime import datetime
 from typing import Dict, Any, List, Set, Optional
 from enum import Enum
 
+from app.config import config
+from services.flow_table import FlowTable
+from services.rule_compiler import CompiledRuleSet
+from utils.decision_log import DecisionLog
+
 class RuleAction(Enum):
     ALLOW = "allow"
     BLOCK = "block"
@@ -11,7 +17,18 @@ class RuleAction(Enum):
 class FirewallManager:
     def __init__(self):
         self.rules = self._initialize_default_rules()
-        self.rule_log = []
+        self.rule_version = 0
+        # Replaced as a whole whenever rules change; evaluation reads it once per packet
+        self.compiled_rules = CompiledRuleSet(self.rules, self.rule_version)
+        self.rule_lock = asyncio.Lock()
+        self.flow_table = FlowTable(config.flow_table_max_entries, config.flow_table_idle_timeout)
+        self.rule_log = DecisionLog(
+            "fw_log",
+            ("source_ip", "destination_ip", "protocol", "decision", "matched_rule", "packet_size"),
+            capacity=config.decision_log_capacity,
+            path=os.path.join(config.decision_log_dir, "firewall.ndjson"),
+            flush_interval=config.decision_log_flush_interval
+        )
         
     def _initialize_default_rules(self) -> List[Dict[str, Any]]:
         """Initialize default firewall rules"""
@@ -53,96 +70,90 @@ class FirewallManager:
     
     async def evaluate_packet(self, packet_data: Dict[str, Any]) -> Dict[str, Any]:
         """Evaluate packet against firewall rules"""
-        decision = RuleAction.ALLOW.value  # Default allow
-        matched_rule = None
-        
-        # Sort rules by priority (descending)
-        sorted_rules = sorted(self.rules, key=lambda x: x["priority"], reverse=True)
+        compiled_rules = self.compiled_rules
+        flow_key = FlowTable.flow_key(packet_data)
         
-        for rule in sorted_rules:
-            if not rule["enabled"]:
-                continue
-                
-            if await self._check_condition(rule["condition"], packet_data):
-                decision = rule["action"]
-                matched_rule = rule
-                break  # First match wins
+        # Established flows reuse the verdict reached for their first packet under the same rule set
+        flow = self.flow_table.lookup(flow_key, compiled_rules.version)
+        if flow is not None:
+            decision, rule_id = flow.decision, flow.rule_id
+        else:
+            # First match by priority wins; no match means default allow
+            matched_rule = compiled_rules.match(packet_data)
+            decision = matched_rule["action"] if matched_rule else RuleAction.ALLOW.value
+            rule_id = matched_rule["id"] if matched_rule else None
+            self.flow_table.store(flow_key, compiled_rules.version, decision, rule_id)
         
         # Log the decision
-        log_entry = await self._log_decision(packet_data, decision, matched_rule)
+        log_id = self.rule_log.record(
+            packet_data.get("source"),
+            packet_data.get("destination"),
+            packet_data.get("protocol"),
+            decision,
+            rule_id,
+            packet_data.get("size")
+        )
         
         return {
             "decision": decision,
-            "matched_rule": matched_rule["id"] if matched_rule else None,
+            "matched_rule": rule_id,
+            "established_flow": flow is not None,
             "timestamp": datetime.utcnow().isoformat(),
-            "log_id": log_entry["log_id"]
+            "log_id": self.rule_log.format_id(log_id)
         }
     
-    async def _check_condition(self, condition: Dict[str, Any], packet_data: Dict[str, Any]) -> bool:
-        """Check if packet matches rule condition"""
-        condition_type = condition["type"]
-        values = condition["values"]
-        
-        if condition_type == "ip_blocklist":
-            return packet_data.get("source") in values or packet_data.get("destination") in values
-        
-        elif condition_type == "protocol":
-            return packet_data.get("protocol") in values
-        
-        elif condition_type == "port_blocklist":
-            # Simulate port extraction
-            return False  # Simplified for demo
-        
-        return False
-    
-    async def _log_decision(self, packet_data: Dict[str, Any], decision: str, rule: Optional[Dict[str, Any]]) -> Dict[str, Any]:
-        """Log firewall decision"""
-        log_entry = {
-            "log_id": f"fw_log_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}",
-            "timestamp": datetime.utcnow().isoformat(),
-            "source_ip": packet_data.get("source"),
-            "destination_ip": packet_data.get("destination"), 
-            "protocol": packet_data.get("protocol"),
-            "decision": decision,
-            "matched_rule": rule["id"] if rule else None,
-            "packet_size": packet_data.get("size")
-        }
-        
-        self.rule_log.append(log_entry)
-        
-        # Keep only last 1000 entries
-        if len(self.rule_log) > 1000:
-            self.rule_log = self.rule_log[-1000:]
-        
-        return log_entry
+    async def _compile_rules(self, rules: List[Dict[str, Any]]):
+        """Compile a rule list and swap it in; invalid rules raise before anything changes"""
+        # Feeds can take seconds to load, so compile off the event loop while the old set keeps serving
+        compiled = await asyncio.to_thread(CompiledRuleSet, rules, self.rule_version + 1)
+        self.rules = rules
+        self.rule_version = compiled.version
+        self.compiled_rules = compiled
     
     async def add_rule(self, rule: Dict[str, Any]) -> str:
         """Add new firewall rule"""
-        rule_id = f"rule_{len(self.rules) + 1:03d}"
-        rule["id"] = rule_id
-        self.rules.append(rule)
+        async with self.rule_lock:
+            rule_id = f"rule_{len(self.rules) + 1:03d}"
+            rule["id"] = rule_id
+            rule.setdefault("enabled", True)
+            await self._compile_rules(self.rules + [rule])
         return rule_id
     
     async def enable_rule(self, rule_id: str) -> bool:
         """Enable a firewall rule"""
-        for rule in self.rules:
-            if rule["id"] == rule_id:
-                rule["enabled"] = True
-                return True
-        return False
+        return await self._set_rule_enabled(rule_id, True)
     
     async def disable_rule(self, rule_id: str) -> bool:
         """Disable a firewall rule"""
-        for rule in self.rules:
-            if rule["id"] == rule_id:
-                rule["enabled"] = False
-                return True
+        return await self._set_rule_enabled(rule_id, False)
+    
+    async def _set_rule_enabled(self, rule_id: str, enabled: bool) -> bool:
+        async with self.rule_lock:
+            for index, rule in enumerate(self.rules):
+                if rule["id"] == rule_id:
+                    # Copy rather than mutate so the compiled set in use keeps seeing the old rule
+                    rules = self.rules.copy()
+                    rules[index] = {**rule, "enabled": enabled}
+                    await self._compile_rules(rules)
+                    return True
         return False
     
     def get_rules(self) -> List[Dict[str, Any]]:
         """Get all firewall rules"""
         return self.rules.copy()
     
+    def get_compiled_rule_stats(self) -> Dict[str, Any]:
+        """Get sizes of the compiled rule index"""
+        return self.compiled_rules.get_compiled_stats()
+    
+    def get_flow_stats(self) -> Dict[str, Any]:
+        """Get flow table hit rate and eviction counters"""
+        return self.flow_table.get_flow_stats()
+    
     def get_rule_log(self, limit: int = 50) -> List[Dict[str, Any]]:
         """Get recent firewall log entries"""
-        return self.rule_log[-limit:] if self.rule_log else []
\ No newline at end of file
+        return self.rule_log.latest(limit)
+    
+    def get_rule_log_stats(self) -> Dict[str, Any]:
+        """Get decision log write counters"""
+        return self.rule_log.get_log_stats()
\ No newline at end of file
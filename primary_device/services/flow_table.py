@@ -0,0 +1,95 @@
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Hashable, Optional, Tuple
+
+class FlowEntry:
+    __slots__ = ("rule_version", "decision", "rule_id", "expires_at", "packets")
+
+    def __init__(self, rule_version: int, decision: str, rule_id: Optional[str], expires_at: float):
+        self.rule_version = rule_version
+        self.decision = decision
+        self.rule_id = rule_id
+        self.expires_at = expires_at
+        self.packets = 1
+
+class FlowTable:
+    """Connection-tracking cache of firewall verdicts keyed by 5-tuple, with LRU and idle-timeout eviction"""
+
+    def __init__(self, max_entries: int = 65536, idle_timeout: float = 300):
+        self.max_entries = max(1, max_entries)
+        self.idle_timeout = idle_timeout
+        # Least recently seen flow first
+        self.flows: "OrderedDict[Hashable, FlowEntry]" = OrderedDict()
+        self.flow_stats = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "invalidations": 0
+        }
+
+    @staticmethod
+    def flow_key(packet_data: Dict[str, Any]) -> Tuple:
+        """5-tuple identifying the flow a packet belongs to"""
+        return (
+            packet_data.get("protocol"),
+            packet_data.get("source"),
+            packet_data.get("source_port"),
+            packet_data.get("destination"),
+            packet_data.get("destination_port")
+        )
+
+    def lookup(self, key: Hashable, rule_version: int, now: Optional[float] = None) -> Optional[FlowEntry]:
+        """Cached verdict for an established flow, or None if it must be evaluated"""
+        try:
+            entry = self.flows.get(key)
+        except TypeError:
+            entry = None  # A field holding a list or dict; such packets are never tracked
+        if entry is None:
+            self.flow_stats["misses"] += 1
+            return None
+
+        now = time.monotonic() if now is None else now
+        if entry.rule_version != rule_version:
+            # Decided under an older rule set
+            del self.flows[key]
+            self.flow_stats["invalidations"] += 1
+            self.flow_stats["misses"] += 1
+            return None
+        if entry.expires_at < now:
+            del self.flows[key]
+            self.flow_stats["expirations"] += 1
+            self.flow_stats["misses"] += 1
+            return None
+
+        entry.expires_at = now + self.idle_timeout
+        entry.packets += 1
+        self.flows.move_to_end(key)
+        self.flow_stats["hits"] += 1
+        return entry
+
+    def store(self, key: Hashable, rule_version: int, decision: str, rule_id: Optional[str], now: Optional[float] = None):
+        """Record the verdict for a new flow, evicting the least recently seen flows past capacity"""
+        now = time.monotonic() if now is None else now
+        try:
+            self.flows[key] = FlowEntry(rule_version, decision, rule_id, now + self.idle_timeout)
+        except TypeError:
+            return
+        self.flows.move_to_end(key)
+        while len(self.flows) > self.max_entries:
+            self.flows.popitem(last=False)
+            self.flow_stats["evictions"] += 1
+
+    def clear(self):
+        self.flows.clear()
+
+    def get_flow_stats(self) -> Dict[str, Any]:
+        """Hit rate and eviction counters for sizing the table"""
+        lookups = self.flow_stats["hits"] + self.flow_stats["misses"]
+        return {
+            **self.flow_stats,
+            "entries": len(self.flows),
+            "max_entries": self.max_entries,
+            "idle_timeout": self.idle_timeout,
+            "hit_rate": round(self.flow_stats["hits"] / lookups, 4) if lookups else None
+        }
@@ -35,13 +35,13 @@ class NetworkMonitor:
     async def _simulate_packet_capture(self):
         """Simulate packet capture for demonstration"""
         packet_types = [
-            {"protocol": "TCP", "risk": "low"},
-            {"protocol": "UDP", "risk": "low"},
-            {"protocol": "HTTP", "risk": "medium"},
-            {"protocol": "HTTPS", "risk": "low"},
-            {"protocol": "DNS", "risk": "low"},
-            {"protocol": "FTP", "risk": "high"},
-            {"protocol": "SSH", "risk": "medium"},
+            {"protocol": "TCP", "risk": "low", "ports": [8080, 5432, 3389]},
+            {"protocol": "UDP", "risk": "low", "ports": [123, 161, 5060]},
+            {"protocol": "HTTP", "risk": "medium", "ports": [80]},
+            {"protocol": "HTTPS", "risk": "low", "ports": [443]},
+            {"protocol": "DNS", "risk": "low", "ports": [53]},
+            {"protocol": "FTP", "risk": "high", "ports": [21]},
+            {"protocol": "SSH", "risk": "medium", "ports": [22]},
         ]
         
         while self.is_monitoring:
@@ -68,6 +68,8 @@ class NetworkMonitor:
             "source": random.choice(source_ips),
             "destination": random.choice(dest_ips),
             "protocol": packet_type["protocol"],
+            "source_port": random.randint(49152, 65535),
+            "destination_port": random.choice(packet_type["ports"]),
             "size": random.randint(64, 1500),
             "risk_level": packet_type["risk"],
             "flags": random.randint(0, 255),
@@ -0,0 +1,116 @@
+from typing import Dict, Any, List, Optional
+
+from utils.ip_index import IPRangeIndex
+
+PORT_COUNT = 65536
+
+class CompiledRuleSet:
+    """Immutable lookup structure for an ordered firewall rule list
+
+    Enabled rules are ranked by priority (ties keep list order) and every condition value is indexed
+    to the best rank that matches it, so a packet costs a few hash lookups, a bitmap test and a binary
+    search over the IP ranges regardless of how many rules exist. The first match by rank is the rule evaluate_packet returns.
+    """
+
+    def __init__(self, rules: List[Dict[str, Any]], version: int = 0):
+        self.version = version
+        # sorted() is stable, so equal priorities keep the order they were added in
+        self.ranked_rules = sorted(
+            (rule for rule in rules if rule.get("enabled", True)),
+            key=lambda rule: rule["priority"],
+            reverse=True
+        )
+        self.no_match = len(self.ranked_rules)
+
+        self.exact_ips: Dict[str, int] = {}
+        # CIDR blocks, ranges and feed entries; overlapping entries resolve to the best rank
+        self.ip_networks = IPRangeIndex(resolve="lowest_value")
+        self.protocol_ids: Dict[str, int] = {}
+        self.protocol_ranks: List[int] = []
+        self.port_bitmap = bytearray(PORT_COUNT // 8)
+        self.port_ranks: Dict[int, int] = {}
+
+        # Walk from lowest priority up so each index entry ends with the best rank for its value
+        for rank in range(self.no_match - 1, -1, -1):
+            self._index_rule(rank, self.ranked_rules[rank])
+        self.ip_networks.build()
+
+    def _index_rule(self, rank: int, rule: Dict[str, Any]):
+        condition = rule["condition"]
+        condition_type = condition["type"]
+        values = condition.get("values", [])
+
+        if condition_type == "ip_blocklist":
+            for value in values:
+                value = str(value)
+                if "/" in value or "-" in value:
+                    self.ip_networks.add(value, rank)
+                else:
+                    self.exact_ips[value] = rank
+            # Threat-intel feeds: files with one CIDR, range or address per line
+            for feed_path in condition.get("feeds", []):
+                self.ip_networks.load_file(feed_path, rank)
+
+        elif condition_type == "protocol":
+            for protocol in values:
+                protocol_id = self.protocol_ids.setdefault(protocol, len(self.protocol_ids))
+                if protocol_id == len(self.protocol_ranks):
+                    self.protocol_ranks.append(rank)
+                else:
+                    self.protocol_ranks[protocol_id] = rank
+
+        elif condition_type == "port_blocklist":
+            for port in values:
+                port = int(port)
+                if 0 <= port < PORT_COUNT:
+                    self.port_bitmap[port >> 3] |= 1 << (port & 7)
+                    self.port_ranks[port] = rank
+
+    def match(self, packet_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Highest-ranked rule matching the packet, or None"""
+        best = self.no_match
+        exact_ips = self.exact_ips
+        source = packet_data.get("source")
+        destination = packet_data.get("destination")
+
+        for address in (source, destination):
+            try:
+                rank = exact_ips.get(address, best)
+            except TypeError:
+                continue  # Unhashable field values cannot equal a listed address
+            if rank < best:
+                best = rank
+
+        if len(self.ip_networks):
+            lookup = self.ip_networks.lookup
+            rank = lookup(source)
+            if rank is not None and rank < best:
+                best = rank
+            rank = lookup(destination)
+            if rank is not None and rank < best:
+                best = rank
+
+        try:
+            protocol_id = self.protocol_ids.get(packet_data.get("protocol"))
+        except TypeError:
+            protocol_id = None
+        if protocol_id is not None and self.protocol_ranks[protocol_id] < best:
+            best = self.protocol_ranks[protocol_id]
+
+        for port in (packet_data.get("source_port"), packet_data.get("destination_port")):
+            if type(port) is int and 0 <= port < PORT_COUNT and self.port_bitmap[port >> 3] & (1 << (port & 7)):
+                rank = self.port_ranks[port]
+                if rank < best:
+                    best = rank
+
+        return self.ranked_rules[best] if best < self.no_match else None
+
+    def get_compiled_stats(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "active_rules": self.no_match,
+            "exact_ips": len(self.exact_ips),
+            "ip_networks": len(self.ip_networks),
+            "protocols": len(self.protocol_ids),
+            "ports": len(self.port_ranks)
+        }
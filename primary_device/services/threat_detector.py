@@ -3,9 +3,11 @@ from datetime import datetime
 from typing import Dict, Any, List
 import hashlib
 
+from utils.ring_buffer import RingBuffer
+
 class ThreatDetector:
     def __init__(self):
-        self.detected_threats = []
+        self.detected_threats = RingBuffer(100)
         self.threat_signatures = {
             "data_exfiltration": {
                 "patterns": ["large_outbound", "encrypted_stream", "off_hours"],
@@ -86,15 +88,12 @@ class ThreatDetector:
             **threat_data
         }
         
-        self.detected_threats.append(threat_entry)
-        
         # Keep only last 100 threats
-        if len(self.detected_threats) > 100:
-            self.detected_threats = self.detected_threats[-100:]
+        self.detected_threats.append(threat_entry)
     
     def get_recent_threats(self, count: int = 10) -> List[Dict[str, Any]]:
         """Get recent detected threats"""
-        return self.detected_threats[-count:] if self.detected_threats else []
+        return self.detected_threats.latest(count)
     
     def get_threat_stats(self) -> Dict[str, Any]:
         """Get threat detection statistics"""
@@ -106,5 +105,5 @@ class ThreatDetector:
         return {
             "total_threats": len(self.detected_threats),
             "threats_by_level": threat_levels,
-            "last_detection": self.detected_threats[-1]["timestamp"] if self.detected_threats else None
+            "last_detection": self.detected_threats.last()["timestamp"] if self.detected_threats else None
         }
\ No newline at end of file
@@ -3,17 +3,46 @@ from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional
 from enum import Enum
 
+from app.config import config
+from utils.ip_index import IPRangeIndex
+
 class TrustLevel(Enum):
     HIGH = "high"
     MEDIUM = "medium" 
     LOW = "low"
     UNTRUSTED = "untrusted"
 
+# Context trust by network zone of the requesting address
+NETWORK_ZONE_SCORES = {
+    "trusted_network": 0.85,
+    "vpn_connection": 0.75,
+    "untrusted_network": 0.5,
+    "threat_intel_match": 0.0
+}
+
 class ZeroTrustEngine:
     def __init__(self):
         self.device_profiles = {}
         self.user_sessions = {}
         self.access_policies = self._initialize_policies()
+        self.network_zones, self.threat_networks = self._initialize_network_context()
+    
+    def _initialize_network_context(self):
+        """Build the network zone and threat-intel IP indexes"""
+        network_zones = IPRangeIndex()
+        for network in config.trusted_networks:
+            network_zones.add(network, "trusted_network")
+        # Added last so a VPN pool carved out of a trusted block wins at equal size
+        for network in config.vpn_networks:
+            network_zones.add(network, "vpn_connection")
+        network_zones.build()
+        
+        threat_networks = IPRangeIndex()
+        if config.threat_intel_feed_path:
+            loaded = threat_networks.load_file(config.threat_intel_feed_path)
+            print(f"Loaded {loaded} threat intel networks from {config.threat_intel_feed_path}")
+        threat_networks.build()
+        return network_zones, threat_networks
         
     def _initialize_policies(self) -> List[Dict[str, Any]]:
         """Initialize zero trust policies"""
@@ -103,15 +132,18 @@ class ZeroTrustEngine:
         }
     
     async def _evaluate_context_trust(self, request: Dict[str, Any]) -> Dict[str, Any]:
-        """Evaluate context trustworthiness"""
-        # Simulate context evaluation
-        import random
-        score = random.uniform(0.5, 0.85)
+        """Evaluate context trustworthiness from the network the request comes from"""
+        source_ip = request.get("source_ip")
+        if source_ip in self.threat_networks:
+            network_type = "threat_intel_match"
+        else:
+            network_type = self.network_zones.lookup(source_ip) or "untrusted_network"
         
         return {
-            "score": score,
-            "factors": ["trusted_network", "normal_access_time", "geolocation_consistent"],
-            "network_type": "corporate"
+            "score": NETWORK_ZONE_SCORES[network_type],
+            "factors": [network_type],
+            "network_type": network_type,
+            "source_ip": source_ip
         }
     
     async def enforce_least_privilege(self, user_id: str, resource: str) -> List[str]:
@@ -0,0 +1,50 @@
+import asyncio
+
+import pytest
+
+from utils.ip_index import IPRangeIndex, parse_address
+
+
+def firewall_manager(monkeypatch, tmp_path):
+    pytest.importorskip("pydantic_settings")
+    from app.config import config
+    from services.firewall_manager import FirewallManager
+    monkeypatch.setattr(config, "decision_log_dir", str(tmp_path))
+    return FirewallManager()
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("10.0.0.1", (4, 0x0A000001)),
+    (" 10.0.0.1 ", (4, 0x0A000001)),
+    ("255.255.255.255", (4, 0xFFFFFFFF)),
+    ("2001:db8::1", (6, 0x20010DB8 << 96 | 1)),
+    ("10.1", None),
+    ("010.0.0.1", None),
+    ("256.0.0.1", None),
+    ("1.2.3.4:80", None),
+    ("not-an-ip", None),
+])
+def test_parse_address(text, expected):
+    assert parse_address(text) == expected
+
+
+@pytest.mark.parametrize("value", [["1.2.3.4"], {"x": 1}, {"1.2.3.4"}, None, 167772161])
+def test_non_string_addresses_are_not_addresses(value):
+    index = IPRangeIndex()
+    index.add("0.0.0.0/0")
+    assert parse_address(value) is None
+    assert index.lookup(value) is None
+
+
+@pytest.mark.parametrize("source", [["1.2.3.4"], {"x": 1}])
+def test_unhashable_source_gets_a_decision(source, monkeypatch, tmp_path):
+    manager = firewall_manager(monkeypatch, tmp_path)
+
+    async def run():
+        first = await manager.evaluate_packet({"source": source, "protocol": "HTTP"})
+        blocked = await manager.evaluate_packet({"source": source, "destination": "10.0.0.100"})
+        return first, blocked
+
+    first, blocked = asyncio.run(run())
+    assert (first["decision"], first["matched_rule"], first["established_flow"]) == ("allow", "rule_002", False)
+    assert (blocked["decision"], blocked["matched_rule"]) == ("block", "rule_001")
@@ -0,0 +1,175 @@
+import asyncio
+import random
+import warnings
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from core.packet_analyzer import PacketAnalyzer, PENDING_RECORD_BLOCK
+from utils.network_utils import NetworkUtils
+from utils.ring_buffer import ColumnarRingBuffer
+
+
+def make_packets(count, seed=0):
+    rng = random.Random(seed)
+    return [
+        {
+            "source": f"10.0.{rng.randint(0, 3)}.{rng.randint(0, 255)}",
+            "destination": rng.choice(["192.168.1.1", "2001:db8::7", "not-an-ip"]),
+            "protocol": rng.choice(["tcp", "UDP", "http", "gopher"]),
+            "size": rng.randint(0, 1500)
+        }
+        for _ in range(count)
+    ]
+
+
+def deterministic_analyzer():
+    """Analyzer whose scores depend only on the features, so both paths must agree"""
+    analyzer = PacketAnalyzer()
+    analyzer.is_initialized = True
+    analyzer._calculate_anomaly_score = lambda features: (features[2] * 7 + features[3]) % 1
+    analyzer._calculate_anomaly_scores = lambda features: (features[:, 2] * 7 + features[:, 3]) % 1
+    return analyzer
+
+
+def without_timestamps(packets):
+    return [{key: value for key, value in packet.items() if key != "timestamp"} for packet in packets]
+
+
+def test_feature_matrix_matches_single_packet_features():
+    analyzer = PacketAnalyzer()
+    packets = make_packets(200)
+    columns = analyzer._encode_columns(analyzer._to_columns(packets))
+    expected = np.array([analyzer._extract_features(packet) for packet in packets], dtype=np.float64)
+    np.testing.assert_array_equal(analyzer._extract_feature_matrix(columns), expected)
+
+
+def test_threat_levels_match_single_packet_thresholds():
+    analyzer = PacketAnalyzer()
+    scores = np.array([0.0, 0.5, 0.5000001, 0.7, 0.70001, 0.9, 0.95, 1.0])
+    codes = analyzer._determine_threat_levels(scores)
+    levels = [analyzer._determine_threat_level(score) for score in scores]
+    assert [["low", "medium", "high", "critical"][code] for code in codes] == levels
+
+
+def test_batch_and_single_paths_score_and_record_alike():
+    packets = make_packets(PENDING_RECORD_BLOCK + 10)
+    single, batch = deterministic_analyzer(), deterministic_analyzer()
+
+    async def run():
+        single_results = [await single.analyze_packet(packet) for packet in packets]
+        return single_results, await batch.analyze_batch(packets)
+
+    single_results, batch_result = asyncio.run(run())
+    assert batch_result["threat_levels"] == [result["threat_level"] for result in single_results]
+    assert batch_result["anomaly_scores"] == [result["anomaly_score"] for result in single_results]
+
+    count = len(packets)
+    recorded = without_timestamps(single.get_recent_packets(count))
+    assert recorded == without_timestamps(batch.get_recent_packets(count))
+    assert {packet["destination"] for packet in recorded} == {"192.168.1.1", "2001:db8::7", "not-an-ip"}
+    assert {packet["protocol"] for packet in recorded} <= {"tcp", "udp", "http", "unknown"}
+
+
+def test_columnar_batch_matches_packet_list():
+    packets = make_packets(50)
+    columns = {name: [packet[name] for packet in packets] for name in packets[0]}
+    from_list, from_columns = deterministic_analyzer(), deterministic_analyzer()
+    list_result = asyncio.run(from_list.analyze_batch(packets))
+    columns_result = asyncio.run(from_columns.analyze_batch(columns))
+    assert list_result["anomaly_scores"] == columns_result["anomaly_scores"]
+    assert without_timestamps(from_list.get_recent_packets(50)) == without_timestamps(from_columns.get_recent_packets(50))
+
+
+def test_pending_single_packets_are_recorded_before_a_batch():
+    analyzer = deterministic_analyzer()
+
+    async def run():
+        await analyzer.analyze_packet({"source": "10.0.0.1", "size": 10})
+        await analyzer.analyze_batch([{"source": "10.0.0.2", "size": 20}])
+        await analyzer.analyze_packet({"source": "10.0.0.3", "size": 30})
+
+    asyncio.run(run())
+    assert [packet["source"] for packet in analyzer.get_recent_packets(10)] == ["10.0.0.1", "10.0.0.2", "10.0.0.3"]
+
+
+def test_odd_field_values_are_recorded_without_errors():
+    analyzer = deterministic_analyzer()
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        asyncio.run(analyzer.analyze_batch([
+            {"source": ["10.0.0.1"], "destination": {"a": 1}, "protocol": ["tcp"], "size": None},
+            {"source": "10.0.0.1"}
+        ]))
+    first, second = analyzer.get_recent_packets(2)
+    assert (first["source"], first["destination"], first["protocol"], first["size"]) == ("unknown", "unknown", "unknown", 0)
+    assert (second["source"], second["protocol"]) == ("10.0.0.1", "tcp")
+
+
+def test_non_address_sources_and_destinations_keep_their_text():
+    analyzer = deterministic_analyzer()
+
+    async def run():
+        await analyzer.analyze_packet({"source": "db.internal", "destination": "10.0.0.5"})
+        await analyzer.analyze_batch([
+            {"source": "10.0.0.6", "destination": "api.example.com"},
+            {"source": "db.internal", "destination": "eth0"},
+            {"source": "", "destination": ["api.example.com"]}
+        ])
+        await analyzer.analyze_packet({"source": "2001:db8::1"})
+
+    asyncio.run(run())
+    recorded = [(packet["source"], packet["destination"]) for packet in analyzer.get_recent_packets(5)]
+    assert recorded == [
+        ("db.internal", "10.0.0.5"),
+        ("10.0.0.6", "api.example.com"),
+        ("db.internal", "eth0"),
+        ("unknown", "unknown"),
+        ("2001:db8::1", "unknown")
+    ]
+    assert analyzer.get_stats()["address_labels"] == 3
+
+
+def test_label_table_is_bounded(monkeypatch):
+    monkeypatch.setattr("core.packet_analyzer.ADDRESS_LABEL_CAPACITY", 2)
+    analyzer = deterministic_analyzer()
+    asyncio.run(analyzer.analyze_batch([{"source": f"host-{index}"} for index in range(4)]))
+    assert [packet["source"] for packet in analyzer.get_recent_packets(4)] == ["host-0", "host-1", "unknown", "unknown"]
+
+
+def test_pack_ip_address_rejects_unhashable_input():
+    assert NetworkUtils.pack_ip_address(["10.0.0.1"]) == bytes(16)
+    assert NetworkUtils.unpack_ip_address(NetworkUtils.pack_ip_address("10.0.0.1")) == "10.0.0.1"
+    assert NetworkUtils.unpack_ip_address(NetworkUtils.pack_ip_address("2001:db8::1")) == "2001:db8::1"
+
+
+@pytest.mark.parametrize("capacity", [1, 3, 8])
+def test_ring_buffer_wraparound_keeps_newest_records(capacity):
+    rng = random.Random(capacity)
+    ring = ColumnarRingBuffer(capacity, [("value", "i8"), ("half", "f8")])
+    expected = []
+    next_value = 0
+    for _ in range(200):
+        count = rng.randint(0, 2 * capacity + 1)
+        values = list(range(next_value, next_value + count))
+        next_value += count
+        if count == 1 and rng.random() < 0.5:
+            ring.append((values[0], values[0] / 2))
+        else:
+            ring.extend({"value": values, "half": [value / 2 for value in values]})
+        expected.extend(values)
+
+        assert len(ring) == min(len(expected), capacity)
+        for limit in (1, capacity // 2 + 1, capacity, capacity + 5):
+            newest = expected[-min(limit, capacity):]
+            latest = ring.latest(limit)
+            assert latest["value"].tolist() == newest
+            assert latest["half"].tolist() == [value / 2 for value in newest]
+    assert ring.total_appended == len(expected)
+
+
+def test_ring_buffer_broadcasts_scalar_columns():
+    ring = ColumnarRingBuffer(4, [("timestamp", "f8"), ("value", "i8")])
+    ring.extend({"timestamp": 1.5, "value": [1, 2, 3]})
+    assert ring.latest(3)["timestamp"].tolist() == [1.5, 1.5, 1.5]
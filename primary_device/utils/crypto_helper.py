@@ -1,7 +1,8 @@
 import hashlib
-import json
 from typing import Dict, Any
 
+from shared.utils.canonical import canonical_dumps
+
 class CryptoHelper:
     def __init__(self):
         self.hash_algorithm = "sha256"
@@ -12,9 +13,7 @@ class CryptoHelper:
     
     def generate_log_hash(self, log_entry: Dict[str, Any], previous_hash: str) -> str:
         """Generate hash for log entry with chain support"""
-        log_data = json.dumps(log_entry, sort_keys=True, default=str)
-        combined_data = f"{previous_hash}{log_data}"
-        return self.generate_hash(combined_data)
+        return hashlib.sha256(previous_hash.encode() + canonical_dumps(log_entry)).hexdigest()
     
     def verify_hash(self, data: str, expected_hash: str) -> bool:
         """Verify data against expected hash"""
@@ -0,0 +1,166 @@
+import asyncio
+import atexit
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+class DecisionLog:
+    """Ring of compact decision tuples with monotonic IDs, flushed to NDJSON in batches by a background task
+
+    record() only stores a tuple and bumps a counter; timestamps are formatted and dicts built when entries
+    are read or written out. The event loop is single-threaded, so the ring needs no lock.
+    """
+
+    def __init__(
+        self,
+        prefix: str,
+        fields: Sequence[str],
+        capacity: int = 65536,
+        path: Optional[str] = None,
+        flush_interval: float = 1.0
+    ):
+        self.fields = tuple(fields)
+        self.capacity = max(1, capacity)
+        self.records: List[Optional[Tuple[int, float, tuple]]] = [None] * self.capacity
+        # Process start in the prefix keeps IDs unique across restarts
+        self.id_prefix = f"{prefix}_{int(time.time())}_"
+        self.next_id = 0
+        self.flushed_id = 0
+        self.dropped = 0
+        self.write_failures = 0
+        self.path = path
+        self.flush_interval = flush_interval
+        # Wake the flusher early once half the ring is waiting to be written
+        self.flush_threshold = max(1, self.capacity // 2)
+        self.flush_event: Optional[asyncio.Event] = None
+        self.flush_task: Optional[asyncio.Task] = None
+        # record() calls _wake() once this ID is reached: first to start the flusher, then at the threshold
+        self.wake_id = 0 if self.path else sys.maxsize
+
+        if self.path:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            atexit.register(self._flush_remaining)
+
+    def record(self, *values: Any) -> int:
+        """Store one decision (values in field order) and return its sequence number"""
+        log_id = self.next_id
+        self.next_id = log_id + 1
+        self.records[log_id % self.capacity] = (log_id, time.time(), values)
+        if log_id >= self.wake_id:
+            self._wake(log_id)
+        return log_id
+
+    def _wake(self, log_id: int):
+        if self.flush_task is None:
+            self._start_flusher()
+        else:
+            self.flush_event.set()
+            self.wake_id = log_id + self.flush_threshold
+
+    def format_id(self, log_id: int) -> str:
+        """Public log ID for a sequence number returned by record()"""
+        return self.id_prefix + str(log_id)
+
+    def _start_flusher(self):
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return  # Not inside the event loop; the next record or atexit flushes
+        self.flush_event = asyncio.Event()
+        self.flush_task = asyncio.create_task(self._run_flusher())
+        self.wake_id = self.flushed_id + self.flush_threshold
+
+    async def _run_flusher(self):
+        while True:
+            try:
+                await asyncio.wait_for(self.flush_event.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self.flush_event.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                # The batch stays pending and is retried; back off rather than retry on every wake-up
+                self.write_failures += 1
+                print(f"Decision log write to {self.path} failed: {e}")
+                await asyncio.sleep(self.flush_interval)
+
+    def _pending(self) -> Tuple[int, List[Tuple[int, float, tuple]]]:
+        """End ID and the records written since the last flush that are still in the ring"""
+        end_id = self.next_id
+        oldest_available = max(0, end_id - self.capacity)
+        if self.flushed_id < oldest_available:
+            # Overwritten before the flusher caught up
+            self.dropped += oldest_available - self.flushed_id
+            self.flushed_id = oldest_available
+        return end_id, [self.records[log_id % self.capacity] for log_id in range(self.flushed_id, end_id)]
+
+    def _mark_flushed(self, end_id: int):
+        # Only after a successful write, so a failed batch is written by the next flush
+        self.flushed_id = max(self.flushed_id, end_id)
+        if self.flush_task is not None:
+            self.wake_id = self.flushed_id + self.flush_threshold
+
+    async def flush(self):
+        """Append pending records to the log file"""
+        end_id, pending = self._pending()
+        if pending and self.path:
+            await asyncio.to_thread(self._write, pending)
+        self._mark_flushed(end_id)
+
+    def _flush_remaining(self):
+        end_id, pending = self._pending()
+        if pending:
+            try:
+                self._write(pending)
+            except Exception as e:
+                self.write_failures += 1
+                print(f"Decision log write to {self.path} failed: {e}")
+                return
+        self._mark_flushed(end_id)
+
+    def _write(self, records: List[Tuple[int, float, tuple]]):
+        lines = [json.dumps(self._to_entry(record), default=str) for record in records]
+        with open(self.path, "a") as log_file:
+            log_file.write("\n".join(lines) + "\n")
+
+    def _to_entry(self, record: Tuple[int, float, tuple]) -> Dict[str, Any]:
+        log_id, timestamp, values = record
+        return {
+            "log_id": self.format_id(log_id),
+            "timestamp": datetime.utcfromtimestamp(timestamp).isoformat(),
+            **dict(zip(self.fields, values))
+        }
+
+    def latest(self, count: int) -> List[Dict[str, Any]]:
+        """The newest count entries, oldest first"""
+        end_id = self.next_id
+        first_id = max(0, end_id - self.capacity, end_id - max(0, int(count)))
+        return [self._to_entry(self.records[log_id % self.capacity]) for log_id in range(first_id, end_id)]
+
+    async def close(self):
+        """Stop the flusher and write everything still pending"""
+        if self.flush_task is not None:
+            self.flush_task.cancel()
+            try:
+                await self.flush_task
+            except asyncio.CancelledError:
+                pass
+            self.flush_task = None
+        await self.flush()
+
+    def get_log_stats(self) -> Dict[str, Any]:
+        return {
+            "recorded": self.next_id,
+            "flushed": self.flushed_id,
+            "pending": self.next_id - self.flushed_id,
+            "dropped": self.dropped,
+            "write_failures": self.write_failures,
+            "capacity": self.capacity,
+            "path": self.path
+        }
@@ -0,0 +1,199 @@
+import heapq
+import socket
+from array import array
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+ADDRESS_BITS = {4: 32, 6: 128}
+# Lookups first jump to a bucket by the top address bits, then binary-search only within it
+BUCKET_BITS = 16
+
+def _address_to_int(text: str) -> Tuple[int, int]:
+    """(IP version, integer value) of an address string; raises ValueError if it is not one"""
+    # Only IPv6 text contains a colon, so one strict inet_pton call settles it; inet_aton would be no
+    # faster and accepts shorthand such as "10.1" or octal octets
+    if ":" in text:
+        family, version = socket.AF_INET6, 6
+    else:
+        family, version = socket.AF_INET, 4
+    try:
+        return version, int.from_bytes(socket.inet_pton(family, text), "big")
+    except OSError:
+        raise ValueError(f"{text!r} is not an IP address") from None
+
+def parse_address(ip: Any) -> Optional[Tuple[int, int]]:
+    """(IP version, integer value) of an address, or None if it is not one
+
+    IPv4 text is decoded by one uncached inet_pton call, so new and repeated addresses cost the same;
+    IPv6 and padded or malformed text go through the cached parser.
+    """
+    if not isinstance(ip, str):
+        # Also keeps unhashable values (lists, dicts) away from the cache
+        return None
+    if ":" not in ip:
+        try:
+            return 4, int.from_bytes(socket.inet_pton(socket.AF_INET, ip), "big")
+        except OSError:
+            pass
+    return _parse_address_text(ip)
+
+@lru_cache(maxsize=65536)
+def _parse_address_text(text: str) -> Optional[Tuple[int, int]]:
+    try:
+        return _address_to_int(text.strip())
+    except ValueError:
+        return None
+
+def parse_network_spec(spec: str) -> Tuple[int, int, int]:
+    """(IP version, first, last) for a CIDR block ("10.0.0.0/8"), range ("10.0.0.1-10.0.0.9") or address"""
+    spec = spec.strip()
+    if "-" in spec:
+        first_text, last_text = spec.split("-", 1)
+        version, first = _address_to_int(first_text.strip())
+        last_version, last = _address_to_int(last_text.strip())
+        if last_version != version or last < first:
+            raise ValueError(f"Invalid address range {spec!r}")
+        return version, first, last
+
+    address_text, _, prefix_text = spec.partition("/")
+    version, address = _address_to_int(address_text)
+    bits = ADDRESS_BITS[version]
+    prefix_length = int(prefix_text) if prefix_text else bits
+    if not 0 <= prefix_length <= bits:
+        raise ValueError(f"Invalid prefix length in {spec!r}")
+    host_mask = (1 << (bits - prefix_length)) - 1
+    return version, address & ~host_mask, address | host_mask
+
+class IPRangeIndex:
+    """Longest-prefix-match index over CIDR blocks and address ranges, IPv4 and IPv6
+
+    Entries are compiled into sorted, disjoint segments per IP version, each carrying the value of the
+    entry that wins there: the flattened form of a compressed radix trie. A lookup indexes a 16-bit root
+    table (one trie level) and binary-searches the few segments in that bucket. With
+    resolve="most_specific" the narrowest covering entry wins (longest prefix match); with
+    resolve="lowest_value" the smallest value wins, which suits priority ranks.
+    """
+
+    def __init__(self, resolve: str = "most_specific"):
+        if resolve not in ("most_specific", "lowest_value"):
+            raise ValueError(f"Unknown resolve mode: {resolve}")
+        self.resolve = resolve
+        self.entries: Dict[int, List[Tuple[int, int, Any]]] = {4: [], 6: []}
+        self.entry_count = 0
+        # Per version: segment starts, segment ends, winning values, bucket offsets and bucket shift
+        self.tables: Dict[int, Tuple[List[int], List[int], List[Any], List[int], int]] = {}
+        self.is_built = False
+
+    def add(self, spec: str, value: Any = True):
+        """Add a CIDR block, address range or single address"""
+        version, first, last = parse_network_spec(str(spec))
+        self.entries[version].append((first, last, value))
+        self.entry_count += 1
+        self.is_built = False
+
+    def load_file(self, path: str, value: Any = True) -> int:
+        """Bulk-load one CIDR, range or address per line (first token; '#' starts a comment)"""
+        loaded = 0
+        entries = self.entries
+        with open(path) as feed:
+            for line_number, line in enumerate(feed, 1):
+                token = line.split("#", 1)[0].split(None, 1)
+                if not token:
+                    continue
+                try:
+                    version, first, last = parse_network_spec(token[0])
+                except ValueError:
+                    print(f"Skipping invalid entry on line {line_number} of {path}: {token[0]}")
+                    continue
+                entries[version].append((first, last, value))
+                loaded += 1
+        self.entry_count += loaded
+        self.is_built = loaded == 0 and self.is_built
+        return loaded
+
+    def build(self):
+        """Flatten the entries into disjoint segments; runs automatically on the next lookup after changes"""
+        for version, entries in self.entries.items():
+            starts, ends, values = self._flatten(entries)
+            shift = ADDRESS_BITS[version] - BUCKET_BITS
+            # offsets[b] is the first segment starting in bucket b; the segment before it may extend into b
+            offsets = [bisect_left(starts, bucket << shift) for bucket in range(1 << BUCKET_BITS)] + [len(starts)]
+            if version == 4:
+                # Packed machine words rather than int objects: one memory access per probe on large tables
+                starts, ends, offsets = array("Q", starts), array("Q", ends), array("Q", offsets)
+            self.tables[version] = (starts, ends, values, offsets, shift)
+        self.is_built = True
+
+    def _flatten(self, entries: List[Tuple[int, int, Any]]) -> Tuple[List[int], List[int], List[Any]]:
+        starts: List[int] = []
+        ends: List[int] = []
+        values: List[Any] = []
+
+        def emit(first: int, last: int, value: Any):
+            if ends and ends[-1] + 1 == first and values[-1] == value:
+                ends[-1] = last
+            else:
+                starts.append(first)
+                ends.append(last)
+                values.append(value)
+
+        # Sweep entries by start address with the covering ones in a heap ordered by preference (later
+        # entries win ties, so re-adding a block overrides it); finished entries leave the heap lazily
+        most_specific = self.resolve == "most_specific"
+        covering = []
+        position = 0
+        for first, index in sorted(zip((entry[0] for entry in entries), range(len(entries)))):
+            # Emit everything up to the new entry's start from whatever covers it
+            while covering and position < first:
+                _, _, last, value = covering[0]
+                if last < position:
+                    heapq.heappop(covering)
+                    continue
+                segment_end = min(last, first - 1)
+                emit(position, segment_end, value)
+                position = segment_end + 1
+            position = first
+
+            _, last, value = entries[index]
+            heapq.heappush(covering, (last - first if most_specific else value, -index, last, value))
+
+        while covering:
+            _, _, last, value = covering[0]
+            if last < position:
+                heapq.heappop(covering)
+                continue
+            emit(position, last, value)
+            position = last + 1
+        return starts, ends, values
+
+    def lookup(self, ip: Any) -> Optional[Any]:
+        """Value of the winning entry containing the address, or None"""
+        parsed = parse_address(ip)
+        if parsed is None:
+            return None
+        if not self.is_built:
+            self.build()
+        version, address = parsed
+        starts, ends, values, offsets, shift = self.tables[version]
+        bucket = address >> shift
+        index = bisect_right(starts, address, offsets[bucket], offsets[bucket + 1]) - 1
+        if index >= 0 and address <= ends[index]:
+            return values[index]
+        return None
+
+    def __contains__(self, ip: Any) -> bool:
+        return self.lookup(ip) is not None
+
+    def __len__(self) -> int:
+        return self.entry_count
+
+    def get_index_stats(self) -> Dict[str, Any]:
+        if not self.is_built:
+            self.build()
+        return {
+            "entries": self.entry_count,
+            "ipv4_segments": len(self.tables[4][0]),
+            "ipv6_segments": len(self.tables[6][0]),
+            "resolve": self.resolve
+        }
@@ -1,7 +1,21 @@
+import ipaddress
 import socket
 import subprocess
+from functools import lru_cache
 from typing import Optional, List, Dict, Any
 
+ADDRESS_INPUT_TYPES = (str, int, bytes, ipaddress.IPv4Address, ipaddress.IPv6Address)
+
+@lru_cache(maxsize=65536)
+def _pack_ip_address(ip: Any) -> bytes:
+    try:
+        address = ipaddress.ip_address(ip)
+    except ValueError:
+        return bytes(16)
+    if address.version == 4:
+        return b"\x00" * 10 + b"\xff\xff" + address.packed
+    return address.packed
+
 class NetworkUtils:
     @staticmethod
     def get_local_ip() -> str:
@@ -51,4 +65,20 @@ class NetworkUtils:
     @staticmethod
     def get_hostname() -> str:
         """Get system hostname"""
-        return socket.gethostname()
\ No newline at end of file
+        return socket.gethostname()
+    
+    @staticmethod
+    def pack_ip_address(ip: Any) -> bytes:
+        """16-byte form of an IPv4 or IPv6 address (IPv4 as IPv4-mapped); all zeros if not an address"""
+        # Only types ip_address() accepts reach the cache; anything else (e.g. an unhashable list) is no address
+        if not isinstance(ip, ADDRESS_INPUT_TYPES):
+            return bytes(16)
+        return _pack_ip_address(ip)
+    
+    @staticmethod
+    def unpack_ip_address(packed: bytes) -> Optional[str]:
+        """Inverse of pack_ip_address; None for the all-zero placeholder"""
+        if packed == bytes(16):
+            return None
+        address = ipaddress.IPv6Address(packed)
+        return str(address.ipv4_mapped or address)
@@ -0,0 +1,125 @@
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+
+
+class RingBuffer:
+    """Fixed-capacity buffer of the most recent items with O(1) append"""
+
+    __slots__ = ("capacity", "items", "next_index", "size")
+
+    def __init__(self, capacity: int):
+        self.capacity = max(1, int(capacity))
+        self.items: List[Any] = [None] * self.capacity
+        self.next_index = 0
+        self.size = 0
+
+    def append(self, item: Any):
+        """Add an item, overwriting the oldest once full"""
+        self.items[self.next_index] = item
+        self.next_index = (self.next_index + 1) % self.capacity
+        if self.size < self.capacity:
+            self.size += 1
+
+    def latest(self, count: int) -> List[Any]:
+        """The newest count items, oldest first"""
+        count = max(0, min(int(count), self.size))
+        if count == 0:
+            return []
+        start = (self.next_index - count) % self.capacity
+        if start + count <= self.capacity:
+            return self.items[start:start + count]
+        return self.items[start:] + self.items[:self.next_index]
+
+    def last(self) -> Optional[Any]:
+        """The newest item, or None when empty"""
+        if self.size == 0:
+            return None
+        return self.items[self.next_index - 1]
+
+    def clear(self):
+        self.items = [None] * self.capacity
+        self.next_index = 0
+        self.size = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self.latest(self.size))
+
+
+def _is_scalar(values: Any) -> bool:
+    return np.isscalar(values) or (isinstance(values, np.ndarray) and values.ndim == 0)
+
+
+class ColumnarRingBuffer:
+    """Fixed-capacity ring of records in a NumPy structured array with zero-copy views of the newest records"""
+
+    def __init__(self, capacity: int, dtype: Union[np.dtype, Sequence[Any]]):
+        self.capacity = max(1, int(capacity))
+        self.dtype = np.dtype(dtype)
+        # Every record is written twice, capacity apart, so the newest N records are
+        # always one contiguous slice regardless of where the ring wraps
+        self.records = np.zeros(2 * self.capacity, dtype=self.dtype)
+        self.next_index = 0
+        self.size = 0
+        self.total_appended = 0
+
+    def append(self, record: Sequence[Any]):
+        """Add one record given as a tuple in dtype field order"""
+        self.records[self.next_index] = record
+        self.records[self.next_index + self.capacity] = record
+        self.next_index = (self.next_index + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+        self.total_appended += 1
+
+    def extend(self, columns: Union[np.ndarray, Dict[str, Any]]):
+        """Add a block of records from a structured array or one array per field"""
+        if isinstance(columns, np.ndarray):
+            block = columns.astype(self.dtype, copy=False)
+        else:
+            # Scalars (e.g. one timestamp for the whole block) are broadcast
+            count = max((len(values) for values in columns.values() if not _is_scalar(values)), default=0)
+            block = np.zeros(count, dtype=self.dtype)
+            for name, values in columns.items():
+                block[name] = values
+
+        appended = len(block)
+        if appended == 0:
+            return
+        # Only the newest capacity records of an oversized block can survive
+        if appended > self.capacity:
+            block = block[-self.capacity:]
+
+        # Slice copies: the block lands contiguously in the doubled array, then its mirror is written
+        start = self.next_index
+        end = start + len(block)
+        self.records[start:end] = block
+        if end <= self.capacity:
+            self.records[start + self.capacity:end + self.capacity] = block
+        else:
+            split = self.capacity - start
+            self.records[start + self.capacity:] = block[:split]
+            self.records[:end - self.capacity] = block[split:]
+        self.next_index = end % self.capacity
+        self.size = min(self.size + len(block), self.capacity)
+        self.total_appended += appended
+
+    def latest(self, count: int) -> np.ndarray:
+        """View of the newest count records, oldest first; valid until the next append"""
+        count = max(0, min(int(count), self.size))
+        end = self.next_index + self.capacity
+        return self.records[end - count:end]
+
+    def __len__(self) -> int:
+        return self.size
+
+    def get_buffer_stats(self) -> Dict[str, Any]:
+        return {
+            "capacity": self.capacity,
+            "size": self.size,
+            "total_appended": self.total_appended,
+            "bytes_per_record": self.dtype.itemsize,
+            "allocated_bytes": self.records.nbytes
+        }
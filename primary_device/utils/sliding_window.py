@@ -0,0 +1,47 @@
+from typing import List, Optional
+
+
+class WindowCounter:
+    """Event count over a sliding time window, kept as a ring of one-second buckets"""
+
+    __slots__ = ("window", "buckets", "head_second", "total")
+
+    def __init__(self, window_seconds: int):
+        self.window = max(1, int(window_seconds))
+        self.buckets: List[int] = [0] * self.window
+        self.head_second: Optional[int] = None
+        self.total = 0
+
+    def _advance(self, second: int):
+        """Expire buckets that fell out of the window since the last call"""
+        if self.head_second is None:
+            self.head_second = second
+            return
+
+        elapsed = second - self.head_second
+        if elapsed <= 0:
+            return
+
+        if elapsed >= self.window:
+            # Idle for a whole window: everything has expired
+            self.buckets = [0] * self.window
+            self.total = 0
+        else:
+            # Each second is cleared once, so expiry is amortised O(1) per event
+            for expired in range(self.head_second + 1, second + 1):
+                slot = expired % self.window
+                self.total -= self.buckets[slot]
+                self.buckets[slot] = 0
+        self.head_second = second
+
+    def add(self, second: int, count: int = 1):
+        """Record events at the given epoch second"""
+        self._advance(second)
+        # Late events count toward the current second rather than reopening expired buckets
+        self.buckets[max(second, self.head_second) % self.window] += count
+        self.total += count
+
+    def count(self, second: int) -> int:
+        """Events within the window ending at the given epoch second"""
+        self._advance(second)
+        return self.total
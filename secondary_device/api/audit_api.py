@@ -32,21 +32,27 @@ async def get_audit_events(limit: int = 100, filters: Optional[Dict[str, Any]] =
 async def get_audit_trail(limit: int = 100, query: Optional[Dict[str, Any]] = None):
     """Get audit trail blocks"""
     try:
-        if query:
-            blocks = await audit_trail_manager.search_audit_trail(query, limit)
-        else:
-            trail_info = await audit_trail_manager.get_audit_trail_info()
-            blocks = await audit_trail_manager.search_audit_trail({}, limit)
+        blocks = await audit_trail_manager.search_audit_trail(query or {}, limit)
+        integrity = await audit_trail_manager.verify_audit_integrity()
         
         return {
             "blocks": blocks,
-            "trail_info": await audit_trail_manager.get_audit_trail_info(),
-            "integrity": await audit_trail_manager.verify_audit_integrity()
+            "trail_info": await audit_trail_manager.get_audit_trail_info(integrity),
+            "integrity": integrity
         }
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get audit trail: {str(e)}")
 
+@router.post("/audit/trail/rescan")
+async def rescan_audit_trail():
+    """Run a full audit trail rescan from genesis"""
+    try:
+        return await audit_trail_manager.verify_audit_integrity(full=True)
+        
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Audit trail rescan failed: {str(e)}")
+
 @router.get("/compliance/frameworks")
 async def get_compliance_frameworks():
     """Get supported compliance frameworks"""
@@ -1,7 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException
 from typing import Dict, Any
 
+from app.config import config
 from core.signature_engine import SignatureEngine
+from core.batch_signer import SIGNATURE_MODE_MERKLE_BATCH
+from core.crypto_executor import CryptoPoolSaturated
 from core.alert_manager import AlertManager
 from core.audit_manager import AuditManager
 from services.audit_trail_manager import AuditTrailManager
@@ -43,14 +46,15 @@ async def get_crypto_status():
     """Get cryptographic system status"""
     try:
         health = await signature_engine.health_check()
-        public_key_fingerprint = await signature_engine.get_public_key_fingerprint()
         
         return {
             "key_initialized": health["key_initialized"],
-            "public_key_fingerprint": public_key_fingerprint,
+            "public_key_fingerprint": signature_engine.key_material.fingerprint,
             "signature_stats": health["signature_stats"],
-            "algorithm": "RSA-PSS-SHA256",
-            "key_size": 2048
+            "executor_stats": health["executor_stats"],
+            "algorithm": health["algorithm"]["algorithm"],
+            "key_size": health["algorithm"]["key_size"],
+            "supported_algorithms": health["supported_algorithms"]
         }
         
     except Exception as e:
@@ -61,11 +65,10 @@ async def get_audit_status():
     """Get audit trail status"""
     try:
         audit_info = await audit_trail_manager.get_audit_trail_info()
-        integrity_check = await audit_trail_manager.verify_audit_integrity()
         
         return {
             "block_count": audit_info["block_count"],
-            "integrity_verified": integrity_check["integrity"],
+            "integrity_verified": audit_info["integrity_verified"],
             "first_block_time": audit_info["first_block_time"],
             "last_block_time": audit_info["last_block_time"],
             "current_chain_hash": audit_info["current_chain_hash"]
@@ -91,8 +94,11 @@ async def sign_log_entry(signature_request: Dict[str, Any]):
         # Create data to sign
         data_to_sign = f"{log_hash}{previous_hash}{timestamp}{device_id}"
         
-        # Generate signature
-        signature_info = await signature_engine.sign_data(data_to_sign, totp_code)
+        # Generate signature, either directly or as a leaf of a Merkle batch
+        if config.signing_mode == "batched":
+            signature_info = await signature_engine.sign_data_batched(data_to_sign, totp_code)
+        else:
+            signature_info = await signature_engine.sign_data(data_to_sign, totp_code)
         
         # Prepare log data for audit trail
         log_data = {
@@ -118,13 +124,26 @@ async def sign_log_entry(signature_request: Dict[str, Any]):
             }
         )
         
-        return {
+        response = {
             "signature": signature_info["signature"],
             "signed_at": signature_info["timestamp"],
             "public_key": signature_info["public_key_fingerprint"],
             "audit_block_hash": audit_result["block_hash"]
         }
         
+        if signature_info.get("signature_mode") == SIGNATURE_MODE_MERKLE_BATCH:
+            response.update({
+                "signature_mode": SIGNATURE_MODE_MERKLE_BATCH,
+                "merkle_root": signature_info["merkle_root"],
+                "leaf_index": signature_info["leaf_index"],
+                "batch_size": signature_info["batch_size"],
+                "inclusion_proof": signature_info["inclusion_proof"]
+            })
+        
+        return response
+        
+    except CryptoPoolSaturated:
+        raise
     except Exception as e:
         # Log failed signing attempt
         await audit_manager.log_crypto_operation(
@@ -140,11 +159,13 @@ async def sign_log_entry(signature_request: Dict[str, Any]):
 async def get_public_key():
     """Get public key for verification"""
     try:
-        public_key_fingerprint = await signature_engine.get_public_key_fingerprint()
+        key_material = signature_engine.key_material
         
         return {
-            "public_key_fingerprint": public_key_fingerprint,
-            "algorithm": "RSA-2048",
+            "public_key_fingerprint": key_material.fingerprint,
+            "public_key": key_material.public_key_pem.decode('utf-8'),
+            "algorithm": key_material.key_algorithm,
+            "signature_algorithm": key_material.signer_backend.algorithm,
             "purpose": "signature_verification"
         }
         
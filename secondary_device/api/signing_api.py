@@ -3,6 +3,7 @@ from typing import Dict, Any
 
 from models.schemas import SignatureRequest, SignatureResponse
 from core.key_manager import KeyManager
+from core.crypto_executor import CryptoPoolSaturated
 from services.totp_generator import TOTPGenerator
 from services.secure_storage import SecureStorage
 
@@ -45,9 +46,12 @@ async def sign_log_entry(request: SignatureRequest, background_tasks: Background
         return SignatureResponse(
             signature=signature_info["signature"],
             signed_at=signature_info["timestamp"],
-            public_key=signature_info["public_key_fingerprint"]
+            public_key=signature_info["public_key_fingerprint"],
+            algorithm=signature_info["algorithm"]
         )
         
+    except CryptoPoolSaturated:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Signing failed: {str(e)}")
 
@@ -58,17 +62,23 @@ async def verify_signature(verification_data: Dict[str, Any]):
         data = verification_data.get("data")
         signature = verification_data.get("signature")
         public_key_pem = verification_data.get("public_key")
+        # A known key can be referenced by fingerprint instead of resending the PEM
+        public_key_fingerprint = verification_data.get("public_key_fingerprint")
         
-        if not all([data, signature, public_key_pem]):
+        if not all([data, signature]) or not (public_key_pem or public_key_fingerprint):
             raise HTTPException(status_code=400, detail="Missing required fields")
         
-        is_valid = await key_manager.verify_signature(data, signature, public_key_pem)
+        algorithm = verification_data.get("algorithm") or key_manager.signer_backend.algorithm
+        is_valid = await key_manager.verify_signature(data, signature, public_key_pem, algorithm, public_key_fingerprint)
         
         return {
             "verified": is_valid,
+            "algorithm": algorithm,
             "timestamp": "2024-01-01T00:00:00Z"  # Use actual timestamp
         }
         
+    except CryptoPoolSaturated:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Verification failed: {str(e)}")
 
@@ -1,12 +1,17 @@
-from fastapi import APIRouter, HTTPException
-from typing import Dict, Any, List, cast
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from typing import Dict, Any, List, Optional, cast
+import json
 
+from api.secondary_controller import signature_engine
+from core.crypto_executor import CryptoPoolSaturated
 from core.log_verifier import LogVerifier
 from services.verification_service import VerificationService
+from utils.block_stream import CONTENT_TYPE_FORMATS, STREAM_FORMAT_NDJSON
 
 router = APIRouter()
-log_verifier = LogVerifier()
-verification_service = VerificationService()
+log_verifier = LogVerifier(signature_engine)
+verification_service = VerificationService(signature_engine)
 
 @router.post("/verify/signature")
 async def verify_signature(verification_data: Dict[str, Any]):
@@ -15,17 +20,33 @@ async def verify_signature(verification_data: Dict[str, Any]):
         data = verification_data.get("data")
         signature = verification_data.get("signature")
         public_key = verification_data.get("public_key")
+        # A known key can be referenced by fingerprint instead of resending the PEM
+        public_key_fingerprint = verification_data.get("public_key_fingerprint")
         
-        if not all([data, signature, public_key]):
+        if not all([data, signature]) or not (public_key or public_key_fingerprint):
             raise HTTPException(status_code=400, detail="Missing required fields")
         
+        signed_data = {
+            "signature": signature,
+            "data_to_verify": data,
+            "algorithm": verification_data.get("algorithm"),
+            "public_key_fingerprint": public_key_fingerprint
+        }
+        
+        # Merkle-batched signatures also need the leaf's inclusion proof and the batch root
+        if verification_data.get("inclusion_proof") is not None:
+            signed_data["inclusion_proof"] = verification_data["inclusion_proof"]
+            signed_data["merkle_root"] = verification_data.get("merkle_root", "")
+        
         result = await log_verifier.verify_signature_integrity(
-            {"signature": signature, "data_to_verify": data},
-            cast(str, public_key)
+            signed_data,
+            public_key
         )
         
         return result
         
+    except CryptoPoolSaturated:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Signature verification failed: {str(e)}")
 
@@ -40,9 +61,23 @@ async def verify_chain_integrity(log_chain: List[Dict[str, Any]]):
         
         return result
         
+    except CryptoPoolSaturated:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Chain verification failed: {str(e)}")
 
+@router.post("/verify/chain/stream")
+async def verify_chain_stream(request: Request, stream_format: Optional[str] = None, progress_every: Optional[int] = None):
+    """Verify a chain streamed as NDJSON or length-prefixed blocks without buffering the whole export"""
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    stream_format = stream_format or CONTENT_TYPE_FORMATS.get(content_type, STREAM_FORMAT_NDJSON)
+    
+    async def events():
+        async for event in verification_service.verify_log_stream(request.stream(), stream_format, progress_every):
+            yield json.dumps(event) + "\n"
+    
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
 @router.post("/verify/batch")
 async def batch_verify(verification_requests: List[Dict[str, Any]]):
     """Batch verify multiple requests"""
@@ -55,6 +90,8 @@ async def batch_verify(verification_requests: List[Dict[str, Any]]):
             "timestamp": "2024-01-01T00:00:00Z"
         }
         
+    except CryptoPoolSaturated:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Batch verification failed: {str(e)}")
 
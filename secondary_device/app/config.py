@@ -20,6 +20,27 @@ class SecondaryConfig(BaseSettings):
     public_key_path: str = "./keys/public_key.pem"
     totp_secret: str = "BASE32SECRET3232"
     
+    # Signing
+    signature_algorithm: str = "RSA-PSS-SHA256"  # RSA-PSS-SHA256 | ECDSA-P256 | Ed25519
+    signing_mode: str = "direct"  # direct | batched
+    signing_batch_window_ms: float = 5.0
+    signing_batch_max_entries: int = 256
+    
+    # Crypto Executor
+    crypto_pool_enabled: bool = True
+    crypto_pool_workers: int = 0  # 0 uses one worker per CPU core
+    crypto_pool_max_pending: int = 1024
+    crypto_pool_retry_after: int = 1  # seconds, sent as Retry-After on 503
+    public_key_cache_size: int = 1024  # parsed public keys kept per process
+    
+    # Chain Verification
+    chain_verify_pool_enabled: bool = True
+    chain_verify_workers: int = 0  # 0 uses one worker per CPU core
+    chain_verify_chunk_size: int = 5000
+    chain_verify_min_parallel_blocks: int = 20000  # smaller chains are verified inline
+    chain_stream_max_block_bytes: int = 1024 * 1024
+    chain_stream_progress_every: int = 10000  # blocks between progress events
+    
     # Key Management
     key_rotation_days: int = 30
     backup_key_path: str = "./backup_keys/"
@@ -27,6 +48,12 @@ class SecondaryConfig(BaseSettings):
     # Audit Trail
     audit_trail_path: str = "./secure_storage/audit_trail.json"
     max_audit_blocks: int = 100000
+    audit_segment_dir: str = "./secure_storage/audit_segments"
+    audit_segment_max_bytes: int = 64 * 1024 * 1024
+    audit_fsync_policy: str = "batch"  # always | batch | interval
+    audit_fsync_every_records: int = 64
+    audit_fsync_interval_ms: int = 50
+    audit_full_rescan_interval: int = 3600  # seconds; 0 disables the scheduled rescan
     
     class Config:
         env_file = ".env"
@@ -1,22 +1,30 @@
-from fastapi import FastAPI, Depends, HTTPException, Security
+import os
+import sys
+
+# Started from the device directory: put the repository root on the path so the shared/ package imports.
+# Spawned worker processes inherit sys.path from here.
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if REPO_ROOT not in sys.path:
+    sys.path.append(REPO_ROOT)
+
+from fastapi import FastAPI, Depends, HTTPException, Request, Security
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 import uvicorn
-import os
 import inspect
 
 from app.config import config
-from api.secondary_controller import router as secondary_router
-from api.verification_api import router as verification_router
+from api.secondary_controller import router as secondary_router, signature_engine
+from api.verification_api import router as verification_router, log_verifier, verification_service
 from api.alert_api import router as alert_router
 from api.audit_api import router as audit_router
-from core.signature_engine import SignatureEngine
-from core.log_verifier import LogVerifier
+from core.crypto_executor import CryptoPoolSaturated
+from core.crypto_pool import crypto_executor, chain_engine
 from core.alert_manager import AlertManager
 from core.audit_manager import AuditManager
 from services.audit_trail_manager import AuditTrailManager
 from services.compliance_reporter import ComplianceReporter
-from services.verification_service import VerificationService
 from security.access_controller import AccessController
 from utils.secure_logger import setup_secure_logger
 
@@ -41,20 +49,26 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.exception_handler(CryptoPoolSaturated)
+async def crypto_pool_saturated_handler(request: Request, exc: CryptoPoolSaturated):
+    """Shed load from any route when the crypto pool queue is full"""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
 # Include routers
 app.include_router(secondary_router, prefix="/api/v1")
 app.include_router(verification_router, prefix="/api/v1")
 app.include_router(alert_router, prefix="/api/v1")
 app.include_router(audit_router, prefix="/api/v1")
 
-# Global instances
-signature_engine = SignatureEngine()
-log_verifier = LogVerifier()
+# Global instances; the signature engine, verifiers and crypto pool are the ones the routers serve with
 alert_manager = AlertManager()
 audit_manager = AuditManager()
 audit_trail_manager = AuditTrailManager()
 compliance_reporter = ComplianceReporter()
-verification_service = VerificationService()
 access_controller = AccessController()
 
 async def verify_token(credentials: HTTPAuthorizationCredentials = Security(security)):
@@ -73,6 +87,10 @@ async def startup_event():
     await signature_engine.initialize()
     logger.info("Signature engine initialized")
     
+    # One worker pool for every registered signing key and all verification
+    crypto_executor.start()
+    logger.info("Crypto worker pool started")
+    
     # Initialize audit trail
     await audit_trail_manager.initialize()
     logger.info("Audit trail manager initialized")
@@ -92,6 +110,9 @@ async def shutdown_event():
     """Secure cleanup on shutdown"""
     logger.info("Securely shutting down Secondary Device...")
     await signature_engine.secure_cleanup()
+    crypto_executor.shutdown()
+    chain_engine.shutdown()
+    await audit_trail_manager.close()
 
 @app.get("/")
 async def root():
@@ -1,8 +1,8 @@
 import asyncio
 from datetime import datetime
 from typing import Dict, Any, List
-import hashlib
-import json
+
+from shared.utils.canonical import record_hash, CANONICAL_HASH_FORMAT
 
 class AuditManager:
     def __init__(self):
@@ -29,7 +29,8 @@ class AuditManager:
             "ip_address": event_data.get("ip_address", ""),
             "user_agent": event_data.get("user_agent", ""),
             "signature_required": event_data.get("signature_required", False),
-            "compliance_category": event_data.get("compliance_category", "operational")
+            "compliance_category": event_data.get("compliance_category", "operational"),
+            "hash_format": CANONICAL_HASH_FORMAT
         }
         
         # Add cryptographic hash for integrity
@@ -46,9 +47,7 @@ class AuditManager:
     def _calculate_event_hash(self, event: Dict[str, Any]) -> str:
         """Calculate hash of audit event"""
         # Exclude event_hash from calculation
-        event_data = {k: v for k, v in event.items() if k != "event_hash"}
-        event_str = json.dumps(event_data, sort_keys=True, default=str)
-        return hashlib.sha256(event_str.encode()).hexdigest()
+        return record_hash(event, "event_hash")
     
     async def log_security_event(self, severity: str, description: str, metadata: Dict[str, Any] = None) -> str:
         """Log a security-specific audit event"""
@@ -0,0 +1,99 @@
+import asyncio
+from datetime import datetime
+from typing import Dict, Any, List, Tuple, Callable, Awaitable, Optional
+
+from utils.merkle import build_merkle_tree
+
+SIGNATURE_MODE_MERKLE_BATCH = "merkle_batch"
+
+class BatchSigner:
+    """Collects signing requests for a short window and signs one Merkle root per batch"""
+
+    def __init__(self, sign_root: Callable[[str], Awaitable[Dict[str, Any]]], window_ms: float = 5.0, max_entries: int = 256):
+        self.sign_root = sign_root
+        self.window = window_ms / 1000.0
+        self.max_entries = max(1, max_entries)
+        self.pending: List[Tuple[str, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self.batch_stats = {
+            "total_batches": 0,
+            "total_entries": 0,
+            "largest_batch": 0,
+            "failed_batches": 0,
+            "last_batch": None
+        }
+
+    async def submit(self, data: str) -> Dict[str, Any]:
+        """Queue data for the current batch and wait for its root signature and inclusion proof"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.pending.append((data, future))
+
+        if len(self.pending) >= self.max_entries:
+            self._dispatch(loop)
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.window, self._dispatch, loop)
+
+        return await future
+
+    def _take_batch(self) -> List[Tuple[str, asyncio.Future]]:
+        """Detach the pending entries as one batch"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        batch, self.pending = self.pending, []
+        return batch
+
+    def _dispatch(self, loop: asyncio.AbstractEventLoop):
+        """Close the current batch and sign it in the background"""
+        batch = self._take_batch()
+        if batch:
+            loop.create_task(self._sign_batch(batch))
+
+    async def flush(self):
+        """Sign everything collected so far as one Merkle batch"""
+        batch = self._take_batch()
+        if batch:
+            await self._sign_batch(batch)
+
+    async def _sign_batch(self, batch: List[Tuple[str, asyncio.Future]]):
+        """Build the Merkle tree, sign its root once and resolve every caller"""
+        try:
+            merkle_root, proofs = build_merkle_tree([data for data, _ in batch])
+            root_signature = await self.sign_root(merkle_root)
+        except Exception as e:
+            self.batch_stats["failed_batches"] += 1
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        batch_size = len(batch)
+        self.batch_stats["total_batches"] += 1
+        self.batch_stats["total_entries"] += batch_size
+        self.batch_stats["largest_batch"] = max(self.batch_stats["largest_batch"], batch_size)
+        self.batch_stats["last_batch"] = datetime.utcnow().isoformat()
+
+        for leaf_index, (data, future) in enumerate(batch):
+            if future.done():
+                continue
+            future.set_result({
+                **root_signature,
+                "signature_mode": SIGNATURE_MODE_MERKLE_BATCH,
+                "merkle_root": merkle_root,
+                "leaf_index": leaf_index,
+                "batch_size": batch_size,
+                "inclusion_proof": proofs[leaf_index]
+            })
+
+    def get_batch_stats(self) -> Dict[str, Any]:
+        """Get batching statistics"""
+        total_batches = self.batch_stats["total_batches"]
+        return {
+            **self.batch_stats,
+            "pending_entries": len(self.pending),
+            "average_batch_size": round(self.batch_stats["total_entries"] / total_batches, 2) if total_batches > 0 else 0,
+            "window_ms": self.window * 1000,
+            "max_entries": self.max_entries
+        }
@@ -0,0 +1,232 @@
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+from core.batch_signer import SIGNATURE_MODE_MERKLE_BATCH
+from utils.merkle import verify_batched_signature_info
+from shared.utils.canonical import record_hash, payload_hash
+
+FAILURE_MISSING_FIELDS = "missing_fields"
+FAILURE_HASH_MISMATCH = "hash_mismatch"
+FAILURE_DATA_HASH_MISMATCH = "data_hash_mismatch"
+FAILURE_BATCH_PROOF_INVALID = "batch_proof_invalid"
+FAILURE_CHAIN_BROKEN = "chain_broken"
+FAILURE_INVALID_GENESIS = "invalid_genesis"
+FAILURE_MALFORMED_STREAM = "malformed_stream"
+
+FAILURE_MESSAGES = {
+    FAILURE_MISSING_FIELDS: "missing required fields",
+    FAILURE_HASH_MISMATCH: "hash mismatch",
+    FAILURE_DATA_HASH_MISMATCH: "data hash mismatch",
+    FAILURE_BATCH_PROOF_INVALID: "batch inclusion proof invalid",
+    FAILURE_CHAIN_BROKEN: "chain broken",
+    FAILURE_INVALID_GENESIS: "is not a valid genesis block",
+    FAILURE_MALFORMED_STREAM: "could not be decoded"
+}
+
+def _check_block_contents(block: Dict[str, Any], index: int, required_fields: Sequence[str], check_data_hash: bool) -> Optional[str]:
+    """Everything about a block that does not depend on its neighbours"""
+    # The genesis block has its own field rules, checked by the caller
+    if index > 0 and any(field not in block for field in required_fields):
+        return FAILURE_MISSING_FIELDS
+
+    if block.get("block_hash") != record_hash(block, "block_hash"):
+        return FAILURE_HASH_MISMATCH
+
+    if check_data_hash and index > 0 and "log_data" in block:
+        if block.get("data_hash") != payload_hash(block["log_data"], block):
+            return FAILURE_DATA_HASH_MISMATCH
+
+    signature_info = block.get("signature_info") or {}
+    if signature_info.get("signature_mode") == SIGNATURE_MODE_MERKLE_BATCH:
+        data_to_sign = (block.get("log_data") or {}).get("data_to_sign", "")
+        if not verify_batched_signature_info(data_to_sign, signature_info):
+            return FAILURE_BATCH_PROOF_INVALID
+
+    return None
+
+def _verify_chunk(start_index: int, blocks: List[Dict[str, Any]], required_fields: Sequence[str], check_data_hash: bool) -> Optional[Tuple[int, str]]:
+    """Worker entry point: return (index, reason) for the first bad block in the chunk"""
+    for offset, block in enumerate(blocks):
+        failure = _check_block_contents(block, start_index + offset, required_fields, check_data_hash)
+        if failure is not None:
+            return start_index + offset, failure
+    return None
+
+
+class ChainVerificationEngine:
+    """Verifies hash chains by checking block contents in parallel chunks and linkage in one sequential pass"""
+
+    def __init__(self, max_workers: Optional[int] = None, chunk_size: int = 5000, min_parallel_blocks: int = 20000, enabled: bool = True):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.chunk_size = max(1, chunk_size)
+        self.min_parallel_blocks = min_parallel_blocks
+        self.enabled = enabled
+        self.pool: Optional[ProcessPoolExecutor] = None
+        self.engine_stats = {
+            "chains_verified": 0,
+            "blocks_verified": 0,
+            "failed_chains": 0,
+            "last_timing": None
+        }
+
+    def _ensure_pool(self) -> ProcessPoolExecutor:
+        # Started on the first large chain so idle instances never spawn workers
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self.pool
+
+    async def verify_chain(self, log_chain: List[Dict[str, Any]], required_fields: Sequence[str] = (), check_data_hash: bool = False) -> Dict[str, Any]:
+        """Verify every block hash and the previous_hash linkage, reporting the first failing index"""
+        started = time.perf_counter()
+        required_fields = tuple(required_fields)
+        parallel = self.enabled and len(log_chain) >= self.min_parallel_blocks
+
+        # Block contents are independent of each other, so chunks can be checked concurrently
+        if parallel:
+            pool = self._ensure_pool()
+            loop = asyncio.get_running_loop()
+            chunk_results = await asyncio.gather(*[
+                loop.run_in_executor(pool, _verify_chunk, start, log_chain[start:start + self.chunk_size], required_fields, check_data_hash)
+                for start in range(0, len(log_chain), self.chunk_size)
+            ])
+            content_failures = [failure for failure in chunk_results if failure is not None]
+            content_failure = min(content_failures) if content_failures else None
+            chunks = len(chunk_results)
+        else:
+            content_failure = _verify_chunk(0, log_chain, required_fields, check_data_hash)
+            chunks = 1
+        hashed = time.perf_counter()
+
+        # Linkage is the only sequential dependency: one pass comparing neighbouring hash columns
+        block_hashes = [block.get("block_hash") for block in log_chain]
+        previous_hashes = [block.get("previous_hash") for block in log_chain]
+        broken_index = next(
+            (i for i, (previous_hash, expected) in enumerate(zip(previous_hashes[1:], block_hashes), 1) if previous_hash != expected),
+            None
+        )
+        linked = time.perf_counter()
+
+        failure = content_failure
+        if broken_index is not None and (failure is None or broken_index < failure[0]):
+            failure = (broken_index, FAILURE_CHAIN_BROKEN)
+
+        total_seconds = linked - started
+        timing = {
+            "mode": "process_pool" if parallel else "inline",
+            "workers": self.max_workers if parallel else 1,
+            "chunks": chunks,
+            "hash_ms": round((hashed - started) * 1000, 3),
+            "linkage_ms": round((linked - hashed) * 1000, 3),
+            "total_ms": round(total_seconds * 1000, 3),
+            "blocks_per_second": round(len(log_chain) / total_seconds) if total_seconds > 0 else None
+        }
+
+        self.engine_stats["chains_verified"] += 1
+        self.engine_stats["blocks_verified"] += len(log_chain)
+        self.engine_stats["last_timing"] = timing
+        if failure is not None:
+            self.engine_stats["failed_chains"] += 1
+
+        return {
+            "verified": failure is None,
+            "chain_length": len(log_chain),
+            "first_failing_index": failure[0] if failure else None,
+            "failure_reason": failure[1] if failure else None,
+            "timing": timing
+        }
+
+    def shutdown(self):
+        """Stop worker processes"""
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            self.pool = None
+
+    def get_engine_stats(self) -> Dict[str, Any]:
+        """Get chain verification throughput statistics"""
+        return {
+            **self.engine_stats,
+            "pool_running": self.pool is not None,
+            "max_workers": self.max_workers,
+            "chunk_size": self.chunk_size,
+            "min_parallel_blocks": self.min_parallel_blocks
+        }
+
+
+class StreamingChainVerifier:
+    """Verifies a chain one block at a time as it arrives, keeping only the running previous hash"""
+
+    def __init__(self, required_fields: Sequence[str] = (), check_data_hash: bool = False):
+        self.required_fields = tuple(required_fields)
+        self.check_data_hash = check_data_hash
+        self.blocks_verified = 0
+        self.previous_hash: Optional[str] = None
+        self.first_block: Optional[str] = None
+        self.last_block: Optional[str] = None
+        self.failure: Optional[Tuple[int, str]] = None
+        self.error: Optional[str] = None
+        self.started = time.perf_counter()
+
+    def feed(self, block: Dict[str, Any]) -> bool:
+        """Verify the next block; returns False once the chain has failed"""
+        if self.failure is not None:
+            return False
+
+        index = self.blocks_verified
+        if index == 0 and block.get("block_type") != "genesis":
+            failure = FAILURE_INVALID_GENESIS
+        else:
+            failure = _check_block_contents(block, index, self.required_fields, self.check_data_hash)
+        if failure is None and index > 0 and block.get("previous_hash") != self.previous_hash:
+            failure = FAILURE_CHAIN_BROKEN
+
+        if failure is not None:
+            self.failure = (index, failure)
+            return False
+
+        self.previous_hash = block.get("block_hash")
+        if index == 0:
+            self.first_block = block.get("timestamp")
+        self.last_block = block.get("timestamp")
+        self.blocks_verified += 1
+        return True
+
+    def fail_stream(self, error: str):
+        """Record a decoding error at the position the stream broke"""
+        if self.failure is None:
+            self.failure = (self.blocks_verified, FAILURE_MALFORMED_STREAM)
+            self.error = error
+
+    def get_progress(self) -> Dict[str, Any]:
+        elapsed = time.perf_counter() - self.started
+        return {
+            "blocks_verified": self.blocks_verified,
+            "elapsed_ms": round(elapsed * 1000, 3),
+            "blocks_per_second": round(self.blocks_verified / elapsed) if elapsed > 0 else None
+        }
+
+    def get_result(self) -> Dict[str, Any]:
+        """Final verdict for the stream"""
+        if self.failure is None and self.blocks_verified == 0:
+            self.failure = (0, FAILURE_MALFORMED_STREAM)
+            self.error = "Empty log chain provided"
+
+        result = {
+            "verified": self.failure is None,
+            "chain_length": self.blocks_verified if self.failure is None else None,
+            "first_block": self.first_block,
+            "last_block": self.last_block,
+            **self.get_progress()
+        }
+        if self.failure is not None:
+            index, reason = self.failure
+            result["first_failing_index"] = index
+            result["failure_reason"] = reason
+            result["error"] = self.error or f"Block {index} {FAILURE_MESSAGES[reason]}"
+        return result
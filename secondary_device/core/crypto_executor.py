@@ -0,0 +1,235 @@
+import asyncio
+import bisect
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, Optional
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.backends import default_backend
+from cryptography.exceptions import InvalidSignature
+
+from core.signer_backends import get_backend, backend_for_key
+from core.public_key_cache import public_key_cache
+
+# Private keys by key ID, loaded once per worker process by the pool initializer
+_worker_private_keys: Dict[str, Any] = {}
+
+def _init_worker(private_key_pems: Dict[str, bytes], key_cache_size: int):
+    """Pool initializer: parse the signing keys once for the lifetime of the worker"""
+    public_key_cache.max_entries = key_cache_size
+    for key_id, private_key_pem in private_key_pems.items():
+        _worker_private_keys[key_id] = _load_private_key(private_key_pem)
+
+def _load_private_key(private_key_pem: bytes):
+    return serialization.load_pem_private_key(private_key_pem, password=None, backend=default_backend())
+
+def _sign_with(private_key, data: bytes) -> bytes:
+    return backend_for_key(private_key).sign(private_key, data)
+
+def _verify_with(public_key_pem: bytes, signature: bytes, data: bytes, algorithm: str) -> bool:
+    # Parsed keys are cached per process, so a device key is only parsed once per worker
+    _, public_key = public_key_cache.load(public_key_pem)
+    backend = get_backend(algorithm)
+    
+    # A key of a different scheme can never satisfy the declared algorithm
+    if not backend.matches_key(public_key):
+        return False
+    
+    try:
+        backend.verify(public_key, signature, data)
+        return True
+    except InvalidSignature:
+        return False
+
+def _worker_sign(key_id: str, data: bytes) -> bytes:
+    private_key = _worker_private_keys.get(key_id)
+    if private_key is None:
+        raise Exception(f"Worker has no signing key {key_id} loaded")
+    return _sign_with(private_key, data)
+
+
+class CryptoPoolSaturated(Exception):
+    """Raised when the crypto executor already holds its maximum number of queued operations"""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Crypto executor saturated, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram in milliseconds"""
+
+    BUCKETS_MS = [0.5, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000]
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BUCKETS_MS) + 1)
+        self.total = 0
+        self.sum_ms = 0.0
+
+    def observe(self, latency_ms: float):
+        self.counts[bisect.bisect_left(self.BUCKETS_MS, latency_ms)] += 1
+        self.total += 1
+        self.sum_ms += latency_ms
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bucket bound containing the q-th quantile"""
+        if self.total == 0:
+            return None
+        target = q * self.total
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return self.BUCKETS_MS[i] if i < len(self.BUCKETS_MS) else float("inf")
+        return float("inf")
+
+    def snapshot(self) -> Dict[str, Any]:
+        labels = [f"le_{bound}ms" for bound in self.BUCKETS_MS] + ["le_inf"]
+        return {
+            "count": self.total,
+            "mean_ms": round(self.sum_ms / self.total, 3) if self.total > 0 else 0,
+            "p50_ms": self.quantile(0.5),
+            "p99_ms": self.quantile(0.99),
+            "buckets": dict(zip(labels, self.counts))
+        }
+
+
+class CryptoExecutor:
+    """Runs CPU-bound signing and verification in a process pool so the event loop stays responsive
+
+    One executor is shared per process; each signer registers its private key under a key ID (its
+    fingerprint) and signs by that ID, so every key lives in the same workers.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, max_pending: int = 1024, retry_after: int = 1, enabled: bool = True, key_cache_size: int = 1024):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.key_cache_size = max(1, key_cache_size)
+        public_key_cache.max_entries = self.key_cache_size
+        self.max_pending = max_pending
+        self.retry_after = retry_after
+        self.enabled = enabled
+        self.pool: Optional[ProcessPoolExecutor] = None
+        self.started = False
+        self.signing_keys: Dict[str, bytes] = {}
+        self._inline_private_keys: Dict[str, Any] = {}
+        self.pending = 0
+        self.histograms = {"sign": LatencyHistogram(), "verify": LatencyHistogram()}
+        self.executor_stats = {
+            "rejected_operations": 0,
+            "failed_operations": 0,
+            "peak_pending": 0
+        }
+
+    def add_signing_key(self, key_id: str, private_key_pem: bytes, replaces: Optional[str] = None):
+        """Make a private key available for signing, dropping the key it rotates out"""
+        if replaces is not None:
+            self.signing_keys.pop(replaces, None)
+            self._inline_private_keys.pop(replaces, None)
+        self.signing_keys[key_id] = private_key_pem
+        if not self.enabled:
+            self._inline_private_keys[key_id] = _load_private_key(private_key_pem)
+        elif self.started:
+            # Running workers only learn keys in their initializer
+            self._restart_pool()
+
+    def remove_signing_key(self, key_id: str):
+        """Stop signing with a key; workers drop it on the next restart"""
+        self.signing_keys.pop(key_id, None)
+        self._inline_private_keys.pop(key_id, None)
+
+    def start(self):
+        """Start the worker pool with every registered signing key"""
+        self.started = True
+        if self.enabled:
+            self._restart_pool()
+
+    def _restart_pool(self):
+        previous_pool = self.pool
+        # spawn avoids forking a process that already runs an event loop and threads
+        self.pool = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(dict(self.signing_keys), self.key_cache_size)
+        )
+        if previous_pool is not None:
+            # New jobs go to the new pool; jobs already queued on the old one still hold their keys there,
+            # so let them finish and retire the old workers off the event loop
+            threading.Thread(
+                target=previous_pool.shutdown,
+                kwargs={"wait": True},
+                name="crypto-pool-retire",
+                daemon=True
+            ).start()
+
+    async def sign(self, key_id: str, data: bytes) -> bytes:
+        """Sign data with the worker-resident private key registered under key_id"""
+        if key_id not in self.signing_keys:
+            raise Exception(f"Crypto executor has no signing key {key_id}")
+        if self.pool is None:
+            if key_id not in self._inline_private_keys:
+                self._inline_private_keys[key_id] = _load_private_key(self.signing_keys[key_id])
+            return await self._run_inline("sign", _sign_with, self._inline_private_keys[key_id], data)
+        return await self._submit("sign", _worker_sign, key_id, data)
+
+    async def verify(self, public_key_pem: bytes, signature: bytes, data: bytes, algorithm: str) -> bool:
+        """Verify a signature under the declared algorithm, returning False when it does not match"""
+        if self.pool is None:
+            return await self._run_inline("verify", _verify_with, public_key_pem, signature, data, algorithm)
+        return await self._submit("verify", _verify_with, public_key_pem, signature, data, algorithm)
+
+    async def _submit(self, operation: str, func, *args):
+        if self.pending >= self.max_pending:
+            self.executor_stats["rejected_operations"] += 1
+            raise CryptoPoolSaturated(self.retry_after)
+
+        self.pending += 1
+        self.executor_stats["peak_pending"] = max(self.executor_stats["peak_pending"], self.pending)
+        started = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.pool, func, *args)
+        except Exception:
+            self.executor_stats["failed_operations"] += 1
+            raise
+        finally:
+            self.pending -= 1
+            self.histograms[operation].observe((time.perf_counter() - started) * 1000)
+
+    async def _run_inline(self, operation: str, func, *args):
+        """Fallback when the pool is disabled or not started"""
+        started = time.perf_counter()
+        try:
+            return func(*args)
+        except Exception:
+            self.executor_stats["failed_operations"] += 1
+            raise
+        finally:
+            self.histograms[operation].observe((time.perf_counter() - started) * 1000)
+
+    def _stop_pool(self):
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            self.pool = None
+
+    def shutdown(self):
+        """Stop worker processes and drop key material"""
+        self._stop_pool()
+        self.started = False
+        self.signing_keys.clear()
+        self._inline_private_keys.clear()
+
+    def get_executor_stats(self) -> Dict[str, Any]:
+        """Get pool utilisation and per-operation latency histograms"""
+        return {
+            **self.executor_stats,
+            "mode": "process_pool" if self.pool is not None else "inline",
+            "workers": self.max_workers if self.pool is not None else 0,
+            "signing_keys": len(self.signing_keys),
+            "pending": self.pending,
+            "max_pending": self.max_pending,
+            "public_key_cache": public_key_cache.get_cache_stats(),
+            "latency": {operation: histogram.snapshot() for operation, histogram in self.histograms.items()}
+        }
@@ -0,0 +1,20 @@
+from app.config import config
+from core.crypto_executor import CryptoExecutor
+from core.chain_verification_engine import ChainVerificationEngine
+
+# One worker pool per process: every signer and verifier submits to it, and app startup starts it
+crypto_executor = CryptoExecutor(
+    max_workers=config.crypto_pool_workers or None,
+    max_pending=config.crypto_pool_max_pending,
+    retry_after=config.crypto_pool_retry_after,
+    enabled=config.crypto_pool_enabled,
+    key_cache_size=config.public_key_cache_size
+)
+
+# Shared by every chain verifier; its workers are spawned on the first large chain
+chain_engine = ChainVerificationEngine(
+    max_workers=config.chain_verify_workers or None,
+    chunk_size=config.chain_verify_chunk_size,
+    min_parallel_blocks=config.chain_verify_min_parallel_blocks,
+    enabled=config.chain_verify_pool_enabled
+)
@@ -3,28 +3,44 @@ import asyncio
 from datetime import datetime, timedelta
 from typing import Dict, Any, Optional
 import base64
-from cryptography.hazmat.primitives import hashes, serialization
-from cryptography.hazmat.primitives.asymmetric import rsa, padding
+from cryptography.hazmat.primitives import serialization
 from cryptography.hazmat.backends import default_backend
-from cryptography.exceptions import InvalidSignature
 
 from app.config import config
+from core.signer_backends import get_backend
+from core.public_key_cache import public_key_cache
+from core.key_material import KeyMaterial
+from core.crypto_executor import CryptoExecutor, CryptoPoolSaturated
+from core.crypto_pool import crypto_executor as shared_crypto_executor
 
 class KeyManager:
-    def __init__(self):
-        self.private_key = None
-        self.public_key = None
+    def __init__(self, crypto_executor: Optional[CryptoExecutor] = None):
+        self.key_material: Optional[KeyMaterial] = None
+        self.signer_backend = get_backend(config.signature_algorithm)
         self.key_initialized = False
         self.key_rotation_date = None
+        self.crypto_executor = crypto_executor or shared_crypto_executor
         
     async def initialize_keys(self):
         """Initialize or load cryptographic keys"""
         try:
+            # Rotation: the outgoing key must no longer resolve by fingerprint
+            previous_fingerprint = None
+            if self.key_material is not None:
+                previous_fingerprint = self.key_material.fingerprint
+                public_key_cache.invalidate(previous_fingerprint)
+            
             if os.path.exists(config.private_key_path):
                 await self._load_existing_keys()
             else:
                 await self._generate_new_keys()
             
+            # Keep our own public key resolvable by fingerprint for verification requests
+            public_key_cache.register(self.key_material)
+            
+            # Workers of the shared pool load the private key once
+            self.crypto_executor.add_signing_key(self.key_material.fingerprint, self.key_material.private_key_pem(), replaces=previous_fingerprint)
+            
             self.key_initialized = True
             self.key_rotation_date = datetime.utcnow()
             print("Cryptographic keys initialized successfully")
@@ -33,19 +49,13 @@ class KeyManager:
             print(f"Key initialization failed: {e}")
             raise
     
-    async def _generate_new_keys(self):
-        """Generate new RSA key pair"""
-        print("Generating new RSA key pair...")
+    async def _generate_new_keys(self, algorithm: Optional[str] = None):
+        """Generate a new key pair for the configured (or requested) algorithm"""
+        self.signer_backend = get_backend(algorithm or config.signature_algorithm)
+        print(f"Generating new {self.signer_backend.algorithm} key pair...")
         
-        # Generate private key
-        self.private_key = rsa.generate_private_key(
-            public_exponent=65537,
-            key_size=2048,
-            backend=default_backend()
-        )
-        
-        # Get public key
-        self.public_key = self.private_key.public_key()
+        # Generate the key pair; serialized forms and fingerprint are computed once here
+        self.key_material = KeyMaterial(self.signer_backend.generate_private_key(), self.signer_backend)
         
         # Save keys securely
         await self._save_keys()
@@ -55,38 +65,26 @@ class KeyManager:
         print("Loading existing cryptographic keys...")
         
         with open(config.private_key_path, "rb") as key_file:
-            self.private_key = serialization.load_pem_private_key(
+            private_key = serialization.load_pem_private_key(
                 key_file.read(),
                 password=None,
                 backend=default_backend()
             )
         
-        with open(config.public_key_path, "rb") as key_file:
-            self.public_key = serialization.load_pem_public_key(
-                key_file.read(),
-                backend=default_backend()
-            )
+        # The stored key determines its algorithm, independent of the configured default;
+        # the public half is derived from it rather than parsed again from public_key_path
+        self.key_material = KeyMaterial(private_key)
+        self.signer_backend = self.key_material.signer_backend
     
     async def _save_keys(self):
         """Save keys to secure storage"""
         # Save private key
-        private_pem = self.private_key.private_bytes(
-            encoding=serialization.Encoding.PEM,
-            format=serialization.PrivateFormat.PKCS8,
-            encryption_algorithm=serialization.NoEncryption()
-        )
-        
         with open(config.private_key_path, "wb") as key_file:
-            key_file.write(private_pem)
+            key_file.write(self.key_material.private_key_pem())
         
         # Save public key
-        public_pem = self.public_key.public_bytes(
-            encoding=serialization.Encoding.PEM,
-            format=serialization.PublicFormat.SubjectPublicKeyInfo
-        )
-        
         with open(config.public_key_path, "wb") as key_file:
-            key_file.write(public_pem)
+            key_file.write(self.key_material.public_key_pem)
     
     async def sign_data(self, data: str, totp_code: str) -> Dict[str, Any]:
         """Sign data with private key and TOTP verification"""
@@ -96,66 +94,44 @@ class KeyManager:
         # In production, verify TOTP code here
         # await self._verify_totp(totp_code)
         
-        # Create signature
-        signature = self.private_key.sign(
-            data.encode('utf-8'),
-            padding.PSS(
-                mgf=padding.MGF1(hashes.SHA256()),
-                salt_length=padding.PSS.MAX_LENGTH
-            ),
-            hashes.SHA256()
-        )
+        # Create signature in the crypto worker pool
+        signature = await self.crypto_executor.sign(self.key_material.fingerprint, data.encode('utf-8'))
         
         # Encode signature for storage
         signature_b64 = base64.b64encode(signature).decode('utf-8')
         
         return {
             "signature": signature_b64,
-            "algorithm": "RSA-PSS-SHA256",
+            "algorithm": self.signer_backend.algorithm,
             "timestamp": datetime.utcnow().isoformat(),
-            "public_key_fingerprint": await self.get_public_key_fingerprint()
+            "public_key_fingerprint": self.key_material.fingerprint
         }
     
-    async def verify_signature(self, data: str, signature: str, public_key_pem: str) -> bool:
-        """Verify signature with public key"""
+    async def verify_signature(self, data: str, signature: str, public_key_pem: Optional[str], algorithm: Optional[str] = None, public_key_fingerprint: Optional[str] = None) -> bool:
+        """Verify signature with a public key PEM, or a cached key's fingerprint, under the declared algorithm"""
+        # Undeclared means this device's own scheme, whichever backend it is configured with
+        algorithm = algorithm or self.signer_backend.algorithm
         try:
-            # Load public key
-            public_key = serialization.load_pem_public_key(
-                public_key_pem.encode('utf-8'),
-                backend=default_backend()
-            )
-            
             # Decode signature
             signature_bytes = base64.b64decode(signature)
             
-            # Verify signature
-            public_key.verify(
+            # Verify signature in the crypto worker pool
+            return await self.crypto_executor.verify(
+                public_key_cache.resolve_pem(public_key_pem, public_key_fingerprint),
                 signature_bytes,
                 data.encode('utf-8'),
-                padding.PSS(
-                    mgf=padding.MGF1(hashes.SHA256()),
-                    salt_length=padding.PSS.MAX_LENGTH
-                ),
-                hashes.SHA256()
+                algorithm
             )
             
-            return True
-            
-        except InvalidSignature:
-            return False
+        except CryptoPoolSaturated:
+            raise
         except Exception as e:
             print(f"Signature verification error: {e}")
             return False
     
     async def get_public_key_fingerprint(self) -> str:
         """Get public key fingerprint"""
-        public_pem = self.public_key.public_bytes(
-            encoding=serialization.Encoding.PEM,
-            format=serialization.PublicFormat.SubjectPublicKeyInfo
-        )
-        
-        # Simple fingerprint for demo - in production use proper fingerprint
-        return f"key_{hash(public_pem) % 10000:04d}"
+        return self.key_material.fingerprint
     
     async def health_check(self) -> Dict[str, Any]:
         """Check key manager health"""
@@ -163,9 +139,11 @@ class KeyManager:
         
         return {
             "key_initialized": self.key_initialized,
+            "algorithm": self.key_material.describe_algorithm() if self.key_material else None,
             "days_since_rotation": days_since_rotation,
             "needs_rotation": days_since_rotation >= config.key_rotation_days,
-            "public_key_available": self.public_key is not None
+            "executor_stats": self.crypto_executor.get_executor_stats(),
+            "public_key_available": self.key_material is not None
         }
     
     async def integrity_check(self) -> bool:
@@ -179,15 +157,11 @@ class KeyManager:
             signature_info = await self.sign_data(test_data, "000000")  # Demo TOTP
             
             # Verify the signature
-            public_pem = self.public_key.public_bytes(
-                encoding=serialization.Encoding.PEM,
-                format=serialization.PublicFormat.SubjectPublicKeyInfo
-            ).decode('utf-8')
-            
             is_valid = await self.verify_signature(
                 test_data, 
                 signature_info["signature"], 
-                public_pem
+                self.key_material.public_key_pem.decode('utf-8'),
+                signature_info["algorithm"]
             )
             
             return is_valid
@@ -199,7 +173,8 @@ class KeyManager:
     async def secure_cleanup(self):
         """Securely cleanup key material from memory"""
         # In production, this would securely wipe key material
-        self.private_key = None
-        self.public_key = None
+        if self.key_material is not None:
+            self.crypto_executor.remove_signing_key(self.key_material.fingerprint)
+        self.key_material = None
         self.key_initialized = False
         print("Key material securely cleared from memory")
\ No newline at end of file
@@ -0,0 +1,51 @@
+from datetime import datetime
+from typing import Dict, Any, Optional
+from cryptography.hazmat.primitives import serialization
+
+from core.signer_backends import SignerBackend, backend_for_key
+from core.public_key_cache import public_key_fingerprint
+
+
+class KeyMaterial:
+    """A signing key pair with its serialized public forms and fingerprint, computed once per load or rotation"""
+
+    def __init__(self, private_key, signer_backend: Optional[SignerBackend] = None):
+        self.private_key = private_key
+        self.public_key = private_key.public_key()
+        self.signer_backend = signer_backend or backend_for_key(private_key)
+        self.key_algorithm = self.signer_backend.key_algorithm(private_key)
+        self.key_size = self.signer_backend.key_size(private_key)
+        self.public_key_pem = self.public_key.public_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PublicFormat.SubjectPublicKeyInfo
+        )
+        self.public_key_der = self.public_key.public_bytes(
+            encoding=serialization.Encoding.DER,
+            format=serialization.PublicFormat.SubjectPublicKeyInfo
+        )
+        self.fingerprint = public_key_fingerprint(self.public_key_pem)
+        self.created_at = datetime.utcnow()
+
+    def private_key_pem(self) -> bytes:
+        """Serialize the private key as unencrypted PKCS8 PEM (not retained, only handed to storage and workers)"""
+        return self.private_key.private_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PrivateFormat.PKCS8,
+            encryption_algorithm=serialization.NoEncryption()
+        )
+
+    def describe_algorithm(self) -> Dict[str, Any]:
+        """Signature scheme and the actual size of this key"""
+        return {
+            "algorithm": self.signer_backend.algorithm,
+            "key_algorithm": self.key_algorithm,
+            "key_size": self.key_size
+        }
+
+    def describe(self) -> Dict[str, Any]:
+        """Public description of the key for status endpoints"""
+        return {
+            "public_key_fingerprint": self.fingerprint,
+            **self.describe_algorithm(),
+            "created_at": self.created_at.isoformat()
+        }
@@ -1,17 +1,23 @@
 import asyncio
 from datetime import datetime
 from typing import Dict, Any, List, Optional
-import hashlib
-import json
+
+from core.signature_engine import SignatureEngine
+from core.crypto_pool import chain_engine as shared_chain_engine
+from core.chain_verification_engine import ChainVerificationEngine
+from shared.utils.canonical import record_hash
 
 class LogVerifier:
-    def __init__(self):
+    def __init__(self, signature_engine: Optional[SignatureEngine] = None, chain_engine: Optional[ChainVerificationEngine] = None):
         self.verification_log = []
         self.verification_stats = {
             "total_verifications": 0,
             "successful_verifications": 0,
             "failed_verifications": 0
         }
+        # Share the app's initialized engine so verification runs in its started crypto pool
+        self.signature_engine = signature_engine or SignatureEngine()
+        self.chain_engine = chain_engine or shared_chain_engine
         
     async def verify_log_integrity(self, log_chain: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Verify the integrity of a log chain"""
@@ -32,16 +38,23 @@ class LogVerifier:
                     "timestamp": datetime.utcnow().isoformat()
                 }
             
-            # Verify subsequent blocks
-            previous_hash = genesis_block["block_hash"]
-            for i, block in enumerate(log_chain[1:], 1):
-                if not await self._verify_block(block, previous_hash):
-                    return {
-                        "verified": False,
-                        "error": f"Block {i} verification failed",
-                        "timestamp": datetime.utcnow().isoformat()
-                    }
-                previous_hash = block["block_hash"]
+            # Verify subsequent blocks: contents in parallel chunks, then linkage in one pass
+            result = await self.chain_engine.verify_chain(
+                log_chain,
+                required_fields=["block_type", "timestamp", "previous_hash", "block_hash", "data_hash"],
+                check_data_hash=True
+            )
+            if not result["verified"]:
+                self.verification_stats["total_verifications"] += 1
+                self.verification_stats["failed_verifications"] += 1
+                return {
+                    "verified": False,
+                    "error": f"Block {result['first_failing_index']} verification failed",
+                    "first_failing_index": result["first_failing_index"],
+                    "failure_reason": result["failure_reason"],
+                    "timing": result["timing"],
+                    "timestamp": datetime.utcnow().isoformat()
+                }
             
             # Update stats
             self.verification_stats["total_verifications"] += 1
@@ -52,6 +65,7 @@ class LogVerifier:
                 "chain_length": len(log_chain),
                 "first_block": log_chain[0]["timestamp"],
                 "last_block": log_chain[-1]["timestamp"],
+                "timing": result["timing"],
                 "timestamp": datetime.utcnow().isoformat()
             }
             
@@ -84,45 +98,12 @@ class LogVerifier:
         expected_hash = self._calculate_block_hash(block)
         return block["block_hash"] == expected_hash
     
-    async def _verify_block(self, block: Dict[str, Any], previous_hash: str) -> bool:
-        """Verify a regular block"""
-        required_fields = ["block_type", "timestamp", "previous_hash", "block_hash", "data_hash"]
-        
-        # Check required fields
-        for field in required_fields:
-            if field not in block:
-                return False
-        
-        # Check chain linkage
-        if block["previous_hash"] != previous_hash:
-            return False
-        
-        # Verify block hash
-        expected_hash = self._calculate_block_hash(block)
-        if block["block_hash"] != expected_hash:
-            return False
-        
-        # Verify data hash if present
-        if "log_data" in block:
-            data_hash = self._calculate_data_hash(block["log_data"])
-            if block["data_hash"] != data_hash:
-                return False
-        
-        return True
-    
     def _calculate_block_hash(self, block: Dict[str, Any]) -> str:
         """Calculate block hash"""
         # Exclude block_hash from calculation
-        block_data = {k: v for k, v in block.items() if k != "block_hash"}
-        block_str = json.dumps(block_data, sort_keys=True, default=str)
-        return hashlib.sha256(block_str.encode()).hexdigest()
-    
-    def _calculate_data_hash(self, data: Dict[str, Any]) -> str:
-        """Calculate data hash"""
-        data_str = json.dumps(data, sort_keys=True, default=str)
-        return hashlib.sha256(data_str.encode()).hexdigest()
+        return record_hash(block, "block_hash")
     
-    async def verify_signature_integrity(self, signed_data: Dict[str, Any], public_key: str) -> Dict[str, Any]:
+    async def verify_signature_integrity(self, signed_data: Dict[str, Any], public_key: Optional[str]) -> Dict[str, Any]:
         """Verify signature integrity"""
         try:
             # Extract signature and data
@@ -136,25 +117,24 @@ class LogVerifier:
                     "timestamp": datetime.utcnow().isoformat()
                 }
             
-            # This would use the signature engine for actual verification
-            # For demo, we'll simulate verification
-            import random
-            verified = random.random() > 0.1  # 90% success rate for demo
-            
-            if verified:
-                self.verification_stats["successful_verifications"] += 1
-                return {
-                    "verified": True,
-                    "timestamp": datetime.utcnow().isoformat(),
-                    "algorithm": "RSA-PSS-SHA256"
-                }
+            # Batched signatures carry an inclusion proof and a shared root signature
+            if signed_data.get("inclusion_proof") is not None:
+                result = await self.signature_engine.verify_batched_signature(
+                    data_to_verify, signed_data, public_key, signed_data.get("public_key_fingerprint")
+                )
             else:
-                self.verification_stats["failed_verifications"] += 1
-                return {
-                    "verified": False,
-                    "error": "Signature verification failed",
-                    "timestamp": datetime.utcnow().isoformat()
-                }
+                # Parsed public keys are cached, so repeat checks against a device key skip PEM parsing
+                result = await self.signature_engine.verify_signature(
+                    data_to_verify,
+                    signature,
+                    public_key,
+                    signed_data.get("algorithm"),
+                    signed_data.get("public_key_fingerprint")
+                )
+            
+            key = "successful_verifications" if result["verified"] else "failed_verifications"
+            self.verification_stats[key] += 1
+            return result
                 
         except Exception as e:
             self.verification_stats["failed_verifications"] += 1
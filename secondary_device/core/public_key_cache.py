@@ -0,0 +1,105 @@
+import hashlib
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.backends import default_backend
+
+def public_key_fingerprint(public_key_pem: bytes) -> str:
+    """Stable fingerprint of a PEM-encoded public key"""
+    return f"fp_{hashlib.sha256(public_key_pem).hexdigest()[:16]}"
+
+
+class PublicKeyCache:
+    """Bounded LRU from key fingerprint to parsed public key, so repeat verifications skip PEM parsing
+
+    Keys registered by this device are pinned outside the LRU; only PEMs parsed from requests are evicted.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max(1, max_entries)
+        self.entries: "OrderedDict[str, Tuple[Any, bytes]]" = OrderedDict()
+        self.pinned: Dict[str, Tuple[Any, bytes]] = {}
+        self.cache_stats = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "invalidations": 0
+        }
+
+    def load(self, public_key_pem: bytes) -> Tuple[str, Any]:
+        """Return the fingerprint and parsed key for a PEM, parsing it only on first sight"""
+        fingerprint = public_key_fingerprint(public_key_pem)
+        entry = self.pinned.get(fingerprint)
+        if entry is not None:
+            self.cache_stats["hits"] += 1
+            return fingerprint, entry[0]
+
+        entry = self.entries.get(fingerprint)
+        if entry is not None:
+            self.entries.move_to_end(fingerprint)
+            self.cache_stats["hits"] += 1
+            return fingerprint, entry[0]
+
+        self.cache_stats["misses"] += 1
+        public_key = serialization.load_pem_public_key(public_key_pem, backend=default_backend())
+        self._store(fingerprint, public_key, public_key_pem)
+        return fingerprint, public_key
+
+    def register(self, key_material) -> str:
+        """Pin the device's own already-parsed public key so request traffic cannot evict it"""
+        self.entries.pop(key_material.fingerprint, None)
+        self.pinned[key_material.fingerprint] = (key_material.public_key, key_material.public_key_pem)
+        return key_material.fingerprint
+
+    def get_pem(self, fingerprint: str) -> Optional[bytes]:
+        """Look up the PEM for a fingerprint, or None if it is not cached"""
+        entry = self.pinned.get(fingerprint)
+        if entry is not None:
+            return entry[1]
+        entry = self.entries.get(fingerprint)
+        if entry is None:
+            return None
+        self.entries.move_to_end(fingerprint)
+        return entry[1]
+
+    def resolve_pem(self, public_key_pem: Optional[str] = None, fingerprint: Optional[str] = None) -> bytes:
+        """Pick the caller's PEM, or the cached PEM for a fingerprint when no PEM was sent"""
+        if public_key_pem:
+            return public_key_pem.encode('utf-8')
+        if not fingerprint:
+            raise ValueError("Either a public key or a public key fingerprint is required")
+
+        cached_pem = self.get_pem(fingerprint)
+        if cached_pem is None:
+            raise ValueError(f"Unknown public key fingerprint: {fingerprint}")
+        return cached_pem
+
+    def invalidate(self, fingerprint: str) -> bool:
+        """Drop a key, e.g. after it has been rotated out"""
+        pinned = self.pinned.pop(fingerprint, None)
+        if self.entries.pop(fingerprint, None) is None and pinned is None:
+            return False
+        self.cache_stats["invalidations"] += 1
+        return True
+
+    def _store(self, fingerprint: str, public_key, public_key_pem: bytes):
+        self.entries[fingerprint] = (public_key, public_key_pem)
+        self.entries.move_to_end(fingerprint)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.cache_stats["evictions"] += 1
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Get cache occupancy and hit rate"""
+        lookups = self.cache_stats["hits"] + self.cache_stats["misses"]
+        return {
+            **self.cache_stats,
+            "entries": len(self.entries),
+            "pinned": len(self.pinned),
+            "max_entries": self.max_entries,
+            "hit_rate": round(self.cache_stats["hits"] / lookups, 3) if lookups > 0 else 0
+        }
+
+
+# One cache per process: the API process and every crypto worker each keep their own
+public_key_cache = PublicKeyCache()
@@ -3,20 +3,29 @@ from datetime import datetime
 from typing import Dict, Any, Optional
 import base64
 import hashlib
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.asymmetric import rsa, padding
-from cryptography.hazmat.backends import default_backend
-from cryptography.exceptions import InvalidSignature
 
 from app.config import config
 from services.totp_generator import TOTPGenerator
+from core.signer_backends import get_backend, supported_algorithms
+from core.public_key_cache import public_key_cache
+from core.key_material import KeyMaterial
+from core.crypto_executor import CryptoExecutor, CryptoPoolSaturated
+from core.crypto_pool import crypto_executor as shared_crypto_executor
+from core.batch_signer import BatchSigner, SIGNATURE_MODE_MERKLE_BATCH
+from utils.merkle import verify_batched_signature_info
 
 class SignatureEngine:
-    def __init__(self):
-        self.private_key = None
-        self.public_key = None
+    def __init__(self, crypto_executor: Optional[CryptoExecutor] = None):
+        self.key_material: Optional[KeyMaterial] = None
+        self.signer_backend = get_backend(config.signature_algorithm)
         self.key_initialized = False
         self.totp_generator = TOTPGenerator()
+        self.crypto_executor = crypto_executor or shared_crypto_executor
+        self.batch_signer = BatchSigner(
+            self._sign,
+            window_ms=config.signing_batch_window_ms,
+            max_entries=config.signing_batch_max_entries
+        )
         self.signature_stats = {
             "total_signatures": 0,
             "failed_signatures": 0,
@@ -39,21 +48,29 @@ class SignatureEngine:
             print(f"Signature engine initialization failed: {e}")
             raise
     
-    async def _initialize_keys(self):
-        """Initialize cryptographic keys"""
+    async def _initialize_keys(self, algorithm: Optional[str] = None):
+        """Initialize cryptographic keys for the configured (or requested) algorithm"""
         import os
         
+        self.signer_backend = get_backend(algorithm or config.signature_algorithm)
+        
         # For demo purposes, we'll generate new keys each time
         # In production, you would load from secure storage
-        print("Generating new RSA key pair...")
+        print(f"Generating new {self.signer_backend.algorithm} key pair...")
         
-        self.private_key = rsa.generate_private_key(
-            public_exponent=65537,
-            key_size=2048,
-            backend=default_backend()
-        )
+        key_material = KeyMaterial(self.signer_backend.generate_private_key(), self.signer_backend)
+        
+        # Rotation: the outgoing key must no longer resolve by fingerprint
+        previous_fingerprint = None
+        if self.key_material is not None:
+            previous_fingerprint = self.key_material.fingerprint
+            public_key_cache.invalidate(previous_fingerprint)
         
-        self.public_key = self.private_key.public_key()
+        self.key_material = key_material
+        public_key_cache.register(key_material)
+        
+        # Hand the key to the shared worker pool once; workers keep it for their lifetime
+        self.crypto_executor.add_signing_key(key_material.fingerprint, key_material.private_key_pem(), replaces=previous_fingerprint)
         
         print("Cryptographic keys generated successfully")
     
@@ -62,21 +79,29 @@ class SignatureEngine:
         if not self.key_initialized:
             raise Exception("Signature engine not initialized")
         
-        # Verify TOTP (in production, this would be strict)
+        self._check_totp(totp_code)
+        return await self._sign(data)
+    
+    async def sign_data_batched(self, data: str, totp_code: str) -> Dict[str, Any]:
+        """Sign data as a leaf of the next Merkle batch"""
+        if not self.key_initialized:
+            raise Exception("Signature engine not initialized")
+        
+        self._check_totp(totp_code)
+        signature_info = await self.batch_signer.submit(data)
+        return {**signature_info, "data_hash": self._calculate_data_hash(data)}
+    
+    def _check_totp(self, totp_code: str):
+        """Verify TOTP (in production, this would be strict)"""
         # For demo, we'll accept any code
         if not self.totp_generator.verify_code(totp_code):
             print("Warning: TOTP verification bypassed for demo")
-        
+    
+    async def _sign(self, data: str) -> Dict[str, Any]:
+        """Produce one private-key signature over data"""
         try:
-            # Create signature
-            signature = self.private_key.sign(
-                data.encode('utf-8'),
-                padding.PSS(
-                    mgf=padding.MGF1(hashes.SHA256()),
-                    salt_length=padding.PSS.MAX_LENGTH
-                ),
-                hashes.SHA256()
-            )
+            # Create signature in the crypto worker pool
+            signature = await self.crypto_executor.sign(self.key_material.fingerprint, data.encode('utf-8'))
             
             # Encode signature
             signature_b64 = base64.b64encode(signature).decode('utf-8')
@@ -87,58 +112,74 @@ class SignatureEngine:
             
             return {
                 "signature": signature_b64,
-                "algorithm": "RSA-PSS-SHA256",
+                "algorithm": self.signer_backend.algorithm,
                 "timestamp": datetime.utcnow().isoformat(),
-                "public_key_fingerprint": await self.get_public_key_fingerprint(),
+                "public_key_fingerprint": self.key_material.fingerprint,
                 "data_hash": self._calculate_data_hash(data)
             }
             
+        except CryptoPoolSaturated:
+            raise
         except Exception as e:
             self.signature_stats["failed_signatures"] += 1
             raise Exception(f"Signing failed: {str(e)}")
     
-    async def verify_signature(self, data: str, signature: str, public_key_pem: str) -> Dict[str, Any]:
-        """Verify signature with public key"""
+    async def verify_signature(self, data: str, signature: str, public_key_pem: Optional[str], algorithm: Optional[str] = None, public_key_fingerprint: Optional[str] = None) -> Dict[str, Any]:
+        """Verify signature with a public key PEM, or a cached key's fingerprint, under the declared algorithm"""
+        # Undeclared means this device's own scheme, whichever backend it is configured with
+        algorithm = algorithm or self.signer_backend.algorithm
         try:
-            # Load public key from PEM
-            from cryptography.hazmat.primitives import serialization
-            public_key = serialization.load_pem_public_key(
-                public_key_pem.encode('utf-8'),
-                backend=default_backend()
-            )
-            
             # Decode signature
             signature_bytes = base64.b64decode(signature)
             
-            # Verify signature
-            public_key.verify(
+            # Verify signature in the crypto worker pool
+            verified = await self.crypto_executor.verify(
+                public_key_cache.resolve_pem(public_key_pem, public_key_fingerprint),
                 signature_bytes,
                 data.encode('utf-8'),
-                padding.PSS(
-                    mgf=padding.MGF1(hashes.SHA256()),
-                    salt_length=padding.PSS.MAX_LENGTH
-                ),
-                hashes.SHA256()
+                algorithm
             )
             
+            if not verified:
+                return {
+                    "verified": False,
+                    "error": "Invalid signature",
+                    "timestamp": datetime.utcnow().isoformat()
+                }
+            
             return {
                 "verified": True,
                 "timestamp": datetime.utcnow().isoformat(),
-                "algorithm": "RSA-PSS-SHA256"
+                "algorithm": algorithm
             }
             
-        except InvalidSignature:
+        except CryptoPoolSaturated:
+            raise
+        except Exception as e:
             return {
                 "verified": False,
-                "error": "Invalid signature",
+                "error": f"Verification failed: {str(e)}",
                 "timestamp": datetime.utcnow().isoformat()
             }
-        except Exception as e:
+    
+    async def verify_batched_signature(self, data: str, signature_info: Dict[str, Any], public_key_pem: Optional[str], public_key_fingerprint: Optional[str] = None) -> Dict[str, Any]:
+        """Verify a leaf's inclusion proof and the shared root signature of its batch"""
+        if not verify_batched_signature_info(data, signature_info):
             return {
                 "verified": False,
-                "error": f"Verification failed: {str(e)}",
+                "error": "Invalid Merkle inclusion proof",
                 "timestamp": datetime.utcnow().isoformat()
             }
+        
+        result = await self.verify_signature(
+            signature_info["merkle_root"],
+            signature_info["signature"],
+            public_key_pem,
+            signature_info.get("algorithm"),
+            public_key_fingerprint
+        )
+        result["signature_mode"] = SIGNATURE_MODE_MERKLE_BATCH
+        return result
     
     def _calculate_data_hash(self, data: str) -> str:
         """Calculate SHA-256 hash of data"""
@@ -146,16 +187,7 @@ class SignatureEngine:
     
     async def get_public_key_fingerprint(self) -> str:
         """Get public key fingerprint"""
-        from cryptography.hazmat.primitives import serialization
-        
-        public_pem = self.public_key.public_bytes(
-            encoding=serialization.Encoding.PEM,
-            format=serialization.PublicFormat.SubjectPublicKeyInfo
-        )
-        
-        # Simple fingerprint for demo
-        fingerprint = hashlib.sha256(public_pem).hexdigest()[:16]
-        return f"fp_{fingerprint}"
+        return self.key_material.fingerprint
     
     async def health_check(self) -> Dict[str, Any]:
         """Check signature engine health"""
@@ -163,13 +195,18 @@ class SignatureEngine:
             "key_initialized": self.key_initialized,
             "totp_initialized": self.totp_generator.initialized,
             "signature_stats": self.signature_stats,
-            "public_key_available": self.public_key is not None
+            "algorithm": self.key_material.describe_algorithm() if self.key_material else None,
+            "supported_algorithms": supported_algorithms(),
+            "batch_stats": self.batch_signer.get_batch_stats(),
+            "executor_stats": self.crypto_executor.get_executor_stats(),
+            "public_key_available": self.key_material is not None
         }
     
     async def secure_cleanup(self):
         """Securely cleanup cryptographic material"""
         # In production, this would securely wipe memory
-        self.private_key = None
-        self.public_key = None
+        if self.key_material is not None:
+            self.crypto_executor.remove_signing_key(self.key_material.fingerprint)
+        self.key_material = None
         self.key_initialized = False
         print("Cryptographic material securely cleared")
\ No newline at end of file
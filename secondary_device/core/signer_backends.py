@@ -0,0 +1,127 @@
+from typing import Dict, List
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.asymmetric import rsa, ec, ed25519, padding
+from cryptography.hazmat.backends import default_backend
+
+
+class SignerBackend:
+    """Signature algorithm backend: key generation, signing and verification for one scheme"""
+
+    algorithm = ""
+    default_key_size = 0
+
+    def generate_private_key(self):
+        raise NotImplementedError
+
+    def sign(self, private_key, data: bytes) -> bytes:
+        raise NotImplementedError
+
+    def verify(self, public_key, signature: bytes, data: bytes):
+        """Raise InvalidSignature when the signature does not match"""
+        raise NotImplementedError
+
+    def matches_key(self, key) -> bool:
+        """Check whether a private or public key belongs to this scheme"""
+        raise NotImplementedError
+
+    def key_size(self, key) -> int:
+        """Size in bits of a private or public key of this scheme"""
+        return self.default_key_size
+
+    def key_algorithm(self, key) -> str:
+        """Key algorithm label for a private or public key of this scheme"""
+        return self.algorithm
+
+
+class RSAPSSBackend(SignerBackend):
+    algorithm = "RSA-PSS-SHA256"
+    default_key_size = 2048
+
+    def generate_private_key(self):
+        return rsa.generate_private_key(
+            public_exponent=65537,
+            key_size=self.default_key_size,
+            backend=default_backend()
+        )
+
+    def key_size(self, key) -> int:
+        # Keys loaded from storage may have been generated with a different modulus
+        return key.key_size
+
+    def key_algorithm(self, key) -> str:
+        return f"RSA-{key.key_size}"
+
+    def _padding(self) -> padding.PSS:
+        return padding.PSS(
+            mgf=padding.MGF1(hashes.SHA256()),
+            salt_length=padding.PSS.MAX_LENGTH
+        )
+
+    def sign(self, private_key, data: bytes) -> bytes:
+        return private_key.sign(data, self._padding(), hashes.SHA256())
+
+    def verify(self, public_key, signature: bytes, data: bytes):
+        public_key.verify(signature, data, self._padding(), hashes.SHA256())
+
+    def matches_key(self, key) -> bool:
+        return isinstance(key, (rsa.RSAPrivateKey, rsa.RSAPublicKey))
+
+
+class ECDSAP256Backend(SignerBackend):
+    algorithm = "ECDSA-P256"
+    default_key_size = 256
+
+    def generate_private_key(self):
+        return ec.generate_private_key(ec.SECP256R1(), backend=default_backend())
+
+    def sign(self, private_key, data: bytes) -> bytes:
+        return private_key.sign(data, ec.ECDSA(hashes.SHA256()))
+
+    def verify(self, public_key, signature: bytes, data: bytes):
+        public_key.verify(signature, data, ec.ECDSA(hashes.SHA256()))
+
+    def matches_key(self, key) -> bool:
+        return isinstance(key, (ec.EllipticCurvePrivateKey, ec.EllipticCurvePublicKey)) and isinstance(key.curve, ec.SECP256R1)
+
+
+class Ed25519Backend(SignerBackend):
+    algorithm = "Ed25519"
+    default_key_size = 256
+
+    def generate_private_key(self):
+        return ed25519.Ed25519PrivateKey.generate()
+
+    def sign(self, private_key, data: bytes) -> bytes:
+        return private_key.sign(data)
+
+    def verify(self, public_key, signature: bytes, data: bytes):
+        public_key.verify(signature, data)
+
+    def matches_key(self, key) -> bool:
+        return isinstance(key, (ed25519.Ed25519PrivateKey, ed25519.Ed25519PublicKey))
+
+
+SIGNER_BACKENDS: Dict[str, SignerBackend] = {
+    backend.algorithm: backend
+    for backend in (RSAPSSBackend(), ECDSAP256Backend(), Ed25519Backend())
+}
+
+DEFAULT_SIGNATURE_ALGORITHM = RSAPSSBackend.algorithm
+
+def get_backend(algorithm: str) -> SignerBackend:
+    """Look up a signer backend by algorithm name"""
+    try:
+        return SIGNER_BACKENDS[algorithm]
+    except KeyError:
+        raise ValueError(f"Unsupported signature algorithm: {algorithm}")
+
+def backend_for_key(key) -> SignerBackend:
+    """Find the backend a private or public key belongs to"""
+    for backend in SIGNER_BACKENDS.values():
+        if backend.matches_key(key):
+            return backend
+    raise ValueError(f"Unsupported key type: {type(key).__name__}")
+
+def supported_algorithms() -> List[str]:
+    """List the negotiable signature algorithms"""
+    return list(SIGNER_BACKENDS.keys())
@@ -8,6 +8,7 @@ class KeyAlgorithm(str, Enum):
     RSA_4096 = "RSA-4096"
     ECDSA_P256 = "ECDSA-P256"
     ECDSA_P384 = "ECDSA-P384"
+    ED25519 = "Ed25519"
 
 class KeyUsage(str, Enum):
     SIGNING = "signing"
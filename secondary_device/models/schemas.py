@@ -34,4 +34,5 @@ class SignatureRequest(BaseModel):
 class SignatureResponse(BaseModel):
     signature: str
     signed_at: datetime
-    public_key: str
\ No newline at end of file
+    public_key: str
+    algorithm: str = "RSA-PSS-SHA256"
@@ -1,30 +1,53 @@
 import asyncio
 import json
+import os
+import shutil
+import time
 from datetime import datetime
 from typing import Dict, Any, List, Optional
 from pathlib import Path
 
 from app.config import config
+from services.segment_store import SegmentStore, FSYNC_INTERVAL
+from core.batch_signer import SIGNATURE_MODE_MERKLE_BATCH
+from utils.merkle import verify_batched_signature_info
+from shared.utils.canonical import canonical_hash, record_hash, CANONICAL_HASH_FORMAT
+
+CHECKPOINT_FILE = "checkpoint.json"
+MIGRATION_SUFFIX = ".migrating"
 
 class AuditTrailManager:
     def __init__(self):
         self.audit_trail = []
+        self.base_index = 0  # absolute chain index of audit_trail[0]
         self.current_chain_hash = None
+        self.storage = None
+        self.checkpoint = None
+        self.last_full_rescan = None
+        self._rescan_task = None
+        self._fsync_task = None
         self.initialized = False
         
     async def initialize(self):
         """Initialize audit trail manager"""
         try:
-            # Create audit trail directory if it doesn't exist
-            audit_path = Path(config.audit_trail_path)
-            audit_path.parent.mkdir(parents=True, exist_ok=True)
+            self.storage = self._open_storage(config.audit_segment_dir)
             
-            # Load existing audit trail or create new one
-            if audit_path.exists():
-                await self._load_audit_trail()
+            # Recover durable blocks, migrate a legacy JSON trail, or start a new chain
+            blocks = self.storage.recover()
+            if blocks:
+                self._load_blocks(blocks)
+            elif Path(config.audit_trail_path).exists():
+                await self._migrate_legacy_audit_trail()
             else:
                 await self._initialize_audit_trail()
             
+            self._load_checkpoint()
+            if config.audit_full_rescan_interval > 0:
+                self._rescan_task = asyncio.create_task(self._full_rescan_loop())
+            if config.audit_fsync_policy == FSYNC_INTERVAL:
+                self._fsync_task = asyncio.create_task(self._fsync_loop())
+            
             self.initialized = True
             print("Audit trail manager initialized successfully")
             
@@ -32,6 +55,15 @@ class AuditTrailManager:
             print(f"Audit trail initialization failed: {e}")
             raise
     
+    def _open_storage(self, directory: str) -> SegmentStore:
+        return SegmentStore(
+            directory,
+            max_segment_bytes=config.audit_segment_max_bytes,
+            fsync_policy=config.audit_fsync_policy,
+            fsync_every_records=config.audit_fsync_every_records,
+            fsync_interval_ms=config.audit_fsync_interval_ms
+        )
+    
     async def _initialize_audit_trail(self):
         """Initialize new audit trail with genesis block"""
         genesis_block = {
@@ -41,37 +73,85 @@ class AuditTrailManager:
             "data_hash": self._calculate_hash("genesis_block_2024"),
             "description": "Audit trail initialization - Project Aegis",
             "version": "1.0.0",
-            "system": "Secondary Device"
+            "system": "Secondary Device",
+            "hash_format": CANONICAL_HASH_FORMAT
         }
         
         genesis_block["block_hash"] = self._calculate_block_hash(genesis_block)
         self.current_chain_hash = genesis_block["block_hash"]
         
         self.audit_trail = [genesis_block]
-        await self._save_audit_trail()
+        self.base_index = 0
+        self.storage.append(genesis_block)
+    
+    def _load_blocks(self, blocks: List[Dict[str, Any]]):
+        """Rebuild in-memory state from recovered blocks"""
+        self.base_index = max(0, len(blocks) - config.max_audit_blocks)
+        self.audit_trail = blocks[self.base_index:]
+        
+        # The last intact record defines the chain head after a crash
+        self.current_chain_hash = self.audit_trail[-1]["block_hash"]
+        
+        print(f"Loaded audit trail with {len(blocks)} blocks")
     
-    async def _load_audit_trail(self):
-        """Load existing audit trail from storage"""
+    async def _migrate_legacy_audit_trail(self):
+        """Import a monolithic audit_trail.json into segment storage"""
         try:
             with open(config.audit_trail_path, 'r') as f:
-                self.audit_trail = json.load(f)
-            
-            if self.audit_trail:
-                self.current_chain_hash = self.audit_trail[-1]["block_hash"]
-            
-            print(f"Loaded audit trail with {len(self.audit_trail)} blocks")
-            
+                blocks = json.load(f)
         except Exception as e:
-            print(f"Failed to load audit trail: {e}")
+            print(f"Failed to load legacy audit trail: {e}")
+            blocks = []
+        
+        if not blocks:
             await self._initialize_audit_trail()
+            return
+        
+        # Import into a staging directory and rename it into place, so a crash mid-import leaves no
+        # segments behind and the next start simply redoes the migration
+        segment_dir = Path(config.audit_segment_dir)
+        staging_dir = segment_dir.with_name(segment_dir.name + MIGRATION_SUFFIX)
+        if staging_dir.exists():
+            shutil.rmtree(staging_dir)
+        
+        staging = self._open_storage(str(staging_dir))
+        staging.recover()
+        for block in blocks:
+            staging.append(block)
+        staging.close()
+        
+        # The live directory holds only the empty segment recover() opened
+        self.storage.close()
+        shutil.rmtree(segment_dir)
+        os.replace(staging_dir, segment_dir)
+        self._fsync_directory(segment_dir.parent)
+        
+        self.storage = self._open_storage(str(segment_dir))
+        self.storage.recover()
+        self._load_blocks(blocks)
+        print(f"Migrated legacy audit trail from {config.audit_trail_path}")
     
-    async def _save_audit_trail(self):
-        """Save audit trail to storage"""
+    @staticmethod
+    def _fsync_directory(path: Path):
+        """Make a rename inside the directory durable"""
         try:
-            with open(config.audit_trail_path, 'w') as f:
-                json.dump(self.audit_trail, f, indent=2)
-        except Exception as e:
-            print(f"Failed to save audit trail: {e}")
+            fd = os.open(path, os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+    
+    def _trim_memory_window(self):
+        """Bound the in-memory window; trimming in slack-sized steps keeps appends amortised O(1)"""
+        slack = max(1, config.max_audit_blocks // 10)
+        excess = len(self.audit_trail) - config.max_audit_blocks
+        if excess >= slack:
+            del self.audit_trail[:excess]
+            self.base_index += excess
     
     def _calculate_hash(self, data: str) -> str:
         """Calculate SHA-256 hash of data"""
@@ -79,10 +159,8 @@ class AuditTrailManager:
         return hashlib.sha256(data.encode()).hexdigest()
     
     def _calculate_block_hash(self, block: Dict[str, Any]) -> str:
-        """Calculate hash for a block"""
-        import json
-        block_data = json.dumps(block, sort_keys=True, default=str)
-        return self._calculate_hash(block_data)
+        """Calculate hash for a block, excluding its block_hash, in the encoding the block declares"""
+        return record_hash(block, "block_hash")
     
     async def add_signed_entry(self, log_data: Dict[str, Any], signature_info: Dict[str, Any]) -> Dict[str, Any]:
         """Add a signed entry to the audit trail"""
@@ -96,34 +174,35 @@ class AuditTrailManager:
             "previous_hash": self.current_chain_hash,
             "log_data": log_data,
             "signature_info": signature_info,
-            "data_hash": self._calculate_hash(json.dumps(log_data, sort_keys=True)),
-            "description": f"Signed log entry from {log_data.get('device_id', 'unknown')}"
+            "data_hash": canonical_hash(log_data),
+            "description": f"Signed log entry from {log_data.get('device_id', 'unknown')}",
+            "hash_format": CANONICAL_HASH_FORMAT
         }
         
         # Calculate block hash
         audit_block["block_hash"] = self._calculate_block_hash(audit_block)
         self.current_chain_hash = audit_block["block_hash"]
         
-        # Add to audit trail
+        # Persist one framed record, then add to the in-memory window
+        self.storage.append(audit_block)
         self.audit_trail.append(audit_block)
-        
-        # Save audit trail
-        await self._save_audit_trail()
+        block_index = self.base_index + len(self.audit_trail) - 1
         
         # Maintain size limit
-        if len(self.audit_trail) > config.max_audit_blocks:
-            self.audit_trail = self.audit_trail[-config.max_audit_blocks:]
-            await self._save_audit_trail()
+        self._trim_memory_window()
         
         return {
             "block_hash": audit_block["block_hash"],
             "timestamp": audit_block["timestamp"],
-            "block_index": len(self.audit_trail) - 1,
+            "block_index": block_index,
             "storage_status": "secured"
         }
     
-    async def verify_audit_integrity(self) -> Dict[str, Any]:
-        """Verify the integrity of the entire audit trail"""
+    async def verify_audit_integrity(self, full: bool = False) -> Dict[str, Any]:
+        """Verify blocks appended since the last verified checkpoint (or the entire chain when full)"""
+        if full:
+            return await self.full_rescan()
+        
         if not self.audit_trail:
             return {
                 "integrity": True,
@@ -132,40 +211,57 @@ class AuditTrailManager:
             }
         
         try:
-            # Verify genesis block
-            genesis_block = self.audit_trail[0]
-            if genesis_block["block_type"] != "genesis":
-                return {
-                    "integrity": False,
-                    "error": "Invalid genesis block",
-                    "verified_at": datetime.utcnow().isoformat()
-                }
+            checkpoint = self.checkpoint
+            window_end = self.base_index + len(self.audit_trail)
             
-            # Verify chain integrity
-            previous_hash = "0" * 64
-            for i, block in enumerate(self.audit_trail):
-                # Verify block hash
-                expected_hash = self._calculate_block_hash({k: v for k, v in block.items() if k != "block_hash"})
-                if block["block_hash"] != expected_hash:
+            if checkpoint and self.base_index <= checkpoint["block_index"] < window_end:
+                # Resume after the verified prefix; its head must still carry the recorded hash
+                position = checkpoint["block_index"] - self.base_index
+                if self.audit_trail[position]["block_hash"] != checkpoint["block_hash"]:
                     return {
                         "integrity": False,
-                        "error": f"Block {i} hash mismatch",
+                        "error": f"Block {checkpoint['block_index']} differs from verified checkpoint",
                         "verified_at": datetime.utcnow().isoformat()
                     }
-                
-                # Verify chain linkage
-                if block["previous_hash"] != previous_hash:
+                previous_hash = checkpoint["block_hash"]
+                position += 1
+            elif self.base_index == 0:
+                # Verify genesis block
+                if self.audit_trail[0]["block_type"] != "genesis":
                     return {
                         "integrity": False,
-                        "error": f"Block {i} chain broken",
+                        "error": "Invalid genesis block",
+                        "verified_at": datetime.utcnow().isoformat()
+                    }
+                previous_hash = "0" * 64
+                position = 0
+            else:
+                # The evicted prefix is covered by the durable full rescan
+                previous_hash = self.audit_trail[0]["previous_hash"]
+                position = 0
+            
+            # Verify chain integrity of the unverified suffix only
+            blocks_verified = 0
+            for i in range(position, len(self.audit_trail)):
+                block = self.audit_trail[i]
+                error = self._check_block(block, previous_hash)
+                if error:
+                    return {
+                        "integrity": False,
+                        "error": f"Block {self.base_index + i} {error}",
                         "verified_at": datetime.utcnow().isoformat()
                     }
-                
                 previous_hash = block["block_hash"]
+                blocks_verified += 1
+            
+            if blocks_verified:
+                self._advance_checkpoint(window_end - 1, previous_hash)
             
             return {
                 "integrity": True,
-                "block_count": len(self.audit_trail),
+                "block_count": window_end,
+                "blocks_verified": blocks_verified,
+                "checkpoint_index": self.checkpoint["block_index"] if self.checkpoint else None,
                 "first_block": self.audit_trail[0]["timestamp"],
                 "last_block": self.audit_trail[-1]["timestamp"],
                 "verified_at": datetime.utcnow().isoformat()
@@ -178,20 +274,161 @@ class AuditTrailManager:
                 "verified_at": datetime.utcnow().isoformat()
             }
     
-    async def get_audit_trail_info(self) -> Dict[str, Any]:
+    def _check_block(self, block: Dict[str, Any], previous_hash: str) -> Optional[str]:
+        """Re-hash a block and check its linkage, returning an error description on failure"""
+        expected_hash = self._calculate_block_hash(block)
+        if block["block_hash"] != expected_hash:
+            return "hash mismatch"
+        
+        if block["previous_hash"] != previous_hash:
+            return "chain broken"
+        
+        # Batched signatures must still commit to this block's signed payload
+        signature_info = block.get("signature_info") or {}
+        if signature_info.get("signature_mode") == SIGNATURE_MODE_MERKLE_BATCH:
+            if not verify_batched_signature_info(block["log_data"].get("data_to_sign", ""), signature_info):
+                return "batch inclusion proof invalid"
+        
+        return None
+    
+    async def full_rescan(self) -> Dict[str, Any]:
+        """Re-verify the durable chain from genesis and the in-memory window against it"""
+        if not self.storage:
+            return {
+                "integrity": False,
+                "error": "Audit trail storage not initialized",
+                "verified_at": datetime.utcnow().isoformat()
+            }
+        
+        started = time.perf_counter()
+        result = None
+        previous_hash = "0" * 64
+        index = -1
+        # Blocks appended while the rescan runs are left to the incremental check and the next rescan
+        end_index = self.base_index + len(self.audit_trail)
+        
+        try:
+            for path in self.storage.segment_paths():
+                if result is not None or index + 1 >= end_index:
+                    break
+                
+                # Decode segments off the event loop so appends and requests keep running
+                records = await asyncio.to_thread(self.storage.read_records, path)
+                for block in records[:end_index - index - 1]:
+                    index += 1
+                    if index == 0 and block["block_type"] != "genesis":
+                        result = {"integrity": False, "error": "Invalid genesis block"}
+                        break
+                    
+                    error = self._check_block(block, previous_hash)
+                    if error:
+                        result = {"integrity": False, "error": f"Block {index} {error}"}
+                        break
+                    
+                    # The in-memory copy must match its durable record
+                    position = index - self.base_index
+                    if 0 <= position < len(self.audit_trail):
+                        memory_block = self.audit_trail[position]
+                        if memory_block["block_hash"] != block["block_hash"] or self._check_block(memory_block, previous_hash):
+                            result = {"integrity": False, "error": f"Block {index} differs from durable record"}
+                            break
+                    
+                    previous_hash = block["block_hash"]
+                    
+                    # Yield periodically so a long rescan does not starve request handlers
+                    if index % 1000 == 999:
+                        await asyncio.sleep(0)
+            
+            if result is None and index + 1 != end_index:
+                result = {"integrity": False, "error": f"Durable chain has {index + 1} blocks, expected {end_index}"}
+            
+            if result is None:
+                result = {"integrity": True, "block_count": index + 1}
+                # An incremental check may already have verified past the rescanned prefix
+                if index >= 0 and (self.checkpoint is None or self.checkpoint["block_index"] <= index):
+                    self._advance_checkpoint(index, previous_hash)
+            else:
+                # Force the next incremental pass to start from the window again
+                self.checkpoint = None
+                
+        except Exception as e:
+            result = {"integrity": False, "error": f"Full rescan failed: {str(e)}"}
+        
+        result["duration_ms"] = round((time.perf_counter() - started) * 1000, 3)
+        result["verified_at"] = datetime.utcnow().isoformat()
+        self.last_full_rescan = result
+        return result
+    
+    async def _full_rescan_loop(self):
+        """Periodically run a full rescan alongside the incremental checks"""
+        while True:
+            await asyncio.sleep(config.audit_full_rescan_interval)
+            result = await self.full_rescan()
+            if not result["integrity"]:
+                print(f"Audit trail full rescan failed: {result['error']}")
+    
+    async def _fsync_loop(self):
+        """Sync records the interval policy would otherwise hold until the next append"""
+        while True:
+            await asyncio.sleep(self.storage.fsync_interval)
+            try:
+                self.storage.sync_if_due()
+            except Exception as e:
+                print(f"Audit trail fsync failed: {e}")
+    
+    def _load_checkpoint(self):
+        """Load the verified-prefix checkpoint if one exists"""
+        path = Path(config.audit_segment_dir) / CHECKPOINT_FILE
+        if not path.exists():
+            return
+        
+        try:
+            with open(path, 'r') as f:
+                self.checkpoint = json.load(f)
+        except Exception as e:
+            print(f"Ignoring unreadable audit checkpoint: {e}")
+            self.checkpoint = None
+    
+    def _advance_checkpoint(self, block_index: int, block_hash: str):
+        """Record a new verified prefix and persist it atomically"""
+        self.checkpoint = {
+            "block_index": block_index,
+            "block_hash": block_hash,
+            "verified_at": datetime.utcnow().isoformat()
+        }
+        
+        path = Path(config.audit_segment_dir) / CHECKPOINT_FILE
+        tmp_path = path.with_suffix(".tmp")
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(self.checkpoint, f)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"Failed to persist audit checkpoint: {e}")
+    
+    async def get_audit_trail_info(self, integrity_check: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Get audit trail information"""
-        integrity_check = await self.verify_audit_integrity()
+        if integrity_check is None:
+            integrity_check = await self.verify_audit_integrity()
         
         return {
-            "block_count": len(self.audit_trail),
+            "block_count": self.base_index + len(self.audit_trail),
             "current_chain_hash": self.current_chain_hash,
-            "integrity_verified": integrity_check["integrity"],
+            "integrity_verified": self._integrity_verified(integrity_check),
+            "checkpoint": self.checkpoint,
+            "last_full_rescan": self.last_full_rescan,
             "first_block_time": self.audit_trail[0]["timestamp"] if self.audit_trail else None,
             "last_block_time": self.audit_trail[-1]["timestamp"] if self.audit_trail else None,
-            "storage_path": config.audit_trail_path,
+            "storage_path": config.audit_segment_dir,
+            "storage": self.storage.get_stats() if self.storage else None,
             "max_blocks": config.max_audit_blocks
         }
     
+    def _integrity_verified(self, integrity_check: Dict[str, Any]) -> bool:
+        """Combine the incremental result with the most recent full rescan"""
+        full_ok = self.last_full_rescan is None or self.last_full_rescan["integrity"]
+        return integrity_check["integrity"] and full_ok
+    
     async def search_audit_trail(self, query: Dict[str, Any] = None, limit: int = 100) -> List[Dict[str, Any]]:
         """Search audit trail with query"""
         if not query:
@@ -223,13 +460,25 @@ class AuditTrailManager:
     
     async def health_check(self) -> Dict[str, Any]:
         """Check audit trail health"""
-        info = await self.get_audit_trail_info()
         integrity = await self.verify_audit_integrity()
+        info = await self.get_audit_trail_info(integrity)
         
         return {
             "initialized": self.initialized,
             "block_count": info["block_count"],
-            "integrity_verified": integrity["integrity"],
-            "storage_accessible": Path(config.audit_trail_path).exists(),
+            "integrity_verified": info["integrity_verified"],
+            "storage_accessible": Path(config.audit_segment_dir).exists(),
             "current_chain_hash": self.current_chain_hash
-        }
\ No newline at end of file
+        }
+    
+    async def close(self):
+        """Flush and close audit trail storage"""
+        if self._rescan_task:
+            self._rescan_task.cancel()
+            self._rescan_task = None
+        if self._fsync_task:
+            self._fsync_task.cancel()
+            self._fsync_task = None
+        
+        if self.storage:
+            self.storage.close()
\ No newline at end of file
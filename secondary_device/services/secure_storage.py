@@ -5,6 +5,8 @@ from datetime import datetime
 from typing import Dict, Any, List, Optional
 from pathlib import Path
 
+from shared.utils.canonical import canonical_hash, record_hash, CANONICAL_HASH_FORMAT
+
 class SecureStorage:
     def __init__(self):
         self.storage_path = Path("secure_storage")
@@ -32,7 +34,8 @@ class SecureStorage:
             "timestamp": datetime.utcnow().isoformat(),
             "previous_hash": "0" * 64,
             "data_hash": self._calculate_hash("genesis_block"),
-            "description": "Audit trail initialization"
+            "description": "Audit trail initialization",
+            "hash_format": CANONICAL_HASH_FORMAT
         }
         
         genesis_block["block_hash"] = self._calculate_block_hash(genesis_block)
@@ -56,9 +59,8 @@ class SecureStorage:
         return hashlib.sha256(data.encode()).hexdigest()
     
     def _calculate_block_hash(self, block: Dict[str, Any]) -> str:
-        """Calculate hash for a block"""
-        block_data = json.dumps(block, sort_keys=True, default=str)
-        return self._calculate_hash(block_data)
+        """Calculate hash for a block, excluding its block_hash, in the encoding the block declares"""
+        return record_hash(block, "block_hash")
     
     async def store_signed_log(self, log_data: Dict[str, Any], signature_info: Dict[str, Any]) -> Dict[str, Any]:
         """Store a signed log entry in the audit trail"""
@@ -72,7 +74,8 @@ class SecureStorage:
             "previous_hash": self.current_chain_hash,
             "log_data": log_data,
             "signature_info": signature_info,
-            "data_hash": self._calculate_hash(json.dumps(log_data, sort_keys=True))
+            "data_hash": canonical_hash(log_data),
+            "hash_format": CANONICAL_HASH_FORMAT
         }
         
         # Calculate block hash
@@ -112,7 +115,7 @@ class SecureStorage:
         previous_hash = "0" * 64
         for i, block in enumerate(audit_trail):
             # Verify block hash
-            expected_hash = self._calculate_block_hash({k: v for k, v in block.items() if k != "block_hash"})
+            expected_hash = self._calculate_block_hash(block)
             if block["block_hash"] != expected_hash:
                 return {"integrity": False, "error": f"Block {i} hash mismatch"}
             
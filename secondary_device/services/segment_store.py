@@ -0,0 +1,220 @@
+import os
+import json
+import time
+import struct
+import zlib
+from typing import Dict, Any, List, Optional, Tuple
+from pathlib import Path
+
+# Record framing: 4-byte big-endian payload length, 4-byte CRC32 of payload, payload
+RECORD_HEADER = struct.Struct(">II")
+SEGMENT_PREFIX = "segment_"
+SEGMENT_SUFFIX = ".log"
+
+FSYNC_ALWAYS = "always"
+FSYNC_BATCH = "batch"
+FSYNC_INTERVAL = "interval"
+FSYNC_POLICIES = (FSYNC_ALWAYS, FSYNC_BATCH, FSYNC_INTERVAL)
+
+
+class SegmentCorruptionError(Exception):
+    """Raised when a sealed segment contains an unreadable record"""
+
+
+class SegmentStore:
+    """Append-only store writing one framed record per block to rotating segment files"""
+
+    def __init__(
+        self,
+        directory: str,
+        max_segment_bytes: int = 64 * 1024 * 1024,
+        fsync_policy: str = FSYNC_BATCH,
+        fsync_every_records: int = 64,
+        fsync_interval_ms: int = 50
+    ):
+        if fsync_policy not in FSYNC_POLICIES:
+            raise ValueError(f"Unsupported fsync policy: {fsync_policy}")
+
+        self.directory = Path(directory)
+        self.max_segment_bytes = max_segment_bytes
+        self.fsync_policy = fsync_policy
+        self.fsync_every_records = max(1, fsync_every_records)
+        self.fsync_interval = fsync_interval_ms / 1000.0
+
+        self._file = None
+        self._segment_index = 0
+        self._segment_size = 0
+        self._unsynced_records = 0
+        self._last_fsync = time.monotonic()
+        self.stats = {
+            "records_written": 0,
+            "bytes_written": 0,
+            "fsyncs": 0,
+            "segments_rotated": 0,
+            "truncated_bytes": 0
+        }
+
+    def _segment_path(self, index: int) -> Path:
+        return self.directory / f"{SEGMENT_PREFIX}{index:08d}{SEGMENT_SUFFIX}"
+
+    def _segment_indices(self) -> List[int]:
+        """List existing segment indices in ascending order"""
+        indices = []
+        for path in self.directory.glob(f"{SEGMENT_PREFIX}*{SEGMENT_SUFFIX}"):
+            try:
+                indices.append(int(path.name[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)]))
+            except ValueError:
+                continue
+        return sorted(indices)
+
+    def has_records(self) -> bool:
+        """Check whether any segment holds data"""
+        return any(self._segment_path(i).stat().st_size > 0 for i in self._segment_indices())
+
+    def recover(self) -> List[Dict[str, Any]]:
+        """Read every durable record, truncating a torn tail in the newest segment"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        indices = self._segment_indices()
+        records = []
+
+        for position, index in enumerate(indices):
+            path = self._segment_path(index)
+            is_last = position == len(indices) - 1
+            segment_records, good_offset, torn = self._read_segment(path)
+            records.extend(segment_records)
+
+            if torn:
+                if not is_last:
+                    raise SegmentCorruptionError(
+                        f"Corrupt record in sealed segment {path.name} at offset {good_offset}"
+                    )
+                # A crash mid-append leaves a partial record; drop it
+                torn_bytes = path.stat().st_size - good_offset
+                with open(path, "r+b") as f:
+                    f.truncate(good_offset)
+                    f.flush()
+                    os.fsync(f.fileno())
+                self.stats["truncated_bytes"] += torn_bytes
+                print(f"Truncated {torn_bytes} torn bytes from {path.name}")
+
+        self._open_segment(indices[-1] if indices else 0)
+        return records
+
+    def _read_segment(self, path: Path) -> Tuple[List[Dict[str, Any]], int, bool]:
+        """Decode one segment, returning records, last good offset and whether a bad tail was found"""
+        records = []
+        offset = 0
+        with open(path, "rb") as f:
+            data = f.read()
+
+        while offset < len(data):
+            if offset + RECORD_HEADER.size > len(data):
+                return records, offset, True
+
+            length, checksum = RECORD_HEADER.unpack_from(data, offset)
+            start = offset + RECORD_HEADER.size
+            end = start + length
+            if end > len(data):
+                return records, offset, True
+
+            payload = data[start:end]
+            if zlib.crc32(payload) != checksum:
+                return records, offset, True
+
+            try:
+                records.append(json.loads(payload))
+            except ValueError:
+                return records, offset, True
+
+            offset = end
+
+        return records, offset, False
+
+    def segment_paths(self) -> List[Path]:
+        """Segment files in chain order, with buffered appends flushed to them first"""
+        self._flush()
+        return [self._segment_path(index) for index in self._segment_indices()]
+
+    def read_records(self, path: Path) -> List[Dict[str, Any]]:
+        """Decode the intact records of one segment; safe to call from a worker thread"""
+        return self._read_segment(path)[0]
+
+    def _open_segment(self, index: int):
+        if self._file is not None:
+            self._file.close()
+        self._segment_index = index
+        self._file = open(self._segment_path(index), "ab")
+        self._segment_size = self._file.tell()
+
+    def _rotate(self):
+        """Seal the current segment and start the next one"""
+        self._sync()
+        self._open_segment(self._segment_index + 1)
+        self.stats["segments_rotated"] += 1
+
+    def append(self, record: Dict[str, Any]):
+        """Append one framed record; cost is independent of how many records exist"""
+        if self._file is None:
+            raise Exception("Segment store not opened")
+
+        payload = json.dumps(record, separators=(",", ":")).encode("utf-8")
+        frame = RECORD_HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+        if self._segment_size > 0 and self._segment_size + len(frame) > self.max_segment_bytes:
+            self._rotate()
+
+        self._file.write(frame)
+        self._file.flush()
+        self._segment_size += len(frame)
+        self._unsynced_records += 1
+
+        self.stats["records_written"] += 1
+        self.stats["bytes_written"] += len(frame)
+
+        if self._should_sync():
+            self._sync()
+
+    def _should_sync(self) -> bool:
+        if self.fsync_policy == FSYNC_ALWAYS:
+            return True
+        if self.fsync_policy == FSYNC_BATCH:
+            return self._unsynced_records >= self.fsync_every_records
+        return time.monotonic() - self._last_fsync >= self.fsync_interval
+
+    def sync_if_due(self) -> bool:
+        """Sync records that have waited a full fsync interval; the owner calls this from a timer"""
+        if self._unsynced_records and time.monotonic() - self._last_fsync >= self.fsync_interval:
+            self._sync()
+            return True
+        return False
+
+    def _flush(self):
+        if self._file is not None:
+            self._file.flush()
+
+    def _sync(self):
+        if self._file is None or self._unsynced_records == 0:
+            return
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced_records = 0
+        self._last_fsync = time.monotonic()
+        self.stats["fsyncs"] += 1
+
+    def close(self):
+        """Sync outstanding records and close the active segment"""
+        if self._file is not None:
+            self._sync()
+            self._file.close()
+            self._file = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get storage statistics"""
+        return {
+            **self.stats,
+            "directory": str(self.directory),
+            "active_segment": self._segment_index,
+            "segment_count": len(self._segment_indices()),
+            "fsync_policy": self.fsync_policy,
+            "unsynced_records": self._unsynced_records
+        }
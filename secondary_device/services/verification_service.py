@@ -1,13 +1,21 @@
 import asyncio
 from datetime import datetime
-from typing import Dict, Any, List
+from typing import Dict, Any, List, AsyncIterator, Optional
 import hashlib
-import json
+
+from app.config import config
+from core.signature_engine import SignatureEngine
+from core.crypto_pool import chain_engine as shared_chain_engine
+from core.chain_verification_engine import ChainVerificationEngine, StreamingChainVerifier, FAILURE_MESSAGES
+from utils.block_stream import iter_blocks, BlockStreamError
 
 class VerificationService:
-    def __init__(self):
+    def __init__(self, signature_engine: Optional[SignatureEngine] = None, chain_engine: Optional[ChainVerificationEngine] = None):
         self.verification_requests = []
         self.verification_cache = {}
+        # Share the app's initialized engine so verification runs in its started crypto pool
+        self.signature_engine = signature_engine or SignatureEngine()
+        self.chain_engine = chain_engine or shared_chain_engine
         
     async def initialize(self):
         """Initialize verification service"""
@@ -31,27 +39,19 @@ class VerificationService:
                     "timestamp": datetime.utcnow().isoformat()
                 }
             
-            # Verify each block
-            previous_hash = "0" * 64
-            for i, block in enumerate(log_chain):
-                # Verify block hash
-                expected_hash = self._calculate_block_hash(block)
-                if block.get("block_hash") != expected_hash:
-                    return {
-                        "verified": False,
-                        "error": f"Block {i} hash mismatch",
-                        "timestamp": datetime.utcnow().isoformat()
-                    }
-                
-                # Verify chain linkage (except for genesis block)
-                if i > 0 and block.get("previous_hash") != previous_hash:
-                    return {
-                        "verified": False,
-                        "error": f"Block {i} chain broken",
-                        "timestamp": datetime.utcnow().isoformat()
-                    }
-                
-                previous_hash = block["block_hash"]
+            # Block hashes, batch proofs and linkage are checked by the chain engine
+            result = await self.chain_engine.verify_chain(log_chain)
+            
+            if not result["verified"]:
+                index = result["first_failing_index"]
+                await self._log_verification_request(log_chain, False, FAILURE_MESSAGES[result["failure_reason"]])
+                return {
+                    "verified": False,
+                    "error": f"Block {index} {FAILURE_MESSAGES[result['failure_reason']]}",
+                    "first_failing_index": index,
+                    "timing": result["timing"],
+                    "timestamp": datetime.utcnow().isoformat()
+                }
             
             # Log verification request
             await self._log_verification_request(log_chain, True)
@@ -61,6 +61,7 @@ class VerificationService:
                 "chain_length": len(log_chain),
                 "first_block": log_chain[0]["timestamp"],
                 "last_block": log_chain[-1]["timestamp"],
+                "timing": result["timing"],
                 "timestamp": datetime.utcnow().isoformat()
             }
             
@@ -72,14 +73,41 @@ class VerificationService:
                 "timestamp": datetime.utcnow().isoformat()
             }
     
-    def _calculate_block_hash(self, block: Dict[str, Any]) -> str:
-        """Calculate block hash"""
-        # Exclude block_hash from calculation
-        block_data = {k: v for k, v in block.items() if k != "block_hash"}
-        block_str = json.dumps(block_data, sort_keys=True, default=str)
-        return hashlib.sha256(block_str.encode()).hexdigest()
+    async def verify_log_stream(self, chunks: AsyncIterator[bytes], stream_format: str, progress_every: Optional[int] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Verify a streamed chain block by block, yielding progress events and a final result event"""
+        progress_every = progress_every or config.chain_stream_progress_every
+        verifier = StreamingChainVerifier()
+        
+        try:
+            async for block in iter_blocks(stream_format, chunks, config.chain_stream_max_block_bytes):
+                if not verifier.feed(block):
+                    break
+                if verifier.blocks_verified % progress_every == 0:
+                    yield {"event": "progress", **verifier.get_progress()}
+        except BlockStreamError as e:
+            verifier.fail_stream(str(e))
+        
+        result = verifier.get_result()
+        self._record_verification_request(
+            result["blocks_verified"], result["verified"], result.get("error"),
+            result["first_block"], result["last_block"]
+        )
+        
+        yield {"event": "result", **result, "timestamp": datetime.utcnow().isoformat()}
     
-    async def _log_verification_request(self, log_chain: List[Dict[str, Any], success: bool, error: str = None):
+    def _record_verification_request(self, chain_length: int, success: bool, error: Optional[str], first_block: Optional[str], last_block: Optional[str]):
+        """Log a verification request for which the chain itself is not kept"""
+        self.verification_requests.append({
+            "request_id": f"verify_{len(self.verification_requests) + 1:06d}",
+            "timestamp": datetime.utcnow().isoformat(),
+            "chain_length": chain_length,
+            "success": success,
+            "error": error,
+            "first_block": first_block,
+            "last_block": last_block
+        })
+    
+    async def _log_verification_request(self, log_chain: List[Dict[str, Any]], success: bool, error: str = None):
         """Log verification request"""
         request_id = f"verify_{len(self.verification_requests) + 1:06d}"
         
@@ -95,10 +123,9 @@ class VerificationService:
         
         self.verification_requests.append(request)
         
-        # Maintain cache for quick lookups
-        cache_key = hashlib.md5(
-            json.dumps(log_chain, sort_keys=True).encode()
-        ).hexdigest()
+        # Maintain cache for quick lookups; the head hash commits to every earlier block, so it and the length
+        # identify a chain without re-serialising it on the event loop
+        cache_key = f"{len(log_chain)}:{log_chain[-1].get('block_hash') if log_chain else None}"
         
         self.verification_cache[cache_key] = {
             "verified": success,
@@ -133,6 +160,15 @@ class VerificationService:
         for request in verification_requests:
             if "log_chain" in request:
                 result = await self.verify_log_chain(request["log_chain"])
+            elif "data" in request and "signature" in request:
+                # public_key may be omitted when public_key_fingerprint names a cached key
+                result = await self.signature_engine.verify_signature(
+                    request["data"],
+                    request["signature"],
+                    request.get("public_key"),
+                    request.get("algorithm"),
+                    request.get("public_key_fingerprint")
+                )
             elif "data" in request and "expected_hash" in request:
                 result = await self.verify_data_integrity(
                     request["data"], request["expected_hash"]
@@ -158,6 +194,7 @@ class VerificationService:
             "successful_verifications": successful_requests,
             "success_rate": round(successful_requests / total_requests, 3) if total_requests > 0 else 0,
             "cache_size": len(self.verification_cache),
+            "chain_engine": self.chain_engine.get_engine_stats(),
             "last_verification": self.verification_requests[-1]["timestamp"] if self.verification_requests else None
         }
     
@@ -0,0 +1,62 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("cryptography")
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ed25519
+
+SECONDARY_DIR = Path(__file__).resolve().parents[1]
+
+
+@pytest.fixture
+def crypto_executor_module(monkeypatch):
+    """core.crypto_executor from secondary_device, which shares top-level package names with primary_device"""
+    for name in list(sys.modules):
+        if name.split(".")[0] in ("core", "utils", "app"):
+            monkeypatch.delitem(sys.modules, name)
+    # Spawned workers inherit this path, so they import the same core package
+    monkeypatch.syspath_prepend(str(SECONDARY_DIR))
+    import core.crypto_executor
+    return core.crypto_executor
+
+
+def private_key_pem(private_key) -> bytes:
+    return private_key.private_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PrivateFormat.PKCS8,
+        encryption_algorithm=serialization.NoEncryption()
+    )
+
+
+def test_rotating_a_key_lets_queued_jobs_finish(crypto_executor_module):
+    old_key, new_key = ed25519.Ed25519PrivateKey.generate(), ed25519.Ed25519PrivateKey.generate()
+    executor = crypto_executor_module.CryptoExecutor(max_workers=1)
+    executor.add_signing_key("old", private_key_pem(old_key))
+    executor.start()
+
+    async def run():
+        # Wait for a running worker, then queue far more jobs than it can finish before the rotation
+        await executor.sign("old", b"warm up")
+        in_flight = [asyncio.ensure_future(executor.sign("old", f"entry {i}".encode())) for i in range(500)]
+        await asyncio.sleep(0)
+        assert executor.pending == len(in_flight)
+        old_pool = executor.pool
+        executor.add_signing_key("new", private_key_pem(new_key), replaces="old")
+        assert executor.pool is not old_pool
+        old_signatures = await asyncio.gather(*in_flight)
+        new_signature = await executor.sign("new", b"after rotation")
+        return old_signatures, new_signature
+
+    try:
+        old_signatures, new_signature = asyncio.run(run())
+    finally:
+        executor.shutdown()
+
+    for i, signature in enumerate(old_signatures):
+        old_key.public_key().verify(signature, f"entry {i}".encode())
+    new_key.public_key().verify(new_signature, b"after rotation")
+    assert executor.executor_stats["failed_operations"] == 0
@@ -0,0 +1,79 @@
+import json
+import struct
+from typing import Dict, Any, AsyncIterator
+
+STREAM_FORMAT_NDJSON = "ndjson"
+STREAM_FORMAT_LENGTH_PREFIXED = "length_prefixed"
+
+# Length-prefixed frames: 4-byte big-endian payload length followed by one JSON-encoded block
+LENGTH_PREFIX = struct.Struct(">I")
+
+CONTENT_TYPE_FORMATS = {
+    "application/x-ndjson": STREAM_FORMAT_NDJSON,
+    "application/octet-stream": STREAM_FORMAT_LENGTH_PREFIXED
+}
+
+
+class BlockStreamError(Exception):
+    """Raised when a block stream is malformed or exceeds the per-block size limit"""
+
+
+async def iter_ndjson_blocks(chunks: AsyncIterator[bytes], max_block_bytes: int) -> AsyncIterator[Dict[str, Any]]:
+    """Decode one block per newline-terminated JSON line, buffering at most one partial line"""
+    buffer = bytearray()
+    async for chunk in chunks:
+        buffer += chunk
+        start = 0
+        while True:
+            newline = buffer.find(b"\n", start)
+            if newline < 0:
+                break
+            line = bytes(buffer[start:newline])
+            start = newline + 1
+            if line.strip():
+                yield _decode_block(line)
+        del buffer[:start]
+
+        if len(buffer) > max_block_bytes:
+            raise BlockStreamError(f"Block exceeds {max_block_bytes} bytes")
+
+    if buffer.strip():
+        yield _decode_block(bytes(buffer))
+
+async def iter_length_prefixed_blocks(chunks: AsyncIterator[bytes], max_block_bytes: int) -> AsyncIterator[Dict[str, Any]]:
+    """Decode length-prefixed JSON frames, buffering at most one partial frame"""
+    buffer = bytearray()
+    async for chunk in chunks:
+        buffer += chunk
+        offset = 0
+        while len(buffer) - offset >= LENGTH_PREFIX.size:
+            (length,) = LENGTH_PREFIX.unpack_from(buffer, offset)
+            if length > max_block_bytes:
+                raise BlockStreamError(f"Block exceeds {max_block_bytes} bytes")
+
+            frame_end = offset + LENGTH_PREFIX.size + length
+            if frame_end > len(buffer):
+                break
+            yield _decode_block(bytes(buffer[offset + LENGTH_PREFIX.size:frame_end]))
+            offset = frame_end
+        del buffer[:offset]
+
+    if buffer:
+        raise BlockStreamError("Stream ended inside a frame")
+
+def iter_blocks(stream_format: str, chunks: AsyncIterator[bytes], max_block_bytes: int) -> AsyncIterator[Dict[str, Any]]:
+    """Pick the decoder for a stream format"""
+    if stream_format == STREAM_FORMAT_NDJSON:
+        return iter_ndjson_blocks(chunks, max_block_bytes)
+    if stream_format == STREAM_FORMAT_LENGTH_PREFIXED:
+        return iter_length_prefixed_blocks(chunks, max_block_bytes)
+    raise BlockStreamError(f"Unsupported stream format: {stream_format}")
+
+def _decode_block(payload: bytes) -> Dict[str, Any]:
+    try:
+        block = json.loads(payload)
+    except ValueError as e:
+        raise BlockStreamError(f"Invalid block JSON: {e}")
+    if not isinstance(block, dict):
+        raise BlockStreamError("Each block must be a JSON object")
+    return block
@@ -15,7 +15,9 @@ class ComplianceChecker:
             },
             "cryptographic_standards": {
                 "min_key_size": 2048,
-                "allowed_algorithms": ["RSA-PSS-SHA256", "ECDSA-P256"],
+                "allowed_algorithms": ["RSA-PSS-SHA256", "ECDSA-P256", "Ed25519"],
+                # Elliptic-curve keys reach equivalent strength at much smaller sizes
+                "min_key_sizes": {"RSA-PSS-SHA256": 2048, "ECDSA-P256": 256, "Ed25519": 256},
                 "description": "Cryptographic algorithm requirements"
             },
             "access_control": {
@@ -87,8 +89,9 @@ class ComplianceChecker:
         key_size = crypto_config.get("key_size", 0)
         algorithm = crypto_config.get("algorithm", "")
         
-        min_key_size = self.compliance_rules["cryptographic_standards"]["min_key_size"]
-        allowed_algorithms = self.compliance_rules["cryptographic_standards"]["allowed_algorithms"]
+        standards = self.compliance_rules["cryptographic_standards"]
+        min_key_size = standards["min_key_sizes"].get(algorithm, standards["min_key_size"])
+        allowed_algorithms = standards["allowed_algorithms"]
         
         key_compliant = key_size >= min_key_size
         algorithm_compliant = algorithm in allowed_algorithms
@@ -0,0 +1,73 @@
+import hashlib
+from typing import Dict, Any, List, Tuple
+
+# Domain separation prefixes keep leaf hashes distinct from interior node hashes
+LEAF_PREFIX = b"\x00"
+NODE_PREFIX = b"\x01"
+
+def leaf_hash(data: str) -> bytes:
+    """Hash a leaf payload"""
+    return hashlib.sha256(LEAF_PREFIX + data.encode("utf-8")).digest()
+
+def node_hash(left: bytes, right: bytes) -> bytes:
+    """Hash two child nodes"""
+    return hashlib.sha256(NODE_PREFIX + left + right).digest()
+
+def build_merkle_tree(leaves: List[str]) -> Tuple[str, List[List[Dict[str, str]]]]:
+    """Build a Merkle tree over leaf payloads, returning the hex root and one inclusion proof per leaf"""
+    if not leaves:
+        raise ValueError("Cannot build a Merkle tree without leaves")
+
+    level = [leaf_hash(leaf) for leaf in leaves]
+    # positions[i] tracks where leaf i currently sits in the level being reduced
+    positions = list(range(len(leaves)))
+    proofs: List[List[Dict[str, str]]] = [[] for _ in leaves]
+
+    while len(level) > 1:
+        next_level = []
+        for i in range(0, len(level) - 1, 2):
+            next_level.append(node_hash(level[i], level[i + 1]))
+        if len(level) % 2 == 1:
+            # An unpaired node is promoted unchanged rather than duplicated
+            next_level.append(level[-1])
+
+        for leaf_index, position in enumerate(positions):
+            sibling = position ^ 1
+            if sibling < len(level):
+                proofs[leaf_index].append({
+                    "position": "left" if sibling < position else "right",
+                    "hash": level[sibling].hex()
+                })
+            positions[leaf_index] = position // 2
+
+        level = next_level
+
+    return level[0].hex(), proofs
+
+def compute_merkle_root(data: str, inclusion_proof: List[Dict[str, str]]) -> str:
+    """Fold an inclusion proof over a leaf payload to obtain the root it commits to"""
+    current = leaf_hash(data)
+    for step in inclusion_proof:
+        sibling = bytes.fromhex(step["hash"])
+        if step["position"] == "left":
+            current = node_hash(sibling, current)
+        elif step["position"] == "right":
+            current = node_hash(current, sibling)
+        else:
+            raise ValueError(f"Invalid proof position: {step['position']}")
+    return current.hex()
+
+def verify_inclusion_proof(data: str, inclusion_proof: List[Dict[str, str]], merkle_root: str) -> bool:
+    """Check that a leaf payload is committed to by the given Merkle root"""
+    try:
+        return compute_merkle_root(data, inclusion_proof) == merkle_root
+    except (KeyError, TypeError, ValueError):
+        return False
+
+def verify_batched_signature_info(data: str, signature_info: Dict[str, Any]) -> bool:
+    """Check the inclusion proof carried in a merkle_batch signature_info record"""
+    return verify_inclusion_proof(
+        data,
+        signature_info.get("inclusion_proof", []),
+        signature_info.get("merkle_root", "")
+    )
@@ -0,0 +1 @@
+"""Code shared by the primary and secondary devices"""
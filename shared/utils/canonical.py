@@ -0,0 +1,109 @@
+"""Canonical byte encoding for hashing logs, events and audit blocks.
+
+The canonical form is compact JSON (no whitespace), keys sorted by code point,
+UTF-8 without ASCII escaping, and str() for values JSON cannot represent.
+orjson is used when installed. The two encoders print floats differently
+whenever an exponent is involved (orjson writes 1e16 and 1e-7 where repr()
+gives 1e+16 and 1e-07) and below 1e-4 (orjson writes 0.00001 where repr()
+gives 1e-05); orjson output that may hold such a float is re-encoded with
+the stdlib encoder. Non-finite floats
+and Enum members that are not str or int subclasses are outside the
+canonical domain.
+"""
+import hashlib
+import json
+import re
+from typing import Dict, Any
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Marker stored in records hashed with this encoding; records without it use the legacy encoding
+CANONICAL_HASH_FORMAT = "canonical-v1"
+HASH_FORMAT_FIELD = "hash_format"
+
+_encoder = json.JSONEncoder(
+    sort_keys=True,
+    separators=(",", ":"),
+    ensure_ascii=False,
+    default=str
+)
+
+# A number in exponent form, at the top level or after ':', ',' or '['; anchoring on the number's start keeps
+# hex digests such as "3e4f..." inside strings from matching
+_EXPONENT_NUMBER = re.compile(rb"(?:^|[:,\[])-?[0-9]+(?:\.[0-9]+)?e")
+# orjson writes 0.00001 where repr() gives 1e-05
+_SMALL_POSITIONAL = b"0.0000"
+
+if orjson is not None:
+    # Datetimes and dataclasses go through str() like the stdlib path instead of orjson's own formats
+    _ORJSON_OPTIONS = (
+        orjson.OPT_SORT_KEYS
+        | orjson.OPT_PASSTHROUGH_DATETIME
+        | orjson.OPT_PASSTHROUGH_DATACLASS
+    )
+
+def _stdlib_dumps(obj: Any) -> bytes:
+    return _encoder.encode(obj).encode("utf-8")
+
+def _orjson_default(obj: Any) -> Any:
+    # The stdlib encodes float subclasses (e.g. numpy.float64) as numbers, orjson hands them here
+    if isinstance(obj, float):
+        return float(obj)
+    return str(obj)
+
+def _orjson_dumps(obj: Any) -> bytes:
+    try:
+        encoded = orjson.dumps(obj, default=_orjson_default, option=_ORJSON_OPTIONS)
+    except TypeError:
+        # Non-str keys or integers beyond 64 bits
+        return _stdlib_dumps(obj)
+    # False positives (e.g. ",1e" inside a string) only cost a second encode
+    if _SMALL_POSITIONAL in encoded or _EXPONENT_NUMBER.search(encoded):
+        return _stdlib_dumps(obj)
+    return encoded
+
+def canonical_dumps(obj: Any) -> bytes:
+    """Encode a value in the canonical byte format"""
+    if orjson is not None:
+        return _orjson_dumps(obj)
+    return _stdlib_dumps(obj)
+
+def canonical_hash(obj: Any) -> str:
+    """SHA-256 hex digest of the canonical encoding"""
+    return hashlib.sha256(canonical_dumps(obj)).hexdigest()
+
+def canonical_dumps_excluding(obj: Dict[str, Any], field: str) -> bytes:
+    """Canonical encoding of a dict as if field were absent"""
+    # A shallow key filter shares every value with obj; both encoders are far faster on
+    # one call over it than on one call per key
+    return canonical_dumps({key: value for key, value in obj.items() if key != field})
+
+def canonical_hash_excluding(obj: Dict[str, Any], field: str) -> str:
+    """SHA-256 hex digest of a record's canonical encoding without its own hash field"""
+    return hashlib.sha256(canonical_dumps_excluding(obj, field)).hexdigest()
+
+def legacy_hash(obj: Any) -> str:
+    """Hash as produced before the canonical format (spaced separators, ASCII escapes)"""
+    return hashlib.sha256(json.dumps(obj, sort_keys=True, default=str).encode()).hexdigest()
+
+def legacy_hash_excluding(obj: Dict[str, Any], field: str) -> str:
+    return legacy_hash({key: value for key, value in obj.items() if key != field})
+
+def record_hash(record: Dict[str, Any], field: str) -> str:
+    """Hash a record excluding its own hash field, using the encoding named by its hash_format marker"""
+    if record.get(HASH_FORMAT_FIELD) == CANONICAL_HASH_FORMAT:
+        return canonical_hash_excluding(record, field)
+    return legacy_hash_excluding(record, field)
+
+def payload_hash(payload: Any, record: Dict[str, Any]) -> str:
+    """Hash a payload embedded in a record (e.g. log_data) with the record's encoding"""
+    if record.get(HASH_FORMAT_FIELD) == CANONICAL_HASH_FORMAT:
+        return canonical_hash(payload)
+    return legacy_hash(payload)
+
+def get_backend() -> str:
+    """Name of the active encoder"""
+    return "orjson" if orjson is not None else "json"
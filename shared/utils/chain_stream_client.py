@@ -0,0 +1,68 @@
+import http.client
+import json
+import struct
+from typing import Dict, Any, Iterator, Iterable, BinaryIO, Optional
+
+STREAM_ENDPOINT = "/api/v1/verify/chain/stream"
+
+STREAM_CONTENT_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "length_prefixed": "application/octet-stream"
+}
+
+# Matches the secondary device's frame format: 4-byte big-endian length, then the JSON block
+LENGTH_PREFIX = struct.Struct(">I")
+
+def encode_length_prefixed(block: Dict[str, Any]) -> bytes:
+    """Encode one block as a length-prefixed frame"""
+    payload = json.dumps(block, separators=(",", ":")).encode()
+    return LENGTH_PREFIX.pack(len(payload)) + payload
+
+def write_chain_file(blocks: Iterable[Dict[str, Any]], output: BinaryIO, stream_format: str = "ndjson"):
+    """Write blocks to a file in a streamable format"""
+    for block in blocks:
+        if stream_format == "ndjson":
+            output.write(json.dumps(block, separators=(",", ":")).encode() + b"\n")
+        else:
+            output.write(encode_length_prefixed(block))
+
+def _read_chunks(chain_file: BinaryIO, chunk_size: int) -> Iterator[bytes]:
+    while True:
+        chunk = chain_file.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+def stream_chain_file(
+    path: str,
+    host: str = "localhost",
+    port: int = 8001,
+    stream_format: str = "ndjson",
+    chunk_size: int = 64 * 1024,
+    headers: Optional[Dict[str, str]] = None,
+    timeout: Optional[float] = None
+) -> Iterator[Dict[str, Any]]:
+    """Upload a chain file with chunked transfer encoding and yield the verifier's progress and result events"""
+    if stream_format not in STREAM_CONTENT_TYPES:
+        raise ValueError(f"Unsupported stream format: {stream_format}")
+
+    connection = http.client.HTTPConnection(host, port, timeout=timeout)
+    try:
+        with open(path, "rb") as chain_file:
+            connection.request(
+                "POST",
+                f"{STREAM_ENDPOINT}?stream_format={stream_format}",
+                body=_read_chunks(chain_file, chunk_size),
+                headers={"Content-Type": STREAM_CONTENT_TYPES[stream_format], **(headers or {})},
+                encode_chunked=True
+            )
+
+        response = connection.getresponse()
+        if response.status != 200:
+            raise ConnectionError(f"Chain stream rejected: HTTP {response.status} {response.read().decode(errors='replace')}")
+
+        for line in response:
+            if line.strip():
+                yield json.loads(line)
+    finally:
+        connection.close()
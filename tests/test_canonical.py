@@ -0,0 +1,51 @@
+import json
+import random
+import struct
+
+import pytest
+
+from shared.utils import canonical
+
+
+def reference_dumps(obj):
+    return json.dumps(obj, separators=(",", ":"), sort_keys=True, ensure_ascii=False, default=str).encode("utf-8")
+
+
+FLOATS = [
+    0.0, -0.0, 1.0, 0.1, 0.0001, 0.00001, 1e-7, 2.5e-300, 5e-324,
+    1e15, 1e16, -1e22, 1.5e300, 1.7976931348623157e308, 123456789012345680000.0,
+]
+
+
+def random_floats(count, seed=0):
+    rng = random.Random(seed)
+    values = []
+    while len(values) < count:
+        value = struct.unpack("<d", struct.pack("<Q", rng.getrandbits(64)))[0]
+        if value == value and value not in (float("inf"), float("-inf")):
+            values.append(value)
+    return values
+
+
+@pytest.mark.parametrize("value", FLOATS)
+def test_floats_match_stdlib(value):
+    for obj in (value, [value], {"amount": value, "hash": "3e4f1e16"}):
+        assert canonical.canonical_dumps(obj) == reference_dumps(obj)
+
+
+def test_random_floats_match_stdlib():
+    values = random_floats(20000)
+    assert canonical.canonical_dumps({"values": values}) == reference_dumps({"values": values})
+    for value in values[:2000]:
+        assert canonical.canonical_dumps([value]) == reference_dumps([value])
+
+
+@pytest.mark.skipif(canonical.orjson is None, reason="orjson not installed")
+def test_orjson_path_matches_stdlib_path():
+    records = [
+        {"block_index": 7, "previous_hash": "0e12ab3e45", "timestamp": 1e16, "score": 1e-7},
+        {"nested": {"list": [1.5e300, -1e22, 0.00001, 42]}, "text": "ünïcode, 1e5"},
+        {"plain": [1, 2.5, "node-1", None, True]},
+    ]
+    for record in records:
+        assert canonical._orjson_dumps(record) == canonical._stdlib_dumps(record) == reference_dumps(record)